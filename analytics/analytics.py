@@ -5,102 +5,62 @@ Analyzes k6 test logs and generates visual insights
 """
 
 import os
-import re
+import sys
+import time
 import json
 import argparse
 from datetime import datetime
-from collections import defaultdict, Counter
+from collections import Counter
+
+from batch_report import (BATCH_DPI, INTERACTIVE_DPI, MISSING_CHARTS_HINT, has_display, load_pyplot,
+                          plot_points, render_scenario_pages, scenario_jobs, trend_style)
+from changepoint import analyze_regime_shifts, format_shift
+from correlation import summarize_open_model, summarize_requests, summarize_time_to_ready
+from fairness import MAX_PRINTED_USERS, summarize_users
+from k6_json import summarize_phases
+from k6_summary import legacy_metrics, parse_summary, print_fleet_summary, summarize_file
+from live_tail import DEFAULT_REFRESH, find_scenario_script, follow_log, parse_thresholds
+from log_parser import find_log_files, iter_log_partials, merge_data, new_data, parse_any_log
+from record_store import parse_timestamp
+from shards import apply_summary, load_shard_manifest, merge_shards
+from taxonomy import MAX_PRINTED_CLUSTERS, classify_failures, format_cluster, summarize_goodput
+from timeseries import DEFAULT_WINDOW, build_scenario_time_series, parse_window, summarize_time_series
 
 class LoadTestAnalyzer:
-    def __init__(self, log_file_path=None, logs_directory="../logs"):
+    def __init__(self, log_file_path=None, logs_directory="../logs", window=DEFAULT_WINDOW):
         self.log_file_path = log_file_path
         self.logs_directory = logs_directory
-        self.data = {
-            'uploads': [],
-            'errors': [],
-            'metrics': {},
-            'scenarios': [],
-            'file_types': defaultdict(int),
-            'response_times': [],
-            'success_count': 0,
-            'failure_count': 0
-        }
+        self.window = window
+        self.data = new_data()
+        self._analysis = {}   # derived results shared by the summary, charts and batch pages
         
     def parse_log_file(self, file_path):
         """Parse a single k6 log file"""
+        self._analysis.clear()
         print(f"📊 Analyzing log file: {file_path}")
         
-        with open(file_path, 'r') as f:
-            content = f.read()
-            
-        # Extract scenario info from filename
-        scenario_match = re.search(r'scenario(\d+)', os.path.basename(file_path))
-        scenario = f"Scenario {scenario_match.group(1)}" if scenario_match else "Unknown"
-        
-        # Parse upload attempts
-        upload_pattern = r'\[DEBUG.*?\] Starting upload of (\S+) \((\d+) bytes\)'
-        uploads = re.findall(upload_pattern, content)
-        
-        # Parse successful uploads
-        success_pattern = r'\[DEBUG.*?\] Upload successful for (\S+), took (\d+)ms, file ID: (\S+)'
-        successes = re.findall(success_pattern, content)
-        
-        # Parse failed uploads
-        failure_pattern = r'\[DEBUG.*?\] Upload FAILED for (\S+): Status (\d+)'
-        failures = re.findall(failure_pattern, content)
-        
-        # Parse test summary metrics
-        metrics_section = re.search(r'█ TOTAL RESULTS.*?█ EXECUTION', content, re.DOTALL)
-        if metrics_section:
-            self._parse_metrics(metrics_section.group(0))
-            
-        # Store parsed data
-        for filename, filesize in uploads:
-            self.data['file_types'][filename.split('.')[-1]] += 1
-            
-        for filename, duration, file_id in successes:
-            self.data['uploads'].append({
-                'filename': filename,
-                'duration': int(duration),
-                'status': 'success',
-                'scenario': scenario
-            })
-            self.data['response_times'].append(int(duration))
-            self.data['success_count'] += 1
-            
-        for filename, status_code in failures:
-            self.data['errors'].append({
-                'filename': filename,
-                'status_code': int(status_code),
-                'scenario': scenario
-            })
-            self.data['failure_count'] += 1
-            
-        self.data['scenarios'].append(scenario)
+        metrics_text = parse_any_log(file_path, self.data)
+        if metrics_text:
+            self._parse_metrics(metrics_text)
         
     def _parse_metrics(self, metrics_text):
         """Parse k6 metrics from the results section"""
-        patterns = {
-            'avg_duration': r'http_req_duration.*?avg=(\d+\.?\d*)([ms]+)',
-            'p95_duration': r'http_req_duration.*?p\(95\)=(\d+\.?\d*)([ms]+)',
-            'failure_rate': r'http_req_failed.*?(\d+\.?\d*)%',
-            'success_rate': r'success_rate.*?(\d+\.?\d*)%',
-            'total_requests': r'http_reqs.*?(\d+)',
-            'throughput': r'http_reqs.*?(\d+\.?\d*)/s'
-        }
-        
-        for metric, pattern in patterns.items():
-            match = re.search(pattern, metrics_text)
-            if match:
-                value = float(match.group(1))
-                if metric.endswith('_duration') and len(match.groups()) > 1 and 's' in match.group(2):
-                    value *= 1000
-                self.data['metrics'][metric] = value
+        summary = parse_summary(metrics_text)
+        self.data['metrics'].update(legacy_metrics(summary))
+        self.data['metrics']['summary'] = summary
                 
-    def analyze_all_logs(self):
-        """Analyze all log files in the logs directory"""
-        import pathlib
-        log_files = list(pathlib.Path(self.logs_directory).glob("*.log"))
+    def analyze_all_logs(self, jobs=1):
+        """Analyze all log files in the logs directory, optionally across a process pool"""
+        self._analysis.clear()
+        manifest = load_shard_manifest(self.logs_directory)
+        if manifest:
+            # One run split across shards: align their clocks and merge them instead of summing summaries
+            print(f"🧩 Sharded run: {manifest['count']} shards of {manifest['scenario']}")
+            self.data, summary, _ = merge_shards(self.logs_directory, jobs)
+            apply_summary(self.data, summary)
+            return
+
+        log_files = find_log_files(self.logs_directory)
         
         if not log_files:
             print(f"❌ No log files found in {self.logs_directory}")
@@ -108,34 +68,51 @@ class LoadTestAnalyzer:
             
         print(f"📁 Found {len(log_files)} log files")
         
-        for log_file in sorted(log_files):
-            try:
-                self.parse_log_file(log_file)
-            except Exception as e:
-                print(f"⚠️  Error parsing {log_file}: {e}")
+        for log_file, partial, metrics_text, error in iter_log_partials(log_files, jobs):
+            print(f"📊 Analyzing log file: {log_file}")
+            if error:
+                print(f"⚠️  Error parsing {log_file}: {error}")
+                continue
+            merge_data(self.data, partial)
+            if metrics_text:
+                self._parse_metrics(metrics_text)
                 
-    def generate_analytics(self):
-        """Generate visual analytics"""
+    def detect_regime_shifts(self):
+        """Detect latency and failure regime shifts per scenario (computed once per analysis)"""
+        if 'regime_shifts' not in self._analysis:
+            self._analysis['regime_shifts'] = analyze_regime_shifts(self.data['records'])
+        return self._analysis['regime_shifts']
+
+    def time_series(self):
+        """Per-scenario wall-clock windows (computed once per analysis)"""
+        if 'time_series' not in self._analysis:
+            self._analysis['time_series'] = build_scenario_time_series(self.data['records'], self.window)
+        return self._analysis['time_series']
+        
+    def generate_analytics(self, headless=False, dpi=INTERACTIVE_DPI, output_dir=".."):
+        """Generate visual analytics; headless renders on Agg and never opens a window"""
+        if not len(self.data['records']):
+            print("❌ No data to analyze")
+            return None
+            
+        plt = load_pyplot(headless)
         try:
-            import matplotlib.pyplot as plt
             import numpy as np
         except ImportError:
-            print("📦 Installing required packages...")
-            import subprocess
-            subprocess.check_call(['pip', 'install', 'matplotlib', 'numpy', 'pandas', 'seaborn'])
-            import matplotlib.pyplot as plt
-            import numpy as np
+            plt = None
+        if plt is None:
+            print(f"❌ Charts need matplotlib and numpy: {MISSING_CHARTS_HINT}")
+            return None
             
-        if not self.data['uploads'] and not self.data['errors']:
-            print("❌ No data to analyze")
-            return
+        response_times = self.data['records'].success_durations()
+        time_series = self.time_series()
             
         # Create figure with subplots
-        fig = plt.figure(figsize=(16, 12))
+        fig = plt.figure(figsize=(16, 18))
         fig.suptitle('📊 Load Testing Analytics Dashboard', fontsize=16, fontweight='bold')
         
         # 1. Success vs Failure Rate (Pie Chart)
-        ax1 = plt.subplot(2, 3, 1)
+        ax1 = plt.subplot(3, 3, 1)
         success_failure = [self.data['success_count'], self.data['failure_count']]
         labels = ['Success', 'Failure']
         colors = ['#2ecc71', '#e74c3c']
@@ -145,7 +122,7 @@ class LoadTestAnalyzer:
             plt.title('📈 Success vs Failure Rate')
         
         # 2. File Types Distribution (Bar Chart)
-        ax2 = plt.subplot(2, 3, 2)
+        ax2 = plt.subplot(3, 3, 2)
         if self.data['file_types']:
             file_types = list(self.data['file_types'].keys())
             counts = list(self.data['file_types'].values())
@@ -156,18 +133,18 @@ class LoadTestAnalyzer:
             plt.xticks(rotation=45)
             
         # 3. Response Time Distribution (Histogram)
-        ax3 = plt.subplot(2, 3, 3)
-        if self.data['response_times']:
-            plt.hist(self.data['response_times'], bins=15, color='lightcoral', alpha=0.7, edgecolor='black')
+        ax3 = plt.subplot(3, 3, 3)
+        if response_times:
+            plt.hist(response_times, bins=15, color='lightcoral', alpha=0.7, edgecolor='black')
             plt.title('⏱️ Response Time Distribution')
             plt.xlabel('Response Time (ms)')
             plt.ylabel('Frequency')
-            mean_time = np.mean(self.data['response_times'])
+            mean_time = np.mean(response_times)
             plt.axvline(mean_time, color='red', linestyle='--', label=f'Mean: {mean_time:.0f}ms')
             plt.legend()
             
         # 4. Scenarios Overview
-        ax4 = plt.subplot(2, 3, 4)
+        ax4 = plt.subplot(3, 3, 4)
         if self.data['scenarios']:
             scenario_counts = Counter(self.data['scenarios'])
             scenarios = list(scenario_counts.keys())
@@ -179,16 +156,17 @@ class LoadTestAnalyzer:
             plt.xticks(rotation=45)
             
         # 5. Performance Summary (Text)
-        ax5 = plt.subplot(2, 3, 5)
+        ax5 = plt.subplot(3, 3, 5)
         ax5.axis('off')
         
         summary_text = "📊 PERFORMANCE SUMMARY\n\n"
         summary_text += f"✅ Successful Uploads: {self.data['success_count']}\n"
         summary_text += f"❌ Failed Uploads: {self.data['failure_count']}\n"
         
-        if self.data['response_times']:
-            summary_text += f"📈 Avg Response Time: {np.mean(self.data['response_times']):.1f} ms\n"
-            summary_text += f"📊 95th Percentile: {np.percentile(self.data['response_times'], 95):.1f} ms\n"
+        if response_times:
+            latency = self.data['records'].latency_summary()
+            summary_text += f"📈 Avg Response Time: {latency['mean']:.1f} ms\n"
+            summary_text += f"📊 95th Percentile: {latency['p95']:.1f} ms\n"
             
         if self.data['metrics']:
             if 'failure_rate' in self.data['metrics']:
@@ -196,6 +174,11 @@ class LoadTestAnalyzer:
             if 'throughput' in self.data['metrics']:
                 summary_text += f"🚀 Throughput: {self.data['metrics']['throughput']:.2f} req/s\n"
                 
+        regime_shifts = self.detect_regime_shifts()
+        shift_count = sum(len(result['shifts']) for result in regime_shifts.values())
+        if shift_count:
+            summary_text += f"🔀 Regime Shifts: {shift_count}\n"
+                
         # Add recommendations
         total_tests = self.data['success_count'] + self.data['failure_count']
         if total_tests > 0:
@@ -213,35 +196,97 @@ class LoadTestAnalyzer:
                 bbox=dict(boxstyle="round,pad=0.5", facecolor="lightblue", alpha=0.8))
         plt.title('📋 Summary & Recommendations')
         
-        # 6. Response Time Trend
-        ax6 = plt.subplot(2, 3, 6)
-        if len(self.data['uploads']) > 1:
-            durations = [upload['duration'] for upload in self.data['uploads']]
-            indices = range(len(durations))
-            
-            plt.plot(indices, durations, marker='o', linewidth=2, markersize=4, color='purple')
+        # 6. Response Time Trend (wall-clock time when the log carries timestamps)
+        ax6 = plt.subplot(3, 3, 6)
+        if len(response_times) > 1:
+            timed = any(time_series.values())
             plt.title('📈 Response Time Trend')
-            plt.xlabel('Upload Sequence')
             plt.ylabel('Duration (ms)')
             
-            # Add trend line
-            if len(durations) > 2:
-                z = np.polyfit(indices, durations, 1)
-                p = np.poly1d(z)
-                plt.plot(indices, p(indices), "r--", alpha=0.7, label='Trend')
-                plt.legend()
+            if timed:
+                # One line per scenario so separate runs are not joined across the gap between them
+                for scenario, series in time_series.items():
+                    epochs, durations = self.data['records'].success_series(scenario)
+                    if not epochs:
+                        continue
+                    times, values = plot_points(epochs, durations)
+                    plt.plot(times, values, color='purple', alpha=0.7, **trend_style(len(values)))
+                    windows = [row for row in series if row['p95'] is not None]
+                    plt.plot([datetime.fromtimestamp(row['start']) for row in windows], [row['p95'] for row in windows],
+                             color='darkorange', linewidth=2)
+                    if len(epochs) > 2:
+                        z = np.polyfit(epochs, durations, 1)
+                        p = np.poly1d(z)
+                        plt.plot([datetime.fromtimestamp(epochs[0]), datetime.fromtimestamp(epochs[-1])],
+                                 p([epochs[0], epochs[-1]]), "r--", alpha=0.7)
+                plt.plot([], [], color='darkorange', linewidth=2, label=f'p95 per {self.window:g}s')
+                plt.plot([], [], "r--", alpha=0.7, label='Trend')
+                plt.xlabel('Time')
+                plt.xticks(rotation=45)
+            else:
+                indices = range(len(response_times))
+                style = trend_style(len(response_times))
+                plt.plot(indices, response_times, color='purple', **style)
+                plt.xlabel('Upload Sequence')
+                if len(response_times) > 2:
+                    z = np.polyfit(indices, response_times, 1)
+                    p = np.poly1d(z)
+                    plt.plot(indices, p(indices), "r--", alpha=0.7, label='Trend')
+            plt.legend()
+                
+            # Mark where the latency/failure regime shifted
+            for result in regime_shifts.values():
+                for shift in result['shifts']:
+                    if timed and shift['timestamp']:
+                        plt.axvline(datetime.fromtimestamp(parse_timestamp(shift['timestamp'])),
+                                    color='orange', linestyle=':', alpha=0.9)
+                    elif not timed and shift['upload_index'] is not None:
+                        plt.axvline(shift['upload_index'], color='orange', linestyle=':', alpha=0.9)
+                        
+        # 7. Throughput & Concurrency over wall-clock time, one trace per scenario
+        ax7 = plt.subplot(3, 1, 3)
+        if any(time_series.values()):
+            ax7b = ax7.twinx()
+            for scenario, series in time_series.items():
+                if not series:
+                    continue
+                times = [datetime.fromtimestamp(row['start']) for row in series]
+                ax7.step(times, [row['throughput'] for row in series], where='post', label=f'{scenario} completions/s')
+                ax7b.step(times, [row['in_flight'] for row in series], where='post', color='gray', alpha=0.5)
+            ax7b.plot([], [], color='gray', alpha=0.5, label='In-flight')
+            ax7.set_ylabel('Requests/s')
+            ax7.set_xlabel('Time')
+            ax7b.set_ylabel('In-flight Requests')
+            ax7.legend(loc='upper left')
+            ax7b.legend(loc='upper right')
+            plt.title(f'🚀 Throughput & Concurrency ({self.window:g}s windows)')
         
         plt.tight_layout()
         plt.subplots_adjust(top=0.92)
         
         # Save the plot
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        output_file = f"../load_test_analytics_{timestamp}.png"
-        plt.savefig(output_file, dpi=300, bbox_inches='tight')
+        output_file = f"{output_dir}/load_test_analytics_{timestamp}.png"
+        plt.savefig(output_file, dpi=dpi, bbox_inches='tight')
         print(f"📊 Analytics dashboard saved as: {output_file}")
         
         # Show the plot
-        plt.show()
+        if headless:
+            plt.close(fig)
+        else:
+            plt.show()
+        return output_file
+        
+    def generate_batch_report(self, output_dir, workers=1, dpi=BATCH_DPI):
+        """Render the overview and one page per scenario headlessly, scenario pages in parallel"""
+        os.makedirs(output_dir, exist_ok=True)
+        if self.generate_analytics(headless=True, dpi=dpi, output_dir=output_dir) is None:
+            return
+        stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        jobs = scenario_jobs(self.data['records'], self.time_series(), self.window, self.detect_regime_shifts(),
+                             output_dir, stamp, dpi)
+        for output_file in render_scenario_pages(jobs, workers):
+            print(f"📄 Scenario page saved as: {output_file}")
         
     def print_summary(self):
         """Print a text-based summary"""
@@ -255,27 +300,148 @@ class LoadTestAnalyzer:
             print(f"📈 Total Tests: {total_tests}")
             print(f"✅ Successful: {self.data['success_count']} ({success_rate:.1f}%)")
             print(f"❌ Failed: {self.data['failure_count']} ({100-success_rate:.1f}%)")
+        sample_rate = self.data.get('log_sample_rate', 1.0)
+        if sample_rate < 1:
+            print(f"🎲 Request logs sampled at {sample_rate * 100:g}% of successes (failures always logged); "
+                  f"the k6 summary has the exact totals")
         
-        if self.data['response_times']:
-            import statistics
-            times = self.data['response_times']
+        records = self.data['records']
+        latency = records.latency_summary()
+        if latency:
             print(f"\n⏱️  RESPONSE TIMES:")
-            print(f"   Average: {statistics.mean(times):.1f} ms")
-            print(f"   Median: {statistics.median(times):.1f} ms")
-            print(f"   Min: {min(times)} ms")
-            print(f"   Max: {max(times)} ms")
+            print(f"   Average: {latency['mean']:.1f} ms")
+            print(f"   Median: {latency['median']:.1f} ms")
+            print(f"   Min: {latency['min']:.0f} ms")
+            print(f"   Max: {latency['max']:.0f} ms")
             
         if self.data['file_types']:
             print(f"\n📁 FILE TYPES:")
             for file_type, count in self.data['file_types'].items():
                 print(f"   {file_type}: {count}")
                 
-        if self.data['errors']:
+        for title, column in (("🎯 BY SCENARIO", 'scenario'), ("📁 BY FILE TYPE", 'file_type')):
+            groups = records.group_summary(column)
+            if len(groups) > 1:
+                print(f"\n{title}:")
+                for label, row in groups.items():
+                    latency_text = f", p50 {row['p50']:.0f} ms, p95 {row['p95']:.0f} ms" if 'p50' in row else ""
+                    print(f"   {label}: {row['requests']} requests, {row['error_rate']:.1f}% failed{latency_text}")
+                    
+        failure_statuses = records.failure_statuses()
+        taxonomy = classify_failures(records)
+        if taxonomy:
+            print(f"\n❌ ERROR TAXONOMY (kind, status, response signature; latency buckets):")
+            for cluster in taxonomy[:MAX_PRINTED_CLUSTERS]:
+                print(f"   {format_cluster(cluster)}")
+            if len(taxonomy) > MAX_PRINTED_CLUSTERS:
+                print(f"   ... {len(taxonomy) - MAX_PRINTED_CLUSTERS} smaller clusters (see --export)")
+        elif failure_statuses:
             print(f"\n❌ ERROR ANALYSIS:")
-            error_codes = Counter([error['status_code'] for error in self.data['errors']])
+            error_codes = Counter(failure_statuses)
             for code, count in error_codes.items():
                 print(f"   HTTP {code}: {count} occurrences")
                 
+        lifecycle = summarize_requests(records)
+        if lifecycle:
+            states = lifecycle['states']
+            print(f"\n🔗 REQUEST LIFECYCLE:")
+            print(f"   " + ", ".join(f"{state}: {states[state]}" for state in records.REQUEST_STATES if states[state]))
+            if lifecycle['orphaned']:
+                print(f"   ⚠️  {lifecycle['orphaned']} upload(s) started but never completed")
+            if lifecycle['size_latency_r'] is not None:
+                print(f"   Payload size vs latency correlation: r = {lifecycle['size_latency_r']:.2f}")
+            for file_type, row in lifecycle['by_file_type'].items():
+                rate = f", {row['mb_per_s']:.3f} MB/s (median {row['median_mb_per_s']:.3f})" if row['mb_per_s'] else ""
+                print(f"   {file_type}: {row['completed']}/{row['requests']} completed, "
+                      f"{row['failed']} failed, {row['timeouts']} timeouts, {row['errors']} errors, {row['orphaned']} orphaned{rate}")
+                      
+        time_to_ready = summarize_time_to_ready(records)
+        if time_to_ready:
+            print(f"\n⌛ TIME TO READY (upload POST + processing, p50 / p95):")
+            for file_type, row in time_to_ready.items():
+                not_ready = ", ".join(f"{row[key]} {label}" for key, label in (('failed', 'failed'), ('timeout', 'timed out'))
+                                      if row[key])
+                print(f"   {file_type}: {row['ready']}/{row['measured']} ready"
+                      + (f" ({not_ready})" if not_ready else "") + f", {row['polls_per_upload']:.1f} polls/upload")
+                if row['total']:
+                    print("      " + ", ".join(f"{label} {row[key]['median']:,.0f} / {row[key]['p95']:,.0f} ms"
+                                               for label, key in (('POST', 'post'), ('processing', 'processing'),
+                                                                  ('time to ready', 'total'))))
+
+        goodput = summarize_goodput(records)
+        if any(row['span'] for row in goodput.values()):
+            print(f"\n🚚 GOODPUT (successful uploads vs raw throughput):")
+            for scenario, row in goodput.items():
+                if not row['span']:
+                    continue
+                retries = (f", {row['attempt_rate']:.2f} attempts/s ({row['amplification']:.2f}x retry amplification)"
+                           if row['attempts'] > row['requests'] else "")
+                efficiency = f" ({row['efficiency']:.0f}% of offered bytes)" if row['efficiency'] is not None else ""
+                print(f"   {scenario}: {row['goodput']:.2f} good uploads/s of {row['throughput']:.2f} requests/s{retries}; "
+                      f"{row['goodput_bytes'] / 1024:,.1f} of {row['offered_bytes'] / 1024:,.1f} KB/s{efficiency}")
+
+        open_model = summarize_open_model(records)
+        if open_model:
+            print(f"\n⏳ OPEN-MODEL LATENCY (from actual send → from intended start, coordinated-omission corrected):")
+            for scenario, row in open_model.items():
+                service, corrected = row['service'], row['corrected']
+                print(f"   {scenario}: {service['count']} scheduled uploads, "
+                      + ", ".join(f"{label} {service[key]:,.0f} → {corrected[key]:,.0f} ms"
+                                  for label, key in (('p50', 'median'), ('p95', 'p95'), ('p99', 'p99')))
+                      + f", schedule lag p99 {row['lag']['p99']:,.0f} ms")
+            # The k6 summary is per run, so it only belongs to the open-model scenario when there is one
+            dropped = self.data['metrics'].get('summary', {}).get('dropped_iterations')
+            if len(open_model) == 1 and dropped and dropped.get('count'):
+                print(f"   ⚠️  {dropped['count']:,.0f} dropped iterations (no free VU at their slot; never sent)")
+                      
+        users = summarize_users(records)
+        if users:
+            print(f"\n👤 PER USER (by bearer token index):")
+            for scenario, result in users.items():
+                fairness = f", throughput fairness (Jain) {result['jain_index']:.2f}" if result['jain_index'] else ""
+                median = f", median user p95 {result['median_p95']:,.0f} ms" if result['median_p95'] else ""
+                print(f"   {scenario}: {len(result['users'])} users{fairness}{median}")
+                rows = sorted(result['users'].items(), key=lambda item: -item[1].get('p95', 0))
+                for user, row in rows[:MAX_PRINTED_USERS]:
+                    latency = f", p50 {row['p50']:,.0f} ms, p95 {row['p95']:,.0f} ms" if 'p95' in row else ""
+                    rate = f", {row['throughput']:.2f} uploads/s" if row['throughput'] is not None else ""
+                    throttled = f", {row['throttled']} throttled" if row['throttled'] else ""
+                    print(f"      user {user}: {row['requests']} requests ({row['share']:.0f}%), "
+                          f"{row['error_rate']:.1f}% failed{throttled}{latency}{rate}")
+                if len(rows) > MAX_PRINTED_USERS:
+                    print(f"      ... {len(rows) - MAX_PRINTED_USERS} more users (see --export)")
+                for _, _, message in result['flags']:
+                    print(f"   ⚠️  {message}")
+
+        phases = summarize_phases(self.data['phases'])
+        if phases:
+            print(f"\n🔬 PHASE BREAKDOWN (k6 JSON output, mean / p95 / share of request time):")
+            for file_type, rows in phases.items():
+                print(f"   {file_type}:")
+                for phase, row in rows.items():
+                    share = f" ({row['share']:.0f}%)" if row['share'] is not None and phase != 'duration' else ""
+                    print(f"      {phase:<16} {row['mean']:9.1f} ms  p95 {row['p95']:9.1f} ms{share}")
+                    
+        time_series = self.time_series()
+        if any(time_series.values()):
+            print(f"\n🕒 TIME SERIES ({self.window:g}s windows):")
+            for scenario, series in time_series.items():
+                peaks = summarize_time_series(series)
+                if not peaks:
+                    continue
+                line = (f"   {scenario}: peak {peaks['peak_throughput']:.2f} req/s @ {peaks['peak_throughput_time']}, "
+                        f"peak in-flight {peaks['peak_in_flight']}, peak {peaks['peak_bytes_per_s'] / 1024:.1f} KB/s")
+                if 'worst_p95' in peaks:
+                    line += f", worst p95 {peaks['worst_p95']:.0f} ms @ {peaks['worst_p95_time']}"
+                print(line)
+                
+        regime_shifts = self.detect_regime_shifts()
+        if regime_shifts:
+            print(f"\n🔀 REGIME SHIFTS:")
+            for scenario, result in regime_shifts.items():
+                for shift in result['shifts']:
+                    print(f"   {scenario} @ {format_shift(shift)}")
+                    
         print("\n" + "="*60)
         
     def export_data(self):
@@ -283,35 +449,113 @@ class LoadTestAnalyzer:
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         output_file = f"../load_test_data_{timestamp}.json"
         
+        records = self.data['records']
+        export = {key: value for key, value in self.data.items() if key not in ('records', 'phases')}
+        export['records'] = list(records.iter_records())
+        export['phases'] = summarize_phases(self.data['phases'])
+        export['requests'] = list(records.iter_requests())
+        export['open_model'] = summarize_open_model(records)
+        export['by_scenario'] = records.group_summary('scenario')
+        export['by_file_type'] = records.group_summary('file_type')
+        export['by_user'] = summarize_users(records)
+        export['error_taxonomy'] = classify_failures(records)
+        export['goodput'] = summarize_goodput(records)
+        export['time_to_ready'] = summarize_time_to_ready(records)
+        
         with open(output_file, 'w') as f:
-            json.dump(self.data, f, indent=2, default=str)
+            json.dump(export, f, indent=2, default=str)
             
         print(f"📁 Raw data exported to: {output_file}")
 
 def main():
-    parser = argparse.ArgumentParser(description='Load Testing Analytics Dashboard')
+    # Subcommands import their modules on demand so plain summaries start quickly
+    if len(sys.argv) > 1 and sys.argv[1] == 'compare':
+        from compare import compare_main
+        sys.exit(compare_main(sys.argv[2:]))
+    if len(sys.argv) > 1 and sys.argv[1] == 'capacity':
+        from capacity import capacity_main
+        sys.exit(capacity_main(sys.argv[2:]))
+    if len(sys.argv) > 1 and sys.argv[1] == 'loadgen':
+        from loadgen import loadgen_main
+        sys.exit(loadgen_main(sys.argv[2:]))
+    if len(sys.argv) > 1 and sys.argv[1] == 'mock':
+        from mock_server import mock_main
+        sys.exit(mock_main(sys.argv[2:]))
+    if len(sys.argv) > 1 and sys.argv[1] == 'corpus':
+        from corpus import corpus_main
+        sys.exit(corpus_main(sys.argv[2:]))
+    if len(sys.argv) > 1 and sys.argv[1] == 'shard':
+        from shards import shard_main
+        sys.exit(shard_main(sys.argv[2:]))
+    if len(sys.argv) > 1 and sys.argv[1] == 'warehouse':
+        from warehouse import warehouse_main
+        sys.exit(warehouse_main(sys.argv[2:]))
+        
+    parser = argparse.ArgumentParser(description='Load Testing Analytics Dashboard',
+                                     epilog='Compare two runs: analytics.py compare <baseline> <candidate> [--tolerance 10]; '
+                                            'find capacity: analytics.py capacity <scenario> [--max-vus 64]; '
+                                            'run history: analytics.py warehouse ingest|runs|trend; '
+                                            'Python load: analytics.py loadgen <scenario> [--rate 20]; '
+                                            'local API: analytics.py mock [--workers 4]; '
+                                            'test files: analytics.py corpus [-j 4]; '
+                                            'distributed: analytics.py shard run <scenario> -n 4')
     parser.add_argument('-f', '--file', help='Specific log file to analyze')
     parser.add_argument('-d', '--directory', default='../logs', help='Directory containing log files (default: ../logs)')
     parser.add_argument('--export', action='store_true', help='Export raw data to JSON')
     parser.add_argument('--no-gui', action='store_true', help='Skip GUI and show text summary only')
+    parser.add_argument('--summary-only', action='store_true',
+                        help="Only read each log's k6 end-of-test summary (seeks from the end, no upload parsing)")
+    parser.add_argument('--batch', nargs='?', const='../reports', metavar='DIR',
+                        help='Render PNG pages headlessly (overview + one per scenario) into DIR (default: ../reports)')
+    parser.add_argument('--dpi', type=int, help=f'PNG resolution (default: {INTERACTIVE_DPI}, {BATCH_DPI} with --batch)')
+    parser.add_argument('-j', '--jobs', type=int, default=1, help='Parse log files in N worker processes (0 = all cores, default: 1)')
+    parser.add_argument('-w', '--window', type=parse_window, default=DEFAULT_WINDOW, help='Time-series window, e.g. 1s, 10s, 1m (default: 10s)')
+    parser.add_argument('--follow', metavar='LOG', help='Tail a log while the test is running and show rolling-window metrics')
+    parser.add_argument('--refresh', type=float, default=DEFAULT_REFRESH, help='Seconds between --follow refreshes (default: 5)')
+    parser.add_argument('--thresholds', metavar='SCRIPT', help='Scenario script to read thresholds from (default: matched by scenario number)')
     
     args = parser.parse_args()
     
+    if args.follow:
+        script = args.thresholds or find_scenario_script(args.follow)
+        thresholds = []
+        if script:
+            with open(script, 'r') as f:
+                thresholds = parse_thresholds(f.read())
+            print(f"🎯 Loaded {len(thresholds)} thresholds from {script}")
+        follow_log(args.follow, args.window, args.refresh, thresholds)
+        return
+        
+    if args.summary_only:
+        log_files = [args.file] if args.file else [path for path in find_log_files(args.directory)
+                                                   if path.suffix == '.log']
+        started = time.perf_counter()
+        summaries = [(path, summarize_file(path)) for path in log_files]
+        print_fleet_summary(summaries, time.perf_counter() - started)
+        if args.export:
+            output_file = f"../load_test_summaries_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+            with open(output_file, 'w') as f:
+                json.dump({str(path): summary for path, summary in summaries}, f, indent=2)
+            print(f"📁 Summaries exported to: {output_file}")
+        return
+        
     print("🚀 Starting Load Test Analysis...")
     
-    analyzer = LoadTestAnalyzer(args.file, args.directory)
+    analyzer = LoadTestAnalyzer(args.file, args.directory, args.window)
     
     if args.file:
         analyzer.parse_log_file(args.file)
     else:
-        analyzer.analyze_all_logs()
+        analyzer.analyze_all_logs(args.jobs)
         
     # Always show text summary
     analyzer.print_summary()
     
-    # Show GUI unless disabled
-    if not args.no_gui:
-        analyzer.generate_analytics()
+    # Show GUI unless disabled; without a display the charts are only saved
+    if args.batch:
+        analyzer.generate_batch_report(args.batch, args.jobs, args.dpi or BATCH_DPI)
+    elif not args.no_gui:
+        analyzer.generate_analytics(headless=not has_display(), dpi=args.dpi or INTERACTIVE_DPI)
     
     if args.export:
         analyzer.export_data()
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Headless Batch Reports
+Renders chart pages on the Agg backend, one page per scenario, across worker processes
+"""
+
+import os
+import sys
+from datetime import datetime
+from pathlib import Path
+
+from record_store import parse_timestamp
+from timeseries import lttb
+
+INTERACTIVE_DPI = 300
+BATCH_DPI = 150
+MAX_PLOT_POINTS = 2000   # per line after LTTB downsampling
+MARKER_LIMIT = 200       # draw per-point markers only on short series
+MISSING_CHARTS_HINT = "pip install matplotlib numpy (or use --no-gui / html_analytics.py)"
+
+
+def has_display():
+    """Whether an interactive matplotlib window can be opened"""
+    if os.environ.get('MPLBACKEND', '').lower() == 'agg':
+        return False
+    if sys.platform in ('win32', 'darwin'):
+        return True
+    return bool(os.environ.get('DISPLAY') or os.environ.get('WAYLAND_DISPLAY'))
+
+
+def load_pyplot(headless=True):
+    """Import pyplot (on the non-interactive Agg backend when headless), or None if matplotlib is missing"""
+    try:
+        import matplotlib
+        if headless:
+            matplotlib.use('Agg')
+        import matplotlib.pyplot as plt
+    except ImportError:
+        return None
+    return plt
+
+
+def plot_points(epochs, values):
+    """Downsample a (time, value) series for plotting, returning datetimes and values"""
+    points = lttb(list(zip(epochs, values)), MAX_PLOT_POINTS)
+    return [datetime.fromtimestamp(t) for t, _ in points], [v for _, v in points]
+
+
+def trend_style(count):
+    """Line kwargs for a latency trace: markers only when sparse, rasterized when dense"""
+    if count <= MARKER_LIMIT:
+        return {'marker': 'o', 'markersize': 3, 'linewidth': 1}
+    return {'linewidth': 0.8, 'rasterized': True}
+
+
+def scenario_jobs(records, time_series, window, regime_shifts, output_dir, stamp, dpi=BATCH_DPI):
+    """Picklable render jobs, one per scenario of build_scenario_time_series() with timestamped outcomes"""
+    jobs = []
+    for scenario, series in time_series.items():
+        if not series:
+            continue
+        epochs, durations = records.success_series(scenario)
+        shifts = [parse_timestamp(shift['timestamp'])
+                  for shift in regime_shifts.get(scenario, {}).get('shifts', []) if shift['timestamp']]
+        slug = scenario.lower().replace(' ', '_')
+        jobs.append({
+            'scenario': scenario,
+            'epochs': epochs,
+            'durations': durations,
+            'series': series,
+            'shifts': shifts,
+            'window': window,
+            'dpi': dpi,
+            'output': str(Path(output_dir) / f"load_test_{slug}_{stamp}.png"),
+        })
+    return jobs
+
+
+def render_scenario_page(job):
+    """Render one scenario page (latency trend + throughput/in-flight) to PNG; runs in a worker"""
+    plt = load_pyplot(headless=True)
+    fig, (latency_ax, throughput_ax) = plt.subplots(2, 1, figsize=(14, 9), sharex=True)
+    fig.suptitle(f"📊 {job['scenario']}", fontsize=14, fontweight='bold')
+    window = job['window']
+    series = job['series']
+
+    if job['epochs']:
+        times, durations = plot_points(job['epochs'], job['durations'])
+        latency_ax.plot(times, durations, color='purple', alpha=0.7, label='Upload duration',
+                        **trend_style(len(durations)))
+    windows = [row for row in series if row['p95'] is not None]
+    if windows:
+        latency_ax.plot([datetime.fromtimestamp(row['start']) for row in windows], [row['p95'] for row in windows],
+                        color='darkorange', linewidth=2, label=f'p95 per {window:g}s')
+    for shift in job['shifts']:
+        latency_ax.axvline(datetime.fromtimestamp(shift), color='orange', linestyle=':', alpha=0.9)
+    latency_ax.set_ylabel('Duration (ms)')
+    latency_ax.set_title('📈 Response Time Trend')
+    latency_ax.legend(loc='upper left')
+
+    times = [datetime.fromtimestamp(row['start']) for row in series]
+    throughput_ax.step(times, [row['throughput'] for row in series], where='post', label='Completions/s')
+    in_flight_ax = throughput_ax.twinx()
+    in_flight_ax.step(times, [row['in_flight'] for row in series], where='post', color='gray', alpha=0.5,
+                      label='In-flight')
+    throughput_ax.set_ylabel('Requests/s')
+    in_flight_ax.set_ylabel('In-flight Requests')
+    throughput_ax.set_xlabel('Time')
+    throughput_ax.set_title(f'🚀 Throughput & Concurrency ({window:g}s windows)')
+    throughput_ax.legend(loc='upper left')
+    in_flight_ax.legend(loc='upper right')
+
+    fig.autofmt_xdate()
+    fig.tight_layout()
+    fig.savefig(job['output'], dpi=job['dpi'], bbox_inches='tight')
+    plt.close(fig)
+    return job['output']
+
+
+def render_scenario_pages(jobs, workers=1):
+    """Render scenario pages, in a process pool when workers > 1 (0 = all cores); yields output paths"""
+    if workers is None or workers <= 0:
+        workers = os.cpu_count() or 1
+    workers = min(workers, len(jobs))
+
+    if workers <= 1:
+        for job in jobs:
+            yield render_scenario_page(job)
+        return
+
+    from concurrent.futures import ProcessPoolExecutor
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        yield from pool.map(render_scenario_page, jobs)
@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+"""
+Capacity Search
+Drives a scenario at increasing VU levels until the SLO breaks and fits a Universal Scalability Law curve
+"""
+
+import argparse
+import math
+import subprocess
+from datetime import datetime
+from pathlib import Path
+
+from latency_sketch import LatencySketch
+from live_tail import parse_thresholds
+from log_parser import find_log_files, new_data, parse_any_log, scenario_from_path
+
+DEFAULT_DURATION = '1m'
+DEFAULT_START_VUS = 1
+DEFAULT_MAX_VUS = 64
+DEFAULT_FACTOR = 2.0
+DEFAULT_MAX_RUNS = 10
+KNEE_FRACTION = 0.9   # knee = smallest concurrency reaching 90% of the USL peak throughput
+
+
+def measure_level(data, vus=None):
+    """Throughput, p95, error rate and concurrency of one run"""
+    records = data['records']
+    columns = records.columns
+    requests = len(records)
+    if not requests:
+        return None
+    latency = LatencySketch().add_many(records.success_durations())
+    starts = [t for t in records.starts['start_timestamp'] if not math.isnan(t)]
+    ends = [t for t in columns['timestamp'] if not math.isnan(t)]
+    span = (max(ends) - min(starts + ends)) if ends else 0.0
+    throughput = records.success_count() / span if span > 0 else None
+    # Little's law: mean requests in flight = throughput x mean latency
+    in_flight = throughput * latency.mean() / 1000 if throughput and latency.count else None
+    return {
+        'vus': vus,
+        'concurrency': vus if vus is not None else in_flight,
+        'in_flight': in_flight,
+        'requests': requests,
+        'throughput': throughput,
+        'p95': latency.percentile(95),
+        'error_rate': records.failure_count() / requests * 100,
+    }
+
+
+def meets_slo(level, slo_p95=None, slo_errors=None):
+    if level is None or level['throughput'] is None:
+        return False
+    if slo_p95 is not None and (level['p95'] is None or level['p95'] > slo_p95):
+        return False
+    if slo_errors is not None and level['error_rate'] > slo_errors:
+        return False
+    return True
+
+
+def _solve3(a, b):
+    """Solve a 3x3 linear system by Gaussian elimination (None if singular)"""
+    m = [row[:] + [v] for row, v in zip(a, b)]
+    for col in range(3):
+        pivot = max(range(col, 3), key=lambda r: abs(m[r][col]))
+        if abs(m[pivot][col]) < 1e-12:
+            return None
+        m[col], m[pivot] = m[pivot], m[col]
+        for r in range(3):
+            if r != col:
+                factor = m[r][col] / m[col][col]
+                m[r] = [x - factor * y for x, y in zip(m[r], m[col])]
+    return [m[i][3] / m[i][i] for i in range(3)]
+
+
+def usl_throughput(n, lam, sigma, kappa):
+    return lam * n / (1 + sigma * (n - 1) + kappa * n * (n - 1))
+
+
+def fit_usl(points):
+    """Fit X(N) = λN / (1 + σ(N-1) + κN(N-1)) to (concurrency, throughput) points
+
+    Uses the linearisation N/X = a + b(N-1) + cN(N-1) with a = 1/λ, σ = b/a, κ = c/a.
+    """
+    points = [(n, x) for n, x in points if n and x and n > 0 and x > 0]
+    if len(points) < 3:
+        return None
+    rows = [(1.0, n - 1.0, n * (n - 1.0)) for n, _ in points]
+    ys = [n / x for n, x in points]
+    normal = [[sum(r[i] * r[j] for r in rows) for j in range(3)] for i in range(3)]
+    rhs = [sum(r[i] * y for r, y in zip(rows, ys)) for i in range(3)]
+    solution = _solve3(normal, rhs)
+    if solution is None or solution[0] <= 0:
+        return None
+    a, b, c = solution
+    lam, sigma, kappa = 1 / a, max(b / a, 0.0), max(c / a, 0.0)
+
+    mean_x = sum(x for _, x in points) / len(points)
+    residual = sum((x - usl_throughput(n, lam, sigma, kappa)) ** 2 for n, x in points)
+    total = sum((x - mean_x) ** 2 for _, x in points)
+    fit = {'lambda': lam, 'sigma': sigma, 'kappa': kappa, 'r2': 1 - residual / total if total else None}
+
+    if kappa > 0 and sigma < 1:
+        peak_n = math.sqrt((1 - sigma) / kappa)
+        fit['peak_concurrency'] = peak_n
+        fit['peak_throughput'] = usl_throughput(peak_n, lam, sigma, kappa)
+        target = KNEE_FRACTION * fit['peak_throughput']
+        # X(N) rises monotonically up to the peak, so bisect for the knee
+        low, high = 1.0, peak_n
+        for _ in range(60):
+            mid = (low + high) / 2
+            if usl_throughput(mid, lam, sigma, kappa) < target:
+                low = mid
+            else:
+                high = mid
+        fit['knee_concurrency'] = high
+    elif sigma > 0:
+        fit['peak_throughput'] = lam / sigma  # asymptote without coherency penalty
+    return fit
+
+
+def run_k6_level(scenario_file, vus, duration, logs_directory):
+    """Run one k6 load level (--vus/--duration override the script's stages) and return its log path"""
+    scenario_label = Path(scenario_file).stem.split('_')[0]
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    log_path = Path(logs_directory) / f"{scenario_label}_capacity_{vus}vu_{timestamp}.log"
+    log_path.parent.mkdir(parents=True, exist_ok=True)
+    print(f"🚀 Running {Path(scenario_file).name} with {vus} VUs for {duration} → {log_path}")
+    with open(log_path, 'w') as log:
+        subprocess.run(['k6', 'run', '--vus', str(vus), '--duration', duration, str(scenario_file)],
+                       stdout=log, stderr=subprocess.STDOUT, check=False)
+    return log_path
+
+
+def run_python_level(scenario_file, vus, duration, logs_directory, base_url=None):
+    """Run one load level with the asyncio load generator, returning its data dict (the log is kept for --fit)"""
+    from loadgen import run_load
+
+    scenario_label = Path(scenario_file).stem.split('_')[0]
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    log_path = Path(logs_directory) / f"{scenario_label}_capacity_{vus}vu_{timestamp}.log"
+    print(f"🚀 Running {Path(scenario_file).name} in Python with {vus} VUs for {duration} → {log_path}")
+    data, _ = run_load(scenario_file, vus, duration, base_url=base_url, log_path=log_path)
+    return data
+
+
+def capacity_search(run_level, slo_p95=None, slo_errors=None, start=DEFAULT_START_VUS,
+                    max_vus=DEFAULT_MAX_VUS, factor=DEFAULT_FACTOR, max_runs=DEFAULT_MAX_RUNS):
+    """Grow the VU level geometrically until the SLO breaks, then bisect the boundary
+
+    run_level(vus) must return a measured level (see measure_level). Returns all
+    measured levels ordered by VUs and the highest VU level that met the SLO.
+    """
+    levels = {}
+
+    def measure(vus):
+        if vus not in levels:
+            levels[vus] = run_level(vus)
+            level = levels[vus]
+            status = "✅ within SLO" if meets_slo(level, slo_p95, slo_errors) else "❌ SLO broken"
+            if level:
+                p95 = f"{level['p95']:.0f} ms" if level['p95'] is not None else "n/a"
+                print(f"   {vus} VUs: {level['throughput'] or 0:.2f} req/s, p95 {p95}, "
+                      f"errors {level['error_rate']:.1f}% {status}")
+        return meets_slo(levels[vus], slo_p95, slo_errors)
+
+    good, bad = None, None
+    vus = max(1, int(start))
+    while len(levels) < max_runs and vus <= max_vus:
+        if measure(vus):
+            good = vus
+            vus = max(vus + 1, int(math.ceil(vus * factor)))
+        else:
+            bad = vus
+            break
+
+    if good is not None and bad is not None:
+        while bad - good > 1 and len(levels) < max_runs:
+            mid = (good + bad) // 2
+            if measure(mid):
+                good = mid
+            else:
+                bad = mid
+
+    ordered = [levels[v] for v in sorted(levels) if levels[v]]
+    return ordered, good
+
+
+def slo_from_script(script_file):
+    """p95 (ms) and failure-rate (%) limits from a scenario's k6 thresholds"""
+    slo_p95 = slo_errors = None
+    with open(script_file, 'r') as f:
+        for threshold in parse_thresholds(f.read()):
+            if threshold['metric'] == 'http_req_duration' and threshold['stat'] == 'p(95)':
+                slo_p95 = threshold['limit']
+            elif threshold['metric'] == 'http_req_failed' and threshold['stat'] == 'rate':
+                slo_errors = threshold['limit'] * 100
+    return slo_p95, slo_errors
+
+
+def resolve_scenario(value, scenarios_directory="../scenarios"):
+    """Scenario script from a number ("8") or a path"""
+    if Path(value).is_file():
+        return Path(value)
+    scripts = sorted(Path(scenarios_directory).glob(f"scenario{value}_*.js"))
+    return scripts[0] if scripts else None
+
+
+def print_capacity_report(levels, fit, slo_p95, slo_errors, best_vus=None):
+    print("\n" + "=" * 60)
+    print("📈 CAPACITY REPORT")
+    print("=" * 60)
+    slo_text = []
+    if slo_p95 is not None:
+        slo_text.append(f"p95 ≤ {slo_p95:.0f} ms")
+    if slo_errors is not None:
+        slo_text.append(f"errors ≤ {slo_errors:.1f}%")
+    print(f"🎯 SLO: {', '.join(slo_text) or 'none'}")
+    for level in sorted(levels, key=lambda l: l['concurrency'] or 0):
+        mark = "✅" if meets_slo(level, slo_p95, slo_errors) else "❌"
+        label = f"{level['vus']} VUs" if level['vus'] is not None else f"{level['concurrency'] or 0:.1f} in flight"
+        p95 = f"{level['p95']:.0f} ms" if level['p95'] is not None else "n/a"
+        print(f"   {mark} {label}: {level['throughput'] or 0:.2f} req/s, p95 {p95}, errors {level['error_rate']:.1f}%")
+
+    sustainable = [l for l in levels if meets_slo(l, slo_p95, slo_errors)]
+    if sustainable:
+        best = max(sustainable, key=lambda l: l['throughput'])
+        print(f"\n🚀 Max sustainable throughput under SLO: {best['throughput']:.2f} req/s"
+              + (f" (highest passing level: {best_vus} VUs)" if best_vus is not None else ""))
+    else:
+        print("\n⚠️  No measured level met the SLO")
+
+    if fit is None:
+        print("📉 USL fit: needs at least 3 measured levels")
+        return
+    r2 = f", R² {fit['r2']:.2f}" if fit['r2'] is not None else ""
+    print(f"📉 USL fit: λ={fit['lambda']:.3f} req/s per unit, σ={fit['sigma']:.4f} (contention), "
+          f"κ={fit['kappa']:.5f} (coherency){r2}")
+    if 'peak_concurrency' in fit:
+        print(f"   Peak throughput {fit['peak_throughput']:.2f} req/s at concurrency {fit['peak_concurrency']:.1f}")
+        print(f"   Saturation knee (≥{KNEE_FRACTION:.0%} of peak) at concurrency {fit['knee_concurrency']:.1f}")
+    elif 'peak_throughput' in fit:
+        print(f"   No retrograde region; throughput approaches {fit['peak_throughput']:.2f} req/s")
+
+
+def capacity_main(argv=None):
+    """`analytics.py capacity <scenario>`: returns 0 when a level met the SLO"""
+    parser = argparse.ArgumentParser(prog='analytics.py capacity',
+                                     description='Search for the load level at which a scenario breaks its SLO')
+    parser.add_argument('scenario', nargs='?', help='Scenario number (e.g. 8) or path to a scenario script')
+    parser.add_argument('--fit', metavar='DIR', help='Skip k6 and fit the USL to existing logs (one load level per log)')
+    parser.add_argument('--start', type=int, default=DEFAULT_START_VUS, help='First VU level (default: 1)')
+    parser.add_argument('--max-vus', type=int, default=DEFAULT_MAX_VUS, help='Highest VU level to try (default: 64)')
+    parser.add_argument('--factor', type=float, default=DEFAULT_FACTOR, help='VU growth factor between levels (default: 2)')
+    parser.add_argument('--max-runs', type=int, default=DEFAULT_MAX_RUNS, help='Maximum number of k6 runs (default: 10)')
+    parser.add_argument('--duration', default=DEFAULT_DURATION, help='Duration of each load level (default: 1m)')
+    parser.add_argument('--slo-p95', type=float, help="p95 limit in ms (default: the scenario's http_req_duration threshold)")
+    parser.add_argument('--slo-errors', type=float, help="Failure-rate limit in %% (default: the scenario's http_req_failed threshold)")
+    parser.add_argument('-d', '--directory', default='../logs/capacity', help='Where level logs are written (default: ../logs/capacity)')
+    parser.add_argument('--engine', choices=('k6', 'python'), default='k6',
+                        help='Drive each level with k6 or the in-process Python load generator (default: k6)')
+    parser.add_argument('--base-url', help='API base URL for --engine python (default: API_BASE_URL from scripts/Load.js)')
+    args = parser.parse_args(argv)
+
+    slo_p95, slo_errors = args.slo_p95, args.slo_errors
+    if args.fit:
+        levels = []
+        for log_file in find_log_files(args.fit):
+            data = new_data()
+            parse_any_log(log_file, data)
+            level = measure_level(data)
+            if level:
+                levels.append(level)
+        if not levels:
+            print(f"❌ No log files found in {args.fit}")
+            return 2
+        fit = fit_usl([(l['concurrency'], l['throughput']) for l in levels])
+        print_capacity_report(levels, fit, slo_p95, slo_errors)
+        return 0
+
+    if not args.scenario:
+        parser.error("a scenario number or script is required (or use --fit DIR)")
+    script = resolve_scenario(args.scenario)
+    if script is None:
+        parser.error(f"scenario '{args.scenario}' not found in ../scenarios")
+    default_p95, default_errors = slo_from_script(script)
+    slo_p95 = default_p95 if slo_p95 is None else slo_p95
+    slo_errors = default_errors if slo_errors is None else slo_errors
+
+    def run_level(vus):
+        if args.engine == 'python':
+            data = run_python_level(script, vus, args.duration, args.directory, args.base_url)
+        else:
+            data = new_data()
+            parse_any_log(run_k6_level(script, vus, args.duration, args.directory), data)
+        return measure_level(data, vus)
+
+    print(f"🔎 Capacity search for {scenario_from_path(script)} ({script})")
+    try:
+        levels, best_vus = capacity_search(run_level, slo_p95, slo_errors, args.start, args.max_vus,
+                                           args.factor, args.max_runs)
+    except FileNotFoundError as e:
+        print(f"❌ {e}" if args.engine == 'python' else "❌ k6 is not installed or not on PATH")
+        return 2
+    fit = fit_usl([(l['concurrency'], l['throughput']) for l in levels])
+    print_capacity_report(levels, fit, slo_p95, slo_errors, best_vus)
+    return 0 if best_vus is not None else 1
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Change-Point Detection
+Finds the points where the latency or failure regime of a run shifted (PELT)
+"""
+
+import math
+from collections import defaultdict
+
+from latency_sketch import LatencySketch
+from record_store import format_timestamp
+
+MIN_SEGMENT_SIZE = 5
+MAX_SEARCH_POINTS = 1000
+
+
+def _robust_sigma(values):
+    """Noise scale estimated from the median absolute first difference"""
+    diffs = sorted(abs(b - a) for a, b in zip(values, values[1:]))
+    if diffs:
+        sigma = diffs[len(diffs) // 2] / (0.6745 * math.sqrt(2))
+        if sigma > 0:
+            return sigma
+    mean = sum(values) / len(values)
+    variance = sum((v - mean) ** 2 for v in values) / len(values)
+    return math.sqrt(variance) or 1.0
+
+
+def _normal_mean_cost(values):
+    """Segment cost for a shift in mean of (log) latency, scaled by the noise variance"""
+    sigma2 = _robust_sigma(values) ** 2
+    s1 = [0.0]
+    s2 = [0.0]
+    for v in values:
+        s1.append(s1[-1] + v)
+        s2.append(s2[-1] + v * v)
+
+    def cost(start, end):
+        n = end - start
+        total = s1[end] - s1[start]
+        return ((s2[end] - s2[start]) - total * total / n) / sigma2
+
+    return cost
+
+
+def _bernoulli_cost(flags):
+    """Segment cost (twice the negative log-likelihood) for a shift in failure probability"""
+    s1 = [0]
+    for f in flags:
+        s1.append(s1[-1] + (1 if f else 0))
+
+    def cost(start, end):
+        n = end - start
+        k = s1[end] - s1[start]
+        result = 0.0
+        if 0 < k:
+            result -= k * math.log(k / n)
+        if k < n:
+            result -= (n - k) * math.log((n - k) / n)
+        return 2.0 * result
+
+    return cost
+
+
+def pelt(n, cost, penalty, min_size=MIN_SEGMENT_SIZE, max_points=MAX_SEARCH_POINTS):
+    """Pruned Exact Linear Time segmentation, returning the indices where new segments start
+
+    Long series are searched on an evenly spaced grid of at most max_points
+    candidate positions; segment costs still use every sample.
+    """
+    if n < 2 * min_size:
+        return []
+
+    step = max(1, -(-n // max_points))
+    positions = list(range(0, n, step)) + [n]
+    best = {0: -penalty}
+    previous = {0: 0}
+    candidates = [0]
+
+    for end in positions[1:]:
+        scored = [(best[s] + cost(s, end) + penalty, s) for s in candidates if end - s >= min_size]
+        if not scored:
+            continue
+        best[end], previous[end] = min(scored)
+        # Keep only start points that could still win later (plus ones too recent to score yet)
+        candidates = [s for s in candidates
+                      if end - s < min_size or best[s] + cost(s, end) <= best[end]]
+        candidates.append(end)
+
+    breakpoints = []
+    end = n
+    while end > 0:
+        start = previous[end]
+        if start > 0:
+            breakpoints.append(start)
+        end = start
+    return sorted(breakpoints)
+
+
+def detect_latency_shifts(durations, min_size=MIN_SEGMENT_SIZE, penalty=None):
+    """Indices where the (log) latency level shifts"""
+    if len(durations) < 2 * min_size:
+        return []
+    values = [math.log1p(max(d, 0)) for d in durations]
+    if penalty is None:
+        penalty = 3.0 * math.log(len(values))
+    return pelt(len(values), _normal_mean_cost(values), penalty, min_size)
+
+
+def detect_failure_shifts(flags, min_size=MIN_SEGMENT_SIZE, penalty=None):
+    """Indices where the failure probability shifts"""
+    if len(flags) < 2 * min_size or not any(flags) or all(flags):
+        return []
+    if penalty is None:
+        penalty = 3.0 * math.log(len(flags))
+    return pelt(len(flags), _bernoulli_cost(flags), penalty, min_size)
+
+
+def _segment_stats(events):
+    """Request count, error rate and p50/p95 latency for a slice of the timeline"""
+    latency = LatencySketch().add_many([e['duration'] for e in events if e['duration'] is not None])
+    failures = sum(1 for e in events if e['failed'])
+    return {
+        'start': format_timestamp(events[0]['timestamp']),
+        'end': format_timestamp(events[-1]['timestamp']),
+        'requests': len(events),
+        'error_rate': (failures / len(events)) * 100,
+        'p50': latency.percentile(50),
+        'p95': latency.percentile(95),
+    }
+
+
+def build_timelines(records):
+    """Group upload outcomes from a RecordStore into per-scenario timelines ordered by timestamp"""
+    timelines = defaultdict(list)
+    columns = records.columns
+    scenarios = records.labels('scenario')
+    success_index = 0
+    for scenario_code, ok, duration, timestamp in zip(columns['scenario'], columns['ok'],
+                                                       columns['duration'], columns['timestamp']):
+        timelines[scenarios[scenario_code]].append({
+            'timestamp': timestamp,
+            'duration': duration if ok else None,
+            'failed': not ok,
+            'upload_index': success_index if ok else None,
+        })
+        if ok:
+            success_index += 1
+    for events in timelines.values():
+        # Records without a timestamp keep their log order
+        events.sort(key=lambda e: 0.0 if math.isnan(e['timestamp']) else e['timestamp'])
+    return timelines
+
+
+def analyze_regime_shifts(records, min_size=MIN_SEGMENT_SIZE):
+    """Detect latency and failure regime shifts per scenario, with before/after segment statistics"""
+    results = {}
+    for scenario, events in build_timelines(records).items():
+        successes = [i for i, e in enumerate(events) if not e['failed']]
+        boundaries = {}
+        for b in detect_latency_shifts([events[i]['duration'] for i in successes], min_size):
+            boundaries.setdefault(successes[b], set()).add('latency')
+        for b in detect_failure_shifts([e['failed'] for e in events], min_size):
+            boundaries.setdefault(b, set()).add('failures')
+
+        if not boundaries:
+            continue
+
+        cuts = [0] + sorted(boundaries) + [len(events)]
+        segments = [_segment_stats(events[a:b]) for a, b in zip(cuts, cuts[1:])]
+        shifts = []
+        for i, boundary in enumerate(cuts[1:-1]):
+            upload_index = next((e['upload_index'] for e in events[boundary:]
+                                 if e['upload_index'] is not None), None)
+            shifts.append({
+                'timestamp': format_timestamp(events[boundary]['timestamp']),
+                'kinds': sorted(boundaries[boundary]),
+                'upload_index': upload_index,
+                'before': segments[i],
+                'after': segments[i + 1],
+            })
+        results[scenario] = {'segments': segments, 'shifts': shifts}
+    return results
+
+
+def _format_ms(value):
+    return f"{value:.0f}" if value is not None else "n/a"
+
+
+def format_shift(shift):
+    """One-line description of a regime shift with before/after segment statistics"""
+    before, after = shift['before'], shift['after']
+    return (f"{shift['timestamp'] or 'n/a'} [{'+'.join(shift['kinds'])}] "
+            f"p50 {_format_ms(before['p50'])}→{_format_ms(after['p50'])} ms, "
+            f"p95 {_format_ms(before['p95'])}→{_format_ms(after['p95'])} ms, "
+            f"errors {before['error_rate']:.1f}%→{after['error_rate']:.1f}%")
@@ -0,0 +1,349 @@
+#!/usr/bin/env python3
+"""
+Run Comparison
+Compares a candidate run against a baseline with bootstrap CIs and Mann-Whitney tests
+"""
+
+import argparse
+import math
+import random
+from pathlib import Path
+
+from latency_sketch import LatencySketch
+from log_parser import find_log_files, iter_log_partials, merge_data, new_data, parse_any_log
+from shards import load_shard_manifest, merge_shards
+
+DEFAULT_TOLERANCE = 10.0          # % increase of the gated latency percentile
+DEFAULT_FAILURE_TOLERANCE = 5.0   # percentage-point increase of the failure rate
+DEFAULT_ALPHA = 0.05
+DEFAULT_BOOTSTRAP = 1000
+MAX_BOOTSTRAP_SAMPLES = 10000     # resample size cap; the spread is rescaled to the full sample
+BOOTSTRAP_CHUNK = 1 << 22         # resampled values held in memory at once (numpy path)
+PERCENTILES = (50, 95, 99)
+MIN_SAMPLES = 5
+
+
+def _numpy():
+    """numpy if installed (the statistics fall back to pure Python otherwise)"""
+    try:
+        import numpy as np
+        return np
+    except ImportError:
+        return None
+
+
+def load_run(path, jobs=1):
+    """Parse a log file or a directory of logs (sharded runs merged on the local clock) into an analyzer data dict"""
+    data = new_data()
+    path = Path(path)
+    if path.is_dir() and load_shard_manifest(path):
+        data, _, _ = merge_shards(path, jobs)
+    elif path.is_dir():
+        for log_file, partial, metrics_text, error in iter_log_partials(find_log_files(path), jobs):
+            if error:
+                print(f"⚠️  Error parsing {log_file}: {error}")
+                continue
+            merge_data(data, partial)
+    else:
+        parse_any_log(path, data)
+    return data
+
+
+def _percentile(ordered, q):
+    """Linear-interpolated percentile of a sorted list (used on bootstrap resamples)"""
+    rank = (len(ordered) - 1) * q / 100.0
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def _rank_sum(a, b):
+    """Sum of the average ranks of `a` in a + b, and the tie correction term"""
+    np = _numpy()
+    if np is not None:
+        _, inverse, counts = np.unique(np.concatenate([np.asarray(a, dtype='d'), np.asarray(b, dtype='d')]),
+                                       return_inverse=True, return_counts=True)
+        ranks = np.cumsum(counts) - (counts - 1) / 2.0  # average 1-based rank of each tie group
+        counts = counts.astype('d')
+        return float(ranks[inverse[:len(a)]].sum()), float((counts ** 3 - counts).sum())
+
+    combined = sorted([(v, 0) for v in a] + [(v, 1) for v in b])
+    rank_sum = 0.0
+    tie_term = 0.0
+    i = 0
+    while i < len(combined):
+        j = i
+        while j < len(combined) and combined[j][0] == combined[i][0]:
+            j += 1
+        rank = (i + j + 1) / 2.0  # average 1-based rank of the tie group
+        rank_sum += rank * sum(1 for _, group in combined[i:j] if group == 0)
+        tie_term += (j - i) ** 3 - (j - i)
+        i = j
+    return rank_sum, tie_term
+
+
+def mann_whitney_u(a, b):
+    """Two-sided Mann-Whitney U test (normal approximation with tie and continuity correction)"""
+    n1, n2 = len(a), len(b)
+    if not n1 or not n2:
+        return None, None
+    rank_sum, tie_term = _rank_sum(a, b)
+
+    u1 = rank_sum - n1 * (n1 + 1) / 2.0
+    mean = n1 * n2 / 2.0
+    n = n1 + n2
+    variance = n1 * n2 / 12.0 * ((n + 1) - tie_term / (n * (n - 1)))
+    if variance <= 0:
+        return u1, 1.0
+    z = (abs(u1 - mean) - 0.5) / math.sqrt(variance)
+    return u1, math.erfc(max(z, 0.0) / math.sqrt(2))
+
+
+def two_proportion_p(failures_a, n_a, failures_b, n_b):
+    """Two-sided p-value that two failure rates differ (pooled z-test)"""
+    if not n_a or not n_b:
+        return None
+    pooled = (failures_a + failures_b) / (n_a + n_b)
+    variance = pooled * (1 - pooled) * (1 / n_a + 1 / n_b)
+    if variance <= 0:
+        return 1.0
+    z = abs(failures_b / n_b - failures_a / n_a) / math.sqrt(variance)
+    return math.erfc(z / math.sqrt(2))
+
+
+def _bootstrap_percentiles(values, percentiles, iterations, seed):
+    """Bootstrap replicates of several percentiles: one row per resample, one column per percentile
+
+    Resamples hold at most MAX_BOOTSTRAP_SAMPLES values drawn from the full sample,
+    and each replicate's deviation from the full-sample percentile is scaled by
+    sqrt(m/n) (m-out-of-n bootstrap). The cost stays bounded on million-record runs
+    while the replicates keep the spread of a full-size resample.
+    """
+    n = len(values)
+    m = min(n, MAX_BOOTSTRAP_SAMPLES)
+    scale = math.sqrt(m / n)
+    np = _numpy()
+    if np is not None:
+        values = np.asarray(values, dtype='d')
+        rng = np.random.default_rng(seed)
+        estimate = np.percentile(values, percentiles)
+        replicates = np.empty((iterations, len(percentiles)))
+        chunk = max(1, BOOTSTRAP_CHUNK // m)
+        for first in range(0, iterations, chunk):
+            rows = min(chunk, iterations - first)
+            resamples = values[rng.integers(0, n, size=(rows, m))]
+            replicates[first:first + rows] = np.percentile(resamples, percentiles, axis=1).T
+        return (estimate + (replicates - estimate) * scale).tolist()
+
+    rng = random.Random(seed)
+    ordered = sorted(values)
+    estimate = [_percentile(ordered, q) for q in percentiles]
+    replicates = []
+    for _ in range(iterations):
+        resample = sorted(rng.choices(values, k=m))
+        replicates.append([e + (_percentile(resample, q) - e) * scale for q, e in zip(percentiles, estimate)])
+    return replicates
+
+
+def bootstrap_delta_cis(baseline, candidate, percentiles=PERCENTILES, iterations=DEFAULT_BOOTSTRAP,
+                        confidence=0.95, seed=0):
+    """Bootstrap CIs of the relative change (%) of each percentile from baseline to candidate: {q: (low, high)}"""
+    base = _bootstrap_percentiles(baseline, percentiles, iterations, seed)
+    cand = _bootstrap_percentiles(candidate, percentiles, iterations, seed + 1)
+    tail = (1 - confidence) / 2 * 100
+    intervals = {}
+    for i, q in enumerate(percentiles):
+        deltas = sorted((c[i] - b[i]) / b[i] * 100 for b, c in zip(base, cand) if b[i] > 0)
+        intervals[q] = (_percentile(deltas, tail), _percentile(deltas, 100 - tail)) if deltas else (None, None)
+    return intervals
+
+
+def _group_samples(data, by):
+    """Per-label successful latencies (numpy arrays when installed), request/failure counts and outcome span"""
+    records = data['records']
+    columns = records.columns
+    labels = records.labels(by)
+    np = _numpy()
+    if np is not None and len(records):
+        codes = np.frombuffer(columns[by], dtype=columns[by].typecode)
+        ok = np.frombuffer(columns['ok'], dtype='b').astype(bool)
+        durations = np.frombuffer(columns['duration'], dtype='d')
+        timestamps = np.frombuffer(columns['timestamp'], dtype='d')
+        groups = {}
+        for code, label in enumerate(labels):
+            selected = codes == code
+            known = timestamps[selected & ~np.isnan(timestamps)]
+            groups[label] = {'durations': durations[selected & ok], 'requests': int(selected.sum()),
+                             'failures': int((selected & ~ok).sum()),
+                             'first': float(known.min()) if len(known) else None,
+                             'last': float(known.max()) if len(known) else None}
+        return groups
+
+    groups = {label: {'durations': [], 'requests': 0, 'failures': 0, 'first': None, 'last': None}
+              for label in labels}
+    for code, ok, duration, timestamp in zip(columns[by], columns['ok'], columns['duration'], columns['timestamp']):
+        group = groups[labels[code]]
+        group['requests'] += 1
+        if ok:
+            group['durations'].append(duration)
+        else:
+            group['failures'] += 1
+        if not math.isnan(timestamp):
+            group['first'] = timestamp if group['first'] is None else min(group['first'], timestamp)
+            group['last'] = timestamp if group['last'] is None else max(group['last'], timestamp)
+    return groups
+
+
+def _throughput(group):
+    if group['first'] is None or group['last'] <= group['first']:
+        return None
+    return group['requests'] / (group['last'] - group['first'])
+
+
+def _relative(base, cand):
+    if base is None or cand is None or not base:
+        return None
+    return (cand - base) / base * 100
+
+
+def compare_groups(baseline, candidate, by, gate='p95', tolerance=DEFAULT_TOLERANCE,
+                   failure_tolerance=DEFAULT_FAILURE_TOLERANCE, alpha=DEFAULT_ALPHA,
+                   iterations=DEFAULT_BOOTSTRAP):
+    """Compare every label present in both runs, flagging statistically significant regressions
+
+    The gated percentile regresses when its relative change exceeds `tolerance`
+    and the lower bound of its (1 - alpha) bootstrap CI is above zero, so a tail
+    regression is caught even with unchanged medians. Mann-Whitney only tests the
+    location of the whole distribution and is reported, not gated on.
+    """
+    base_groups = _group_samples(baseline, by)
+    cand_groups = _group_samples(candidate, by)
+    rows = []
+    for label in base_groups:
+        if label not in cand_groups:
+            continue
+        base, cand = base_groups[label], cand_groups[label]
+        base_sketch = LatencySketch().add_many(base['durations'])
+        cand_sketch = LatencySketch().add_many(cand['durations'])
+        enough = len(base['durations']) >= MIN_SAMPLES and len(cand['durations']) >= MIN_SAMPLES
+        _, p_value = mann_whitney_u(base['durations'], cand['durations']) if enough else (None, None)
+
+        intervals = (bootstrap_delta_cis(base['durations'], cand['durations'], PERCENTILES, iterations,
+                                         confidence=1 - alpha) if enough else {})
+
+        row = {'group': label, 'by': by, 'latency': {}, 'p_value': p_value, 'confidence': 1 - alpha,
+               'regressions': []}
+        for q in PERCENTILES:
+            name = f'p{q}'
+            before, after = base_sketch.percentile(q), cand_sketch.percentile(q)
+            low, high = intervals.get(q, (None, None))
+            delta = _relative(before, after)
+            row['latency'][name] = {'baseline': before, 'candidate': after, 'delta': delta,
+                                    'ci_low': low, 'ci_high': high}
+            if name == gate and delta is not None and delta > tolerance and low is not None and low > 0:
+                row['regressions'].append(f"{name} +{delta:.1f}% (> {tolerance:g}%, CI low {low:+.1f}%)")
+
+        base_rate = base['failures'] / base['requests'] * 100 if base['requests'] else 0.0
+        cand_rate = cand['failures'] / cand['requests'] * 100 if cand['requests'] else 0.0
+        failure_p = two_proportion_p(base['failures'], base['requests'], cand['failures'], cand['requests'])
+        row['failure_rate'] = {'baseline': base_rate, 'candidate': cand_rate,
+                               'delta': cand_rate - base_rate, 'p_value': failure_p}
+        if (cand_rate - base_rate > failure_tolerance and failure_p is not None and failure_p < alpha):
+            row['regressions'].append(f"failure rate +{cand_rate - base_rate:.1f} pts (> {failure_tolerance:g} pts)")
+
+        before, after = _throughput(base), _throughput(cand)
+        row['throughput'] = {'baseline': before, 'candidate': after, 'delta': _relative(before, after)}
+        rows.append(row)
+    return rows
+
+
+def compare_runs(baseline, candidate, **options):
+    """Per-scenario and per-file-type comparison of two analyzer data dicts"""
+    return compare_groups(baseline, candidate, 'scenario', **options) + \
+        compare_groups(baseline, candidate, 'file_type', **options)
+
+
+def _fmt_pct(value):
+    return "n/a" if value is None else f"{value:+.1f}%"
+
+
+def _fmt_ms(value):
+    return "n/a" if value is None else f"{value:.0f}"
+
+
+def format_row(row):
+    """Multi-line text description of one compared group"""
+    lines = [f"{'❌' if row['regressions'] else '✅'} {row['group']}"
+             + (f" (Mann-Whitney p={row['p_value']:.3g})" if row['p_value'] is not None else "")]
+    for name, stat in row['latency'].items():
+        ci = (f", {row['confidence'] * 100:g}% CI {_fmt_pct(stat['ci_low'])}..{_fmt_pct(stat['ci_high'])}"
+              if stat['ci_low'] is not None else "")
+        lines.append(f"   {name}: {_fmt_ms(stat['baseline'])} → {_fmt_ms(stat['candidate'])} ms "
+                     f"({_fmt_pct(stat['delta'])}{ci})")
+    failure = row['failure_rate']
+    lines.append(f"   failure rate: {failure['baseline']:.1f}% → {failure['candidate']:.1f}% "
+                 f"({failure['delta']:+.1f} pts)")
+    throughput = row['throughput']
+    if throughput['baseline'] is not None and throughput['candidate'] is not None:
+        lines.append(f"   throughput: {throughput['baseline']:.2f} → {throughput['candidate']:.2f} req/s "
+                     f"({_fmt_pct(throughput['delta'])})")
+    for regression in row['regressions']:
+        lines.append(f"   🚨 REGRESSION: {regression}")
+    return "\n".join(lines)
+
+
+def compare_main(argv=None):
+    """`analytics.py compare <baseline> <candidate>`: returns 1 when a regression exceeds tolerance"""
+    parser = argparse.ArgumentParser(prog='analytics.py compare',
+                                     description='Compare a candidate run against a baseline run')
+    parser.add_argument('baseline', help='Baseline log file or directory of logs')
+    parser.add_argument('candidate', help='Candidate log file or directory of logs')
+    parser.add_argument('--metric', choices=[f'p{q}' for q in PERCENTILES], default='p95',
+                        help='Latency percentile to gate on (default: p95)')
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help='Allowed %% increase of the gated percentile (default: 10)')
+    parser.add_argument('--failure-tolerance', type=float, default=DEFAULT_FAILURE_TOLERANCE,
+                        help='Allowed failure-rate increase in percentage points (default: 5)')
+    parser.add_argument('--alpha', type=float, default=DEFAULT_ALPHA,
+                        help='Significance level: the latency CIs are at 1 - alpha and the failure-rate test '
+                             'uses it directly (default: 0.05)')
+    parser.add_argument('--bootstrap', type=int, default=DEFAULT_BOOTSTRAP,
+                        help='Bootstrap resamples for the confidence intervals (default: 1000)')
+    parser.add_argument('--scenario', action='append', help='Only gate on this scenario (e.g. "Scenario 4"); repeatable')
+    parser.add_argument('-j', '--jobs', type=int, default=1, help='Parse log files in N worker processes (0 = all cores, default: 1)')
+    args = parser.parse_args(argv)
+
+    print(f"📊 Baseline: {args.baseline}")
+    baseline = load_run(args.baseline, args.jobs)
+    print(f"📊 Candidate: {args.candidate}")
+    candidate = load_run(args.candidate, args.jobs)
+    if not len(baseline['records']) or not len(candidate['records']):
+        print("❌ No data to compare")
+        return 2
+
+    rows = compare_runs(baseline, candidate, gate=args.metric, tolerance=args.tolerance,
+                        failure_tolerance=args.failure_tolerance, alpha=args.alpha,
+                        iterations=args.bootstrap)
+    if args.scenario:
+        rows = [row for row in rows if row['by'] == 'scenario' and row['group'] in args.scenario]
+    if not rows:
+        print("❌ No scenario or file type present in both runs")
+        return 2
+
+    print("\n" + "=" * 60)
+    print("🆚 RUN COMPARISON (baseline → candidate)")
+    print("=" * 60)
+    for title, by in (("🎯 BY SCENARIO", 'scenario'), ("📁 BY FILE TYPE", 'file_type')):
+        selected = [row for row in rows if row['by'] == by]
+        if selected:
+            print(f"\n{title}:")
+            for row in selected:
+                print(format_row(row))
+
+    regressions = [row for row in rows if row['regressions']]
+    print("\n" + "=" * 60)
+    if regressions:
+        print(f"❌ {len(regressions)} group(s) regressed beyond tolerance")
+        return 1
+    print("✅ No significant regression beyond tolerance")
+    return 0
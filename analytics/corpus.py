@@ -0,0 +1,746 @@
+#!/usr/bin/env python3
+"""
+Test Corpus Generator
+Builds valid txt/docx/pptx/xlsx/PDF upload payloads at target sizes, cached by spec hash
+"""
+
+import argparse
+import hashlib
+import io
+import json
+import os
+import random
+import shutil
+import struct
+import time
+import zipfile
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from pathlib import Path
+from xml.sax.saxutils import escape
+
+GENERATOR_VERSION = 1          # bump when the builders change, so every cached file is rebuilt
+TEST_FILES_DIRECTORY = "../test_files"
+CACHE_DIRECTORY = ".cache"     # inside the output directory
+MANIFEST_NAME = "corpus.json"
+CHARS_PER_TOKEN = 4            # rough tokenizer ratio for English prose
+ZIP_COMMENT_MAX = 65535
+SIZE_TOLERANCE = 2048        # minimum bytes left for the zip comment / PDF comment padding
+ZIP_DATE = (2025, 1, 1, 0, 0, 0)
+
+# The files scripts/Load.js and scripts/curl_test.sh upload; the PDFs in test_files/ are real documents
+DEFAULT_CORPUS = [
+    {'name': 'tiny-10KB.txt', 'size': 10 * 1024},
+    {'name': 'very-small-10KB.txt', 'size': 10 * 1024},
+    {'name': 'small-100KB.txt', 'size': 100 * 1024},
+    {'name': 'medium-1MB.txt', 'size': 1024 * 1024},
+    {'name': 'document-50KB.docx', 'size': 50 * 1024, 'tokens': 3000, 'tables': 1, 'images': 1},
+    {'name': 'document-100KB.docx', 'size': 100 * 1024, 'tokens': 8000, 'tables': 2, 'images': 2},
+    {'name': 'presentation-50KB.pptx', 'size': 50 * 1024, 'tokens': 1200, 'slides': 8, 'images': 1},
+    {'name': 'presentation-100KB.pptx', 'size': 100 * 1024, 'tokens': 2500, 'slides': 16, 'images': 2},
+    {'name': 'spreadsheet-50KB.xlsx', 'size': 50 * 1024, 'columns': 8},
+    {'name': 'spreadsheet-100KB.xlsx', 'size': 100 * 1024, 'columns': 10},
+]
+
+# The larger files the old shell generator also produced (`--extended`); not checked in
+EXTENDED_CORPUS = [
+    {'name': 'large-5MB.txt', 'size': 5 * 1024 * 1024},
+    {'name': 'very-large-10MB.txt', 'size': 10 * 1024 * 1024},
+    {'name': 'very-small-10KB.pdf', 'size': 10 * 1024, 'tokens': 600, 'tables': 1, 'images': 1},
+    {'name': 'small-100KB.pdf', 'size': 100 * 1024, 'tokens': 6000, 'tables': 2, 'images': 2},
+    {'name': 'medium-1MB.pdf', 'size': 1024 * 1024, 'tokens': 40000, 'tables': 6, 'images': 6},
+]
+
+VOCABULARY = (
+    "the of and to in a is that for on with as by this be are from at or it an will which report data "
+    "project team customer quarter revenue growth service system process document upload server file "
+    "conversion analysis result performance budget forecast meeting review plan strategy market product "
+    "development management operations support security policy compliance risk quality delivery schedule "
+    "milestone requirement design architecture deployment release feedback issue resolution incident "
+    "capacity latency throughput availability storage network database application interface workflow "
+    "department office employee training resource allocation contract vendor partner invoice payment "
+    "account region sales target objective metric dashboard summary appendix section figure table "
+    "increase decrease improve reduce maintain ensure provide include require recommend approve complete "
+    "annual monthly weekly daily internal external additional significant current previous expected "
+    "critical primary secondary overall total average estimated actual planned new existing key major"
+).split()
+WEIGHTS = [1 / (rank + 1) for rank in range(len(VOCABULARY))]   # Zipf-like word frequencies
+
+
+# --- Content ------------------------------------------------------------------
+
+class TextSource:
+    """Deterministic, compressible business prose"""
+
+    def __init__(self, rng):
+        self.rng = rng
+
+    def sentence(self):
+        words = self.rng.choices(VOCABULARY, WEIGHTS, k=self.rng.randint(8, 20))
+        if self.rng.random() < 0.2:
+            words.insert(self.rng.randrange(len(words)), f"{self.rng.randint(2, 980)}")
+        return " ".join(words).capitalize() + "."
+
+    def paragraph(self):
+        return " ".join(self.sentence() for _ in range(self.rng.randint(3, 7)))
+
+    def heading(self):
+        return " ".join(self.rng.choices(VOCABULARY[20:], k=self.rng.randint(2, 5))).title()
+
+    def paragraphs(self, chars):
+        """Paragraphs totalling about `chars` characters"""
+        result, total = [], 0
+        while total < chars:
+            text = self.paragraph()
+            result.append(text)
+            total += len(text)
+        return result
+
+    def table(self, rows, columns):
+        header = [self.heading() for _ in range(columns)]
+        body = [[self.rng.choice(VOCABULARY[20:]).title() if c == 0 else f"{self.rng.uniform(0, 10000):,.2f}"
+                 for c in range(columns)] for _ in range(rows)]
+        return [header] + body
+
+
+def estimate_tokens(text):
+    return max(1, round(len(text) / CHARS_PER_TOKEN))
+
+
+def png_image(rng, payload_bytes, noise=0.7):
+    """RGB PNG of roughly `payload_bytes` compressed bytes: a gradient with a share of noise
+
+    Noise does not compress, so the share of noisy pixels sets how much of the raw
+    image survives deflate, like photos and screenshots in real documents.
+    """
+    pixels = max(16, int(payload_bytes / 3 / noise))
+    width = max(4, int(pixels ** 0.5))
+    height = max(4, pixels // width)
+    rows = []
+    for y in range(height):
+        noisy = rng.randbytes(int(width * 3 * noise))
+        smooth = bytes((x + y) % 256 for x in range(width * 3 - len(noisy)))
+        rows.append(b'\x00' + noisy + smooth)
+    raw = b''.join(rows)
+
+    def chunk(kind, data):
+        return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(kind + data) & 0xffffffff)
+
+    return (b'\x89PNG\r\n\x1a\n' + chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0))
+            + chunk(b'IDAT', zlib.compress(raw, 9)) + chunk(b'IEND', b'')), width, height
+
+
+# --- OOXML packages -------------------------------------------------------------
+
+def _zip(parts, comment=b''):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as archive:
+        for name, data in parts:
+            info = zipfile.ZipInfo(name, ZIP_DATE)
+            info.compress_type = zipfile.ZIP_DEFLATED
+            archive.writestr(info, data)
+        archive.comment = comment
+    return buffer.getvalue()
+
+
+def _content_types(defaults, overrides):
+    items = [f'<Default Extension="{ext}" ContentType="{kind}"/>' for ext, kind in defaults]
+    items += [f'<Override PartName="{part}" ContentType="{kind}"/>' for part, kind in overrides]
+    return ('<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+            + "".join(items) + '</Types>')
+
+
+def _relationships(rels):
+    items = [f'<Relationship Id="{rid}" Type="http://schemas.openxmlformats.org/{kind}" Target="{target}"/>'
+             for rid, kind, target in rels]
+    return ('<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+            + "".join(items) + '</Relationships>')
+
+
+XML_DEFAULTS = [('rels', 'application/vnd.openxmlformats-package.relationships+xml'),
+                ('xml', 'application/xml'), ('png', 'image/png')]
+OFFICE_DOCUMENT_REL = 'officeDocument/2006/relationships/officeDocument'
+IMAGE_REL = 'officeDocument/2006/relationships/image'
+EMU_PER_PIXEL = 9525
+W_NS = ('xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main" '
+        'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships" '
+        'xmlns:wp="http://schemas.openxmlformats.org/drawingml/2006/wordprocessingDrawing" '
+        'xmlns:a="http://schemas.openxmlformats.org/drawingml/2006/main" '
+        'xmlns:pic="http://schemas.openxmlformats.org/drawingml/2006/picture"')
+P_NS = ('xmlns:a="http://schemas.openxmlformats.org/drawingml/2006/main" '
+        'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships" '
+        'xmlns:p="http://schemas.openxmlformats.org/presentationml/2006/main"')
+
+
+def _fit_extent(width, height, max_width=600):
+    scale = min(1.0, max_width / width)
+    return int(width * scale) * EMU_PER_PIXEL, int(height * scale) * EMU_PER_PIXEL
+
+
+def _docx_image(rid, index, width, height):
+    cx, cy = _fit_extent(width, height)
+    return (f'<w:p><w:r><w:drawing><wp:inline><wp:extent cx="{cx}" cy="{cy}"/><wp:docPr id="{index}" name="Figure {index}"/>'
+            '<a:graphic><a:graphicData uri="http://schemas.openxmlformats.org/drawingml/2006/picture">'
+            f'<pic:pic><pic:nvPicPr><pic:cNvPr id="{index}" name="figure{index}.png"/><pic:cNvPicPr/></pic:nvPicPr>'
+            f'<pic:blipFill><a:blip r:embed="{rid}"/><a:stretch><a:fillRect/></a:stretch></pic:blipFill>'
+            f'<pic:spPr><a:xfrm><a:off x="0" y="0"/><a:ext cx="{cx}" cy="{cy}"/></a:xfrm>'
+            '<a:prstGeom prst="rect"><a:avLst/></a:prstGeom></pic:spPr></pic:pic>'
+            '</a:graphicData></a:graphic></wp:inline></w:drawing></w:r></w:p>')
+
+
+def _docx_paragraph(text, style=None):
+    properties = f'<w:pPr><w:pStyle w:val="{style}"/></w:pPr>' if style else ''
+    return f'<w:p>{properties}<w:r><w:t xml:space="preserve">{escape(text)}</w:t></w:r></w:p>'
+
+
+def _docx_table(rows):
+    cells = "".join('<w:tr>' + "".join(f'<w:tc><w:p><w:r><w:t>{escape(cell)}</w:t></w:r></w:p></w:tc>' for cell in row)
+                    + '</w:tr>' for row in rows)
+    return ('<w:tbl><w:tblPr><w:tblStyle w:val="TableGrid"/><w:tblW w:w="0" w:type="auto"/>'
+            '<w:tblBorders><w:top w:val="single" w:sz="4"/><w:bottom w:val="single" w:sz="4"/>'
+            '<w:insideH w:val="single" w:sz="4"/><w:insideV w:val="single" w:sz="4"/></w:tblBorders></w:tblPr>'
+            f'{cells}</w:tbl>')
+
+
+def build_docx(content, images):
+    """Word document: headings, paragraphs, tables and figures"""
+    body, media, rels = [], [], []
+    blocks = content['blocks']
+    image_slots = {round((i + 1) * len(blocks) / (len(images) + 1)) for i in range(len(images))}
+    figure = 0
+    for position, block in enumerate(blocks):
+        if position in image_slots and figure < len(images):
+            data, width, height = images[figure]
+            figure += 1
+            rid = f"rId{figure}"
+            media.append((f"word/media/image{figure}.png", data))
+            rels.append((rid, IMAGE_REL, f"media/image{figure}.png"))
+            body.append(_docx_image(rid, figure, width, height))
+        kind, value = block
+        if kind == 'heading':
+            body.append(_docx_paragraph(value, 'Heading1'))
+        elif kind == 'table':
+            body.append(_docx_table(value))
+        else:
+            body.append(_docx_paragraph(value))
+    document = (f'<?xml version="1.0" encoding="UTF-8" standalone="yes"?><w:document {W_NS}><w:body>'
+                + "".join(body) + '<w:sectPr><w:pgSz w:w="12240" w:h="15840"/></w:sectPr></w:body></w:document>')
+    return [
+        ('[Content_Types].xml', _content_types(XML_DEFAULTS, [
+            ('/word/document.xml', 'application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml')])),
+        ('_rels/.rels', _relationships([('rId1', OFFICE_DOCUMENT_REL, 'word/document.xml')])),
+        ('word/document.xml', document),
+        ('word/_rels/document.xml.rels', _relationships(rels)),
+    ] + media
+
+
+THEME = ('<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+         '<a:theme xmlns:a="http://schemas.openxmlformats.org/drawingml/2006/main" name="Corpus"><a:themeElements>'
+         '<a:clrScheme name="Corpus"><a:dk1><a:srgbClr val="000000"/></a:dk1><a:lt1><a:srgbClr val="FFFFFF"/></a:lt1>'
+         '<a:dk2><a:srgbClr val="1F497D"/></a:dk2><a:lt2><a:srgbClr val="EEECE1"/></a:lt2>'
+         '<a:accent1><a:srgbClr val="4F81BD"/></a:accent1><a:accent2><a:srgbClr val="C0504D"/></a:accent2>'
+         '<a:accent3><a:srgbClr val="9BBB59"/></a:accent3><a:accent4><a:srgbClr val="8064A2"/></a:accent4>'
+         '<a:accent5><a:srgbClr val="4BACC6"/></a:accent5><a:accent6><a:srgbClr val="F79646"/></a:accent6>'
+         '<a:hlink><a:srgbClr val="0000FF"/></a:hlink><a:folHlink><a:srgbClr val="800080"/></a:folHlink></a:clrScheme>'
+         '<a:fontScheme name="Corpus"><a:majorFont><a:latin typeface="Calibri"/><a:ea typeface=""/><a:cs typeface=""/>'
+         '</a:majorFont><a:minorFont><a:latin typeface="Calibri"/><a:ea typeface=""/><a:cs typeface=""/></a:minorFont>'
+         '</a:fontScheme><a:fmtScheme name="Corpus"><a:fillStyleLst>' + '<a:solidFill><a:schemeClr val="phClr"/></a:solidFill>' * 3
+         + '</a:fillStyleLst><a:lnStyleLst>' + '<a:ln w="9525"><a:solidFill><a:schemeClr val="phClr"/></a:solidFill></a:ln>' * 3
+         + '</a:lnStyleLst><a:effectStyleLst>' + '<a:effectStyle><a:effectLst/></a:effectStyle>' * 3
+         + '</a:effectStyleLst><a:bgFillStyleLst>' + '<a:solidFill><a:schemeClr val="phClr"/></a:solidFill>' * 3
+         + '</a:bgFillStyleLst></a:fmtScheme></a:themeElements></a:theme>')
+
+PPTX_GROUP = ('<p:nvGrpSpPr><p:cNvPr id="1" name=""/><p:cNvGrpSpPr/><p:nvPr/></p:nvGrpSpPr>'
+              '<p:grpSpPr><a:xfrm><a:off x="0" y="0"/><a:ext cx="0" cy="0"/><a:chOff x="0" y="0"/>'
+              '<a:chExt cx="0" cy="0"/></a:xfrm></p:grpSpPr>')
+
+
+def _pptx_text_box(shape_id, name, y, height, paragraphs, size):
+    runs = "".join(f'<a:p><a:r><a:rPr lang="en-US" sz="{size}"/><a:t>{escape(text)}</a:t></a:r></a:p>'
+                   for text in paragraphs)
+    return (f'<p:sp><p:nvSpPr><p:cNvPr id="{shape_id}" name="{name}"/><p:cNvSpPr txBox="1"/><p:nvPr/></p:nvSpPr>'
+            f'<p:spPr><a:xfrm><a:off x="457200" y="{y}"/><a:ext cx="8229600" cy="{height}"/></a:xfrm>'
+            '<a:prstGeom prst="rect"><a:avLst/></a:prstGeom></p:spPr>'
+            f'<p:txBody><a:bodyPr wrap="square"><a:normAutofit/></a:bodyPr><a:lstStyle/>{runs}</p:txBody></p:sp>')
+
+
+def _pptx_picture(shape_id, rid, width, height):
+    cx, cy = _fit_extent(width, height, 480)
+    return (f'<p:pic><p:nvPicPr><p:cNvPr id="{shape_id}" name="Picture {shape_id}"/><p:cNvPicPr/><p:nvPr/></p:nvPicPr>'
+            f'<p:blipFill><a:blip r:embed="{rid}"/><a:stretch><a:fillRect/></a:stretch></p:blipFill>'
+            f'<p:spPr><a:xfrm><a:off x="4800600" y="1600200"/><a:ext cx="{cx}" cy="{cy}"/></a:xfrm>'
+            '<a:prstGeom prst="rect"><a:avLst/></a:prstGeom></p:spPr></p:pic>')
+
+
+def build_pptx(content, images):
+    """PowerPoint deck: one title + bullet text box per slide, figures spread over the slides"""
+    slides = content['slides']
+    parts, slide_ids, presentation_rels, overrides = [], [], [], []
+    image_slides = {round(i * len(slides) / max(1, len(images))): i for i in range(len(images))}
+    for number, (title, bullets) in enumerate(slides, start=1):
+        shapes = [_pptx_text_box(2, 'Title', 457200, 914400, [title], 3200),
+                  _pptx_text_box(3, 'Content', 1600200, 4525963, bullets, 1600)]
+        rels = [('rId1', 'officeDocument/2006/relationships/slideLayout', '../slideLayouts/slideLayout1.xml')]
+        image = image_slides.get(number - 1)
+        if image is not None:
+            data, width, height = images[image]
+            parts.append((f"ppt/media/image{image + 1}.png", data))
+            rels.append(('rId2', IMAGE_REL, f"../media/image{image + 1}.png"))
+            shapes.append(_pptx_picture(4, 'rId2', width, height))
+        parts.append((f"ppt/slides/slide{number}.xml",
+                       f'<?xml version="1.0" encoding="UTF-8" standalone="yes"?><p:sld {P_NS}><p:cSld><p:spTree>'
+                       f'{PPTX_GROUP}{"".join(shapes)}</p:spTree></p:cSld></p:sld>'))
+        parts.append((f"ppt/slides/_rels/slide{number}.xml.rels", _relationships(rels)))
+        presentation_rels.append((f"rId{number + 2}", 'officeDocument/2006/relationships/slide', f"slides/slide{number}.xml"))
+        slide_ids.append(f'<p:sldId id="{255 + number}" r:id="rId{number + 2}"/>')
+        overrides.append((f"/ppt/slides/slide{number}.xml",
+                          'application/vnd.openxmlformats-officedocument.presentationml.slide+xml'))
+
+    presentation = (f'<?xml version="1.0" encoding="UTF-8" standalone="yes"?><p:presentation {P_NS}>'
+                    '<p:sldMasterIdLst><p:sldMasterId id="2147483648" r:id="rId1"/></p:sldMasterIdLst>'
+                    f'<p:sldIdLst>{"".join(slide_ids)}</p:sldIdLst>'
+                    '<p:sldSz cx="9144000" cy="6858000"/><p:notesSz cx="6858000" cy="9144000"/></p:presentation>')
+    master = (f'<?xml version="1.0" encoding="UTF-8" standalone="yes"?><p:sldMaster {P_NS}><p:cSld><p:spTree>{PPTX_GROUP}'
+              '</p:spTree></p:cSld><p:clrMap bg1="lt1" tx1="dk1" bg2="lt2" tx2="dk2" accent1="accent1" accent2="accent2" '
+              'accent3="accent3" accent4="accent4" accent5="accent5" accent6="accent6" hlink="hlink" folHlink="folHlink"/>'
+              '<p:sldLayoutIdLst><p:sldLayoutId id="2147483649" r:id="rId1"/></p:sldLayoutIdLst></p:sldMaster>')
+    layout = (f'<?xml version="1.0" encoding="UTF-8" standalone="yes"?><p:sldLayout {P_NS} type="blank"><p:cSld name="Blank">'
+              f'<p:spTree>{PPTX_GROUP}</p:spTree></p:cSld></p:sldLayout>')
+    main = 'application/vnd.openxmlformats-officedocument.presentationml'
+    return [
+        ('[Content_Types].xml', _content_types(XML_DEFAULTS, [
+            ('/ppt/presentation.xml', f'{main}.presentation.main+xml'),
+            ('/ppt/slideMasters/slideMaster1.xml', f'{main}.slideMaster+xml'),
+            ('/ppt/slideLayouts/slideLayout1.xml', f'{main}.slideLayout+xml'),
+            ('/ppt/theme/theme1.xml', 'application/vnd.openxmlformats-officedocument.theme+xml')] + overrides)),
+        ('_rels/.rels', _relationships([('rId1', OFFICE_DOCUMENT_REL, 'ppt/presentation.xml')])),
+        ('ppt/presentation.xml', presentation),
+        ('ppt/_rels/presentation.xml.rels', _relationships(
+            [('rId1', 'officeDocument/2006/relationships/slideMaster', 'slideMasters/slideMaster1.xml'),
+             ('rId2', 'officeDocument/2006/relationships/theme', 'theme/theme1.xml')] + presentation_rels)),
+        ('ppt/slideMasters/slideMaster1.xml', master),
+        ('ppt/slideMasters/_rels/slideMaster1.xml.rels', _relationships(
+            [('rId1', 'officeDocument/2006/relationships/slideLayout', '../slideLayouts/slideLayout1.xml'),
+             ('rId2', 'officeDocument/2006/relationships/theme', '../theme/theme1.xml')])),
+        ('ppt/slideLayouts/slideLayout1.xml', layout),
+        ('ppt/slideLayouts/_rels/slideLayout1.xml.rels', _relationships(
+            [('rId1', 'officeDocument/2006/relationships/slideMaster', '../slideMasters/slideMaster1.xml')])),
+        ('ppt/theme/theme1.xml', THEME),
+    ] + parts
+
+
+def _column_name(index):
+    name = ''
+    index += 1
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        name = chr(65 + remainder) + name
+    return name
+
+
+def build_xlsx(content, images):
+    """Excel workbook: one sheet holding the table (inline strings, no shared-string table)"""
+    rows = []
+    for r, row in enumerate(content['table'], start=1):
+        cells = []
+        for c, value in enumerate(row):
+            ref = f"{_column_name(c)}{r}"
+            if r > 1 and c > 0:
+                cells.append(f'<c r="{ref}"><v>{value.replace(",", "")}</v></c>')
+            else:
+                cells.append(f'<c r="{ref}" t="inlineStr"><is><t>{escape(value)}</t></is></c>')
+        rows.append(f'<row r="{r}">{"".join(cells)}</row>')
+    sheet = ('<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+             '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+             f'<sheetData>{"".join(rows)}</sheetData></worksheet>')
+    workbook = ('<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+                'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+                '<sheets><sheet name="Data" sheetId="1" r:id="rId1"/></sheets></workbook>')
+    main = 'application/vnd.openxmlformats-officedocument.spreadsheetml'
+    return [
+        ('[Content_Types].xml', _content_types(XML_DEFAULTS, [
+            ('/xl/workbook.xml', f'{main}.sheet.main+xml'), ('/xl/worksheets/sheet1.xml', f'{main}.worksheet+xml')])),
+        ('_rels/.rels', _relationships([('rId1', OFFICE_DOCUMENT_REL, 'xl/workbook.xml')])),
+        ('xl/workbook.xml', workbook),
+        ('xl/_rels/workbook.xml.rels', _relationships(
+            [('rId1', 'officeDocument/2006/relationships/worksheet', 'worksheets/sheet1.xml')])),
+        ('xl/worksheets/sheet1.xml', sheet),
+    ]
+
+
+# --- PDF ----------------------------------------------------------------------------
+
+def _pdf_text(text):
+    return text.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+
+
+def _wrap(text, width=90):
+    lines, line = [], ''
+    for word in text.split():
+        if line and len(line) + len(word) + 1 > width:
+            lines.append(line)
+            line = word
+        else:
+            line = f"{line} {word}" if line else word
+    return lines + ([line] if line else [])
+
+
+def build_pdf(content, images):
+    """PDF with Helvetica text pages, ruled tables and image XObjects (Flate-compressed streams)"""
+    pages, commands, y = [], [], 740
+
+    def new_page():
+        nonlocal commands, y
+        if commands:
+            pages.append(commands)
+        commands, y = [], 740
+
+    for kind, value in content['blocks']:
+        if kind == 'table':
+            height = 16 * len(value) + 10
+            if y - height < 60:
+                new_page()
+            column_width = 468 / len(value[0])
+            for r, row in enumerate(value):
+                top = y - 16 * r
+                commands.append(f"72 {top - 12} 468 16 re S")
+                for c, cell in enumerate(row):
+                    commands.append(f"BT /F1 8 Tf {76 + c * column_width:.1f} {top - 8} Td ({_pdf_text(cell[:18])}) Tj ET")
+            y -= height
+            continue
+        size = 14 if kind == 'heading' else 10
+        for line in _wrap(value, 60 if kind == 'heading' else 95):
+            if y < 60:
+                new_page()
+            commands.append(f"BT /F1 {size} Tf 72 {y} Td ({_pdf_text(line)}) Tj ET")
+            y -= size + 4
+        y -= 6
+    new_page()
+
+    objects = []   # bodies; object number = index + 1
+
+    def add(body):
+        objects.append(body)
+        return len(objects)
+
+    def stream(data, extra=''):
+        compressed = zlib.compress(data, 6)
+        return (f"<< /Length {len(compressed)} /Filter /FlateDecode{extra} >>\nstream\n".encode()
+                + compressed + b"\nendstream")
+
+    catalog = add(None)
+    pages_obj = add(None)
+    font = add(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+    image_objects = []
+    for data, width, height in images:
+        raw = _png_pixels(data)
+        image_objects.append(add(stream(raw, f" /Type /XObject /Subtype /Image /Width {width} /Height {height} "
+                                             "/ColorSpace /DeviceRGB /BitsPerComponent 8 "
+                                             f"/DecodeParms << /Predictor 15 /Colors 3 /Columns {width} >>")))
+    page_objects = []
+    for number, page in enumerate(pages):
+        resources = f"/Font << /F1 {font} 0 R >>"
+        if number < len(image_objects):
+            resources += f" /XObject << /Im{number} {image_objects[number]} 0 R >>"
+            page.append(f"q 200 0 0 150 340 60 cm /Im{number} Do Q")
+        contents = add(stream("\n".join(page).encode('latin-1', 'replace')))
+        page_objects.append(add(f"<< /Type /Page /Parent {pages_obj} 0 R /MediaBox [0 0 612 792] "
+                                f"/Resources << {resources} >> /Contents {contents} 0 R >>".encode()))
+    objects[catalog - 1] = f"<< /Type /Catalog /Pages {pages_obj} 0 R >>".encode()
+    kids = " ".join(f"{number} 0 R" for number in page_objects)
+    objects[pages_obj - 1] = f"<< /Type /Pages /Kids [{kids}] /Count {len(page_objects)} >>".encode()
+
+    out = bytearray(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n".encode() + body + b"\nendobj\n"
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    out += "".join(f"{offset:010d} 00000 n \n" for offset in offsets).encode()
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root {catalog} 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    return bytes(out)
+
+
+def _png_pixels(png):
+    """Filtered scanlines of a PNG from png_image() (the PDF uses them with the PNG predictor)"""
+    length = struct.unpack('>I', png[33:37])[0]
+    return zlib.decompress(png[41:41 + length])
+
+
+# --- Spec → file ----------------------------------------------------------------------
+
+BUILDERS = {'docx': build_docx, 'pptx': build_pptx, 'pdf': build_pdf}
+
+
+def spec_key(spec):
+    """Content address of a spec: same spec and generator version -> same bytes"""
+    canonical = json.dumps({'version': GENERATOR_VERSION, **spec}, sort_keys=True)
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+def _document_content(text, spec):
+    """Headings, paragraphs and tables for about spec['tokens'] tokens"""
+    tokens = spec.get('tokens', spec['size'] // 20)
+    paragraphs = text.paragraphs(tokens * CHARS_PER_TOKEN)
+    tables = spec.get('tables', 1)
+    blocks = []
+    table_slots = {round((i + 1) * len(paragraphs) / (tables + 1)) for i in range(tables)}
+    for index, paragraph in enumerate(paragraphs):
+        if index % 4 == 0:
+            blocks.append(('heading', text.heading()))
+        if index in table_slots:
+            blocks.append(('table', text.table(text.rng.randint(5, 12), text.rng.randint(3, 5))))
+        blocks.append(('paragraph', paragraph))
+    words = " ".join(value if kind != 'table' else " ".join(" ".join(row) for row in value) for kind, value in blocks)
+    return {'blocks': blocks}, estimate_tokens(words)
+
+
+def _slide_content(text, spec):
+    tokens = spec.get('tokens', spec['size'] // 40)
+    count = spec.get('slides', 10)
+    chars_per_slide = tokens * CHARS_PER_TOKEN // count
+    slides = []
+    for _ in range(count):
+        bullets, total = [], 0
+        while total < chars_per_slide:
+            bullet = text.sentence()
+            bullets.append(bullet)
+            total += len(bullet)
+        slides.append((text.heading(), bullets))
+    words = " ".join(title + " " + " ".join(bullets) for title, bullets in slides)
+    return {'slides': slides}, estimate_tokens(words)
+
+
+def _pad_zip(build, target):
+    """Zip bytes of `target` size when reachable: the archive comment absorbs the remainder"""
+    data = build(b'')
+    missing = target - len(data)
+    if missing > 0:
+        data = build(b' ' * min(missing, ZIP_COMMENT_MAX))
+    return data
+
+
+def _pad_pdf(data, target):
+    """Insert a comment line before the cross-reference table and shift startxref accordingly"""
+    xref = data.rindex(b"\nxref\n") + 1
+    startxref = data.rindex(b"startxref\n")
+    missing = target - len(data)
+    pad_length = missing
+    for _ in range(2):   # the startxref value may gain a digit; take it out of the padding
+        tail = f"startxref\n{xref + pad_length}\n%%EOF\n".encode()
+        pad_length = missing - (len(tail) - len(data[startxref:]))
+    if pad_length <= 0:
+        return data
+    pad = b"\n" if pad_length == 1 else b"%" + b"0" * (pad_length - 2) + b"\n"
+    return data[:xref] + pad + data[xref:startxref] + tail
+
+
+def _generate_xlsx(text, spec):
+    """Grow the sheet in halving batches of rows until the next batch would overshoot"""
+    target, columns = spec['size'], spec.get('columns', 8)
+    table = text.table(0, columns)
+    size = len(_zip(build_xlsx({'table': table}, [])))
+    probe = text.table(20, columns)[1:]
+    per_row = max(1.0, (len(_zip(build_xlsx({'table': table + probe}, []))) - size) / len(probe))
+    batch = max(1, int((target - size) / per_row))
+    while batch >= 1 and target - size > SIZE_TOLERANCE:
+        candidate = table + text.table(batch, columns)[1:]
+        candidate_size = len(_zip(build_xlsx({'table': candidate}, [])))
+        if candidate_size > target:
+            batch //= 2
+            continue
+        table, size = candidate, candidate_size
+    words = " ".join(" ".join(row) for row in table)
+    data = _pad_zip(lambda comment: _zip(build_xlsx({'table': table}, []), comment), target)
+    return data, estimate_tokens(words)
+
+
+def generate(spec):
+    """Bytes and token estimate for one spec (runs in a worker process)
+
+    Text sets the token count; figures (partly noisy PNGs, like screenshots) carry
+    the remaining weight and are resized until the file is just under the target, then a zip comment or PDF comment line makes up the difference.
+    """
+    target = spec['size']
+    kind = spec['name'].rsplit('.', 1)[-1].lower()
+    rng = random.Random(spec.get('seed', int(spec_key(spec)[:16], 16)))
+    text = TextSource(rng)
+
+    if kind == 'txt':
+        body = "\n\n".join(text.paragraphs(target)).encode()[:target]
+        return body, estimate_tokens(body.decode(errors='ignore'))
+    if kind == 'xlsx':
+        return _generate_xlsx(text, spec)
+    if kind not in BUILDERS:
+        raise ValueError(f"unsupported corpus file type: {spec['name']}")
+
+    content, tokens = (_slide_content if kind == 'pptx' else _document_content)(text, spec)
+    seeds = [rng.random() for _ in range(spec.get('images', 1))]
+    build = BUILDERS[kind]
+
+    def assemble(image_bytes, comment=b''):
+        share = max(64, image_bytes // max(1, len(seeds)))
+        images = [png_image(random.Random(seed), share) for seed in seeds]
+        if kind == 'pdf':
+            return build(content, images)
+        return _zip(build(content, images), comment)
+
+    # Image sizes move in whole pixel rows, so the band widens with the target; aim at its middle
+    tolerance = min(ZIP_COMMENT_MAX, max(SIZE_TOLERANCE, target // 256))
+    aim = target - tolerance // 2
+    image_bytes = max(0, aim - len(assemble(0)))
+    for _ in range(8):
+        data = assemble(image_bytes)
+        if 0 <= target - len(data) <= tolerance or image_bytes == 0:
+            break
+        image_bytes = max(0, image_bytes + aim - len(data))
+    while len(data) > target and image_bytes > 0:
+        image_bytes = max(0, image_bytes - tolerance)
+        data = assemble(image_bytes)
+    if kind == 'pdf':
+        return _pad_pdf(data, target), tokens
+    return _pad_zip(lambda comment: assemble(image_bytes, comment), target), tokens
+
+
+# --- Cache + manifest ---------------------------------------------------------------
+
+def load_manifest(output_directory):
+    path = Path(output_directory) / MANIFEST_NAME
+    if not path.exists():
+        return {}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f).get('files', {})
+
+
+def write_manifest(output_directory, entries):
+    path = Path(output_directory) / MANIFEST_NAME
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'generator_version': GENERATOR_VERSION, 'files': dict(sorted(entries.items()))}, f, indent=2)
+        f.write("\n")
+
+
+def file_digest(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def is_current(path, entry, key):
+    """The file on disk is what the manifest says the spec produced"""
+    return (entry is not None and entry.get('key') == key and path.exists()
+            and path.stat().st_size == entry.get('bytes') and file_digest(path) == entry.get('sha256'))
+
+
+def build_file(spec, cache_directory, force=False):
+    """Generate one spec into the content-addressed cache (or reuse the cached copy); returns its entry"""
+    key = spec_key(spec)
+    cached = Path(cache_directory) / key
+    meta_path = cached.with_suffix('.json')
+    if not force and cached.exists() and meta_path.exists():
+        with open(meta_path, 'r', encoding='utf-8') as f:
+            return json.load(f), True
+    data, tokens = generate(spec)
+    cached.parent.mkdir(parents=True, exist_ok=True)
+    temporary = cached.with_suffix('.tmp')
+    temporary.write_bytes(data)
+    os.replace(temporary, cached)
+    entry = {'key': key, 'sha256': hashlib.sha256(data).hexdigest(), 'bytes': len(data),
+             'target_bytes': spec['size'], 'tokens': tokens}
+    with open(meta_path, 'w', encoding='utf-8') as f:
+        json.dump(entry, f)
+    return entry, False
+
+
+def build_corpus(specs, output_directory, jobs=0, force=False):
+    """Bring every spec's file in `output_directory` up to date; returns (entries, counts)"""
+    output = Path(output_directory)
+    cache_directory = output / CACHE_DIRECTORY
+    output.mkdir(parents=True, exist_ok=True)
+    manifest = load_manifest(output)
+    counts = {'current': 0, 'cached': 0, 'generated': 0}
+
+    pending = []
+    for spec in specs:
+        if not force and is_current(output / spec['name'], manifest.get(spec['name']), spec_key(spec)):
+            counts['current'] += 1
+        else:
+            pending.append(spec)
+
+    workers = min(len(pending), jobs or os.cpu_count() or 1)
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(partial(build_file, cache_directory=cache_directory, force=force), pending))
+    else:
+        results = [build_file(spec, cache_directory, force) for spec in pending]
+
+    for spec, (entry, was_cached) in zip(pending, results):
+        shutil.copyfile(cache_directory / entry['key'], output / spec['name'])
+        manifest[spec['name']] = entry
+        counts['cached' if was_cached else 'generated'] += 1
+    write_manifest(output, manifest)
+    return manifest, counts
+
+
+def load_specs(spec_path=None, only=None, extended=False):
+    specs = DEFAULT_CORPUS + (EXTENDED_CORPUS if extended else [])
+    if spec_path:
+        with open(spec_path, 'r', encoding='utf-8') as f:
+            specs = json.load(f)
+    for spec in specs:
+        if 'name' not in spec or 'size' not in spec:
+            raise ValueError(f"corpus spec needs 'name' and 'size': {spec}")
+    if only:
+        specs = [spec for spec in specs if spec['name'] in only]
+    return specs
+
+
+def corpus_main(argv=None):
+    """CLI entry point: `python analytics.py corpus [-o DIR] [-j N] [--force]`"""
+    parser = argparse.ArgumentParser(
+        prog='analytics.py corpus',
+        description='Generate the upload test files (valid txt/docx/pptx/xlsx/pdf at target sizes), '
+                    'reusing cached copies whose spec has not changed'
+    )
+    parser.add_argument('-o', '--output', default=TEST_FILES_DIRECTORY,
+                        help=f'Directory to write the files into (default: {TEST_FILES_DIRECTORY})')
+    parser.add_argument('-j', '--jobs', type=int, default=0,
+                        help='Worker processes for generation (default: 0 = all cores)')
+    parser.add_argument('--spec', help='JSON list of {name, size, tokens?, tables?, images?, slides?, columns?, seed?} '
+                                       'to generate instead of the default corpus')
+    parser.add_argument('--extended', action='store_true',
+                        help='Also build the 5 MB / 10 MB text files and the generated PDFs')
+    parser.add_argument('--only', nargs='+', metavar='NAME', help='Generate only these file names')
+    parser.add_argument('--force', action='store_true', help='Ignore the manifest and cache and regenerate the selected files')
+    args = parser.parse_args(argv)
+
+    try:
+        specs = load_specs(args.spec, args.only, args.extended)
+    except (OSError, ValueError) as e:
+        print(f"❌ {e}")
+        return 1
+    if not specs:
+        print("❌ No corpus files selected")
+        return 1
+
+    print(f"🗂️  Building {len(specs)} test files in {args.output}")
+    started = time.perf_counter()
+    try:
+        manifest, counts = build_corpus(specs, args.output, args.jobs, args.force)
+    except ValueError as e:
+        print(f"❌ {e}")
+        return 1
+    elapsed = time.perf_counter() - started
+
+    for spec in specs:
+        entry = manifest[spec['name']]
+        print(f"   {spec['name']:28} {entry['bytes']:>10,} bytes  ~{entry['tokens']:>7,} tokens")
+    print(f"✅ {counts['generated']} generated, {counts['cached']} from cache, {counts['current']} already current "
+          f"in {elapsed:.2f}s")
+    return 0
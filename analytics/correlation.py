@@ -0,0 +1,316 @@
+#!/usr/bin/env python3
+"""
+Request Correlation
+Pairs upload starts with their outcomes to rebuild each request's lifecycle
+"""
+
+import math
+from collections import Counter, deque
+
+from latency_sketch import LatencySketch
+from record_store import _numpy, parse_timestamp
+from taxonomy import error_signature
+
+# Matches the per-request timeout set in uploadFile() in scripts/Load.js
+REQUEST_TIMEOUT_SECONDS = 120.0
+
+
+class RequestCorrelator:
+    """Tracks open uploads and closes them as outcomes arrive
+
+    Requests are keyed by (VU, iteration, filename) when the log carries
+    VU/ITER identity; older logs fall back to first-in-first-out per filename,
+    which is only approximate when several VUs upload the same file at once.
+    Every finished lifecycle is appended to the RecordStore request table.
+    Event times are epoch seconds, parsed once by the caller.
+    """
+
+    def __init__(self, records, scenario):
+        self.records = records
+        self.scenario = scenario
+        self.open = {}
+        self.latest_by_vu = {}
+        self.last_finished = None
+
+    @staticmethod
+    def _key(filename, vu, iteration):
+        return (vu, iteration, filename) if vu is not None else (None, None, filename)
+
+    def start(self, timestamp, filename, size, vu=None, iteration=None, intended=None, user=None):
+        vu, iteration = _int_or_none(vu), _int_or_none(iteration)
+        request = {'filename': filename, 'size': size, 'vu': vu, 'iteration': iteration, 'user': _int_or_none(user),
+                   'attempts': 1, 'body': None, 'index': None, 'start': timestamp, 'prepared': math.nan,
+                   'intended': parse_timestamp(intended) if intended else math.nan}
+        self.open.setdefault(self._key(filename, vu, iteration), deque()).append(request)
+        if vu is not None:
+            self.latest_by_vu[vu] = request
+
+    def prepared(self, timestamp, vu=None, iteration=None):
+        """Mark the VU's current upload as handed to http.post (needs VU identity)"""
+        request = self._current(vu, iteration)
+        if request is not None:
+            request['prepared'] = timestamp
+
+    def _current(self, vu, iteration):
+        """The VU's latest upload if it belongs to this iteration (needs VU identity)"""
+        request = self.latest_by_vu.get(_int_or_none(vu))
+        return request if request is not None and request['iteration'] == _int_or_none(iteration) else None
+
+    def retry(self, attempt, vu=None, iteration=None):
+        """Count a client retry of the VU's current upload (`attempt` is the attempt about to be sent)"""
+        request = self._current(vu, iteration)
+        if request is not None:
+            request['attempts'] = max(request['attempts'], int(attempt))
+
+    def body(self, text, vu=None, iteration=None):
+        """Attach a failed response body, logged either before or after the upload's outcome
+
+        Logs without VU identity print the body right after the outcome, so it
+        goes to the last finished upload.
+        """
+        request = self._current(vu, iteration) if vu is not None else self.last_finished
+        if request is None:
+            return
+        if request['index'] is None:
+            request['body'] = text
+        else:
+            self.records.set_request_signature(request['index'], error_signature(text))
+
+    def ready(self, state, processing, polls, vu=None, iteration=None):
+        """Attach the WAIT_READY outcome ('ready', 'failed' or 'timeout') to the VU's finished upload"""
+        request = self._current(vu, iteration) if vu is not None else self.last_finished
+        if request is not None and request['index'] is not None and state in self.records.READY_STATES:
+            self.records.set_request_ready(request['index'], state, processing, polls)
+
+    def finish(self, state, timestamp, filename, vu=None, iteration=None, status=0, duration=None, message=None):
+        """Close the oldest open upload matching an outcome, returning its start size (or None)"""
+        vu, iteration = _int_or_none(vu), _int_or_none(iteration)
+        pending = self.open.get(self._key(filename, vu, iteration))
+        request = pending.popleft() if pending else {
+            'filename': filename, 'size': None, 'vu': vu, 'iteration': iteration, 'user': None,
+            'attempts': 1, 'body': None, 'index': None, 'start': math.nan, 'prepared': math.nan, 'intended': math.nan}
+        if message is not None:
+            request['body'] = message
+        self.last_finished = request
+        end = timestamp
+        elapsed = end - request['start']
+        if duration is None and not math.isnan(elapsed):
+            duration = elapsed * 1000
+        if state == 'failure' and status == 0 and elapsed >= REQUEST_TIMEOUT_SECONDS * 0.99:
+            state = 'timeout'
+        self._append(request, state, end, status, duration)
+        return request['size']
+
+    def close(self):
+        """Record every upload that never produced an outcome as orphaned"""
+        for pending in self.open.values():
+            for request in pending:
+                self._append(request, 'orphaned', math.nan, 0, None)
+        self.open.clear()
+        self.latest_by_vu.clear()
+        self.last_finished = None
+
+    def _append(self, request, state, end, status, duration):
+        request['index'] = len(self.records.requests['request_state'])
+        self.records.append_request(self.scenario, request['filename'], state, request['vu'],
+                                    request['iteration'], request['start'], request['prepared'], end,
+                                    request['size'], status, duration, request['intended'], request['user'],
+                                    request['attempts'], error_signature(request['body']))
+
+
+def _int_or_none(value):
+    return None if value is None else int(value)
+
+
+def _pearson(xs, ys):
+    n = len(xs)
+    if n < 3:
+        return None
+    mean_x, mean_y = sum(xs) / n, sum(ys) / n
+    cov = sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys))
+    var_x = sum((x - mean_x) ** 2 for x in xs)
+    var_y = sum((y - mean_y) ** 2 for y in ys)
+    if var_x <= 0 or var_y <= 0:
+        return None
+    return cov / math.sqrt(var_x * var_y)
+
+
+def _pearson_numpy(np, xs, ys):
+    n = len(xs)
+    if n < 3:
+        return None
+    dx, dy = xs - xs.sum() / n, ys - ys.sum() / n
+    var_x, var_y = float((dx * dx).sum()), float((dy * dy).sum())
+    if var_x <= 0 or var_y <= 0:
+        return None
+    return float((dx * dy).sum()) / math.sqrt(var_x * var_y)
+
+
+def summarize_requests(records):
+    """Lifecycle states, orphan count, MB/s and size-vs-latency correlation per file type"""
+    if not len(records.requests['request_state']):
+        return {}
+    np = _numpy()
+    if np is not None:
+        return _summarize_requests_numpy(np, records)
+
+    requests = list(records.iter_requests())
+    by_type = {}
+    for request in requests:
+        by_type.setdefault(request['file_type'], []).append(request)
+
+    summary = {'states': Counter(r['state'] for r in requests),
+               'orphaned': sum(1 for r in requests if r['state'] == 'orphaned'),
+               'by_file_type': {}}
+    sized = [(r['size'], r['duration']) for r in requests
+             if r['state'] == 'success' and r['size'] and r['duration']]
+    summary['size_latency_r'] = _pearson([s for s, _ in sized], [d for _, d in sized])
+
+    for file_type, group in by_type.items():
+        done = [r for r in group if r['state'] == 'success' and r['size'] and r['duration']]
+        rates = sorted(r['size'] / r['duration'] / 1000 for r in done)  # bytes/ms -> MB/s
+        total_bytes = sum(r['size'] for r in done)
+        total_ms = sum(r['duration'] for r in done)
+        states = Counter(r['state'] for r in group)
+        summary['by_file_type'][file_type] = {
+            'requests': len(group),
+            'completed': states['success'],
+            'failed': states['failure'],
+            'timeouts': states['timeout'],
+            'errors': states['error'],
+            'orphaned': states['orphaned'],
+            'mb_per_s': total_bytes / total_ms / 1000 if total_ms else None,
+            'median_mb_per_s': rates[len(rates) // 2] if rates else None,
+            'size_latency_r': _pearson([r['size'] for r in done], [r['duration'] for r in done]),
+        }
+    return summary
+
+
+def _summarize_requests_numpy(np, records):
+    """summarize_requests over the request columns: masks and bincounts by a file-type code"""
+    r = records.requests
+    names = records.REQUEST_STATES
+    type_names = []
+    type_of_filename = []
+    for filename in records.categories['filename'].values:
+        file_type = filename.split('.')[-1]
+        if file_type not in type_names:
+            type_names.append(file_type)
+        type_of_filename.append(type_names.index(file_type))
+    filenames = np.frombuffer(r['request_filename'], dtype=r['request_filename'].typecode)
+    types = np.asarray(type_of_filename, dtype=np.int64)[filenames]
+    states = np.frombuffer(r['request_state'], dtype=r['request_state'].typecode).astype(np.int64)
+    sizes = np.frombuffer(r['request_size'], dtype=r['request_size'].typecode).astype('d')
+    durations = np.frombuffer(r['request_duration'], dtype='d')
+
+    n_types, n_states = len(type_names), len(names)
+    counts = np.bincount(types * n_states + states, minlength=n_types * n_states).reshape(n_types, n_states)
+    totals = counts.sum(axis=0)
+    summary = {'states': Counter({names[state]: int(totals[state]) for state in np.flatnonzero(totals).tolist()}),
+               'orphaned': int(totals[names.index('orphaned')]),
+               'by_file_type': {}}
+    # Unknown sizes are -1 and unknown durations NaN; zero values carry no rate either
+    done = (states == names.index('success')) & (sizes > 0) & (durations != 0) & ~np.isnan(durations)
+    done_sizes, done_durations, done_types = sizes[done], durations[done], types[done]
+    summary['size_latency_r'] = _pearson_numpy(np, done_sizes, done_durations)
+
+    total_bytes = np.bincount(done_types, weights=done_sizes, minlength=n_types)
+    total_ms = np.bincount(done_types, weights=done_durations, minlength=n_types)
+    rates = done_sizes / done_durations / 1000  # bytes/ms -> MB/s
+    sorted_rates = rates[np.lexsort((rates, done_types))]   # rates sorted within each file type
+    done_counts = np.bincount(done_types, minlength=n_types)
+    offsets = np.cumsum(done_counts) - done_counts
+
+    # File types in order of first appearance, like the per-request fallback
+    _, first = np.unique(types, return_index=True)
+    for code in types[np.sort(first)].tolist():
+        group = counts[code]
+        done_count, offset = int(done_counts[code]), int(offsets[code])
+        in_done = done_types == code
+        summary['by_file_type'][type_names[code]] = {
+            'requests': int(group.sum()),
+            'completed': int(group[names.index('success')]),
+            'failed': int(group[names.index('failure')]),
+            'timeouts': int(group[names.index('timeout')]),
+            'errors': int(group[names.index('error')]),
+            'orphaned': int(group[names.index('orphaned')]),
+            'mb_per_s': float(total_bytes[code] / total_ms[code] / 1000) if total_ms[code] else None,
+            'median_mb_per_s': float(sorted_rates[offset + done_count // 2]) if done_count else None,
+            'size_latency_r': _pearson_numpy(np, done_sizes[in_done], done_durations[in_done]),
+        }
+    return summary
+
+
+def open_model_sketches(records):
+    """Per-scenario {'service', 'corrected', 'lag'} latency sketches of scheduled uploads (see summarize_open_model)"""
+    r = records.requests
+    scenarios = records.categories['scenario'].values
+    success = records.REQUEST_STATES.index('success')
+    groups = {}
+    for code, state, start, prepared, intended, duration in zip(
+            r['request_scenario'], r['request_state'], r['request_start'], r['request_prepared'],
+            r['request_intended'], r['request_duration']):
+        if state != success or math.isnan(intended) or math.isnan(duration):
+            continue
+        sent = start if math.isnan(prepared) else prepared
+        lag = max(0.0, (sent - intended) * 1000)
+        group = groups.setdefault(scenarios[code], {'service': LatencySketch(), 'corrected': LatencySketch(),
+                                                    'lag': LatencySketch()})
+        group['service'].add(duration)
+        group['corrected'].add(duration + lag)
+        group['lag'].add(lag)
+    return groups
+
+
+def summarize_open_model(records):
+    """Per-scenario latency of scheduled uploads, from the actual send and from the intended start
+
+    Only requests with an intended start (arrival-rate runs) are included. The
+    schedule lag (send time - intended start) is added to each successful upload's
+    own duration, so uploads that went out late because the generator or server
+    was saturated report the wait a real user would have seen, instead of hiding
+    it (coordinated omission).
+    """
+    return {scenario: {name: sketch.summary() for name, sketch in group.items()}
+            for scenario, group in open_model_sketches(records).items()}
+
+
+def summarize_time_to_ready(records):
+    """Per-file-type POST latency, processing latency and total time to ready of WAIT_READY uploads
+
+    Only uploads whose readiness was polled are included. Latencies come from the
+    uploads that became ready, so POST + processing = time to ready per upload;
+    failed and timed-out processing is counted separately.
+    """
+    r = records.requests
+    filenames = records.categories['filename'].values
+    ready = records.READY_STATES.index('ready')
+    groups = {}
+    for filename, state, duration, processing, polls in zip(
+            r['request_filename'], r['request_ready'], r['request_duration'], r['request_processing'],
+            r['request_polls']):
+        if not state:
+            continue
+        group = groups.setdefault(filenames[filename].split('.')[-1], {
+            'post': LatencySketch(), 'processing': LatencySketch(), 'total': LatencySketch(),
+            'states': Counter(), 'polls': 0})
+        group['states'][records.READY_STATES[state]] += 1
+        group['polls'] += polls
+        if state == ready and not math.isnan(duration) and not math.isnan(processing):
+            group['post'].add(duration)
+            group['processing'].add(processing)
+            group['total'].add(duration + processing)
+
+    summary = {}
+    for file_type, group in sorted(groups.items()):
+        measured = sum(group['states'].values())
+        summary[file_type] = {
+            'measured': measured,
+            'ready': group['states']['ready'],
+            'failed': group['states']['failed'],
+            'timeout': group['states']['timeout'],
+            'polls_per_upload': group['polls'] / measured,
+        }
+        for name in ('post', 'processing', 'total'):
+            summary[file_type][name] = group[name].summary() if group[name].count else None
+    return summary
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Per-User Fairness Analysis
+Latency, throughput and errors per bearer token, flagging hot, throttled and unfairly served users
+"""
+
+import math
+
+from latency_sketch import LatencySketch
+from record_store import _numpy
+
+THROTTLE_STATUSES = (429,)
+UNFAIR_P95_RATIO = 3.0      # a user whose p95 exceeds 3x the median user's p95 is served unfairly
+HOT_SHARE_RATIO = 2.0       # a user sending over 2x an even share of the requests is hot
+ERROR_RATE_MARGIN = 10.0    # percentage points above the median user's error rate that flag a user
+MIN_USER_REQUESTS = 5       # users with fewer completed requests are listed but not judged
+MAX_PRINTED_USERS = 10      # text summaries list the slowest users only
+
+
+def _median(values):
+    values = sorted(values)
+    if not values:
+        return None
+    middle = len(values) // 2
+    return values[middle] if len(values) % 2 else (values[middle - 1] + values[middle]) / 2
+
+
+def jain_index(values):
+    """Jain's fairness index: 1.0 when every user gets the same, 1/n when one user gets everything"""
+    total = sum(values)
+    squares = sum(value * value for value in values)
+    return total * total / (len(values) * squares) if squares else None
+
+
+def user_groups(records):
+    """Per-scenario, per-user accumulators over the completed requests that carry a user index"""
+    np = _numpy()
+    if np is not None:
+        return _user_groups_numpy(np, records)
+    r = records.requests
+    scenarios = records.categories['scenario'].values
+    success = records.REQUEST_STATES.index('success')
+    orphaned = records.REQUEST_STATES.index('orphaned')
+    groups = {}
+    for code, user, state, status, start, end, duration in zip(
+            r['request_scenario'], r['request_user'], r['request_state'], r['request_status'],
+            r['request_start'], r['request_end'], r['request_duration']):
+        if user < 0 or state == orphaned:
+            continue
+        scenario = groups.setdefault(scenarios[code], {'users': {}, 'first': math.inf, 'last': -math.inf})
+        group = scenario['users'].setdefault(user, {'requests': 0, 'failures': 0, 'throttled': 0,
+                                                    'latency': LatencySketch()})
+        group['requests'] += 1
+        if state == success:
+            if not math.isnan(duration):
+                group['latency'].add(duration)
+        else:
+            group['failures'] += 1
+            if status in THROTTLE_STATUSES:
+                group['throttled'] += 1
+        for moment in (start, end):
+            if not math.isnan(moment):
+                scenario['first'] = min(scenario['first'], moment)
+                scenario['last'] = max(scenario['last'], moment)
+    return groups
+
+
+def _user_groups_numpy(np, records):
+    """user_groups by bincount over a combined (scenario, user) code; only the sketches are built per user"""
+    r = records.requests
+    scenarios = records.categories['scenario'].values
+
+    def column(name):
+        return np.frombuffer(r[name], dtype=r[name].typecode)
+
+    users = column('request_user').astype(np.int64)
+    state = column('request_state')
+    keep = (users >= 0) & (state != records.REQUEST_STATES.index('orphaned'))
+    if not keep.any():
+        return {}
+    users = users[keep]
+    codes = column('request_scenario')[keep].astype(np.int64)
+    success = state[keep] == records.REQUEST_STATES.index('success')
+    throttled = ~success & np.isin(column('request_status')[keep], THROTTLE_STATUSES)
+    stride = int(users.max()) + 1
+    keys, group = np.unique(codes * stride + users, return_inverse=True)
+    n = len(keys)
+    requests = np.bincount(group, minlength=n)
+    failures = np.bincount(group[~success], minlength=n)
+    throttles = np.bincount(group[throttled], minlength=n)
+    latencies = LatencySketch.grouped(group[success], column('request_duration')[keep][success], n)
+
+    first, last = np.full(len(scenarios), math.inf), np.full(len(scenarios), -math.inf)
+    for name in ('request_start', 'request_end'):
+        np.fmin.at(first, codes, column(name)[keep])   # fmin/fmax skip NaN times
+        np.fmax.at(last, codes, column(name)[keep])
+
+    groups = {}
+    for i, key in enumerate(keys.tolist()):
+        code, user = divmod(key, stride)
+        scenario = groups.setdefault(scenarios[code], {'users': {}, 'first': float(first[code]),
+                                                       'last': float(last[code])})
+        scenario['users'][user] = {'requests': int(requests[i]), 'failures': int(failures[i]),
+                                   'throttled': int(throttles[i]), 'latency': latencies[i]}
+    return groups
+
+
+def summarize_users(records):
+    """Per-scenario user table, fairness index and flags, or {} when the logs carry no user index
+
+    Throughput is successful uploads per second over the whole scenario's span, so
+    users are compared on the same clock. Users are judged against the median
+    user: p95 more than UNFAIR_P95_RATIO times the median p95 is unfair service,
+    an error rate ERROR_RATE_MARGIN points above the median (or any HTTP 429) a
+    throttled or failing user, and over HOT_SHARE_RATIO times an even share of the
+    requests a hot user.
+    """
+    summary = {}
+    for scenario, group in user_groups(records).items():
+        span = group['last'] - group['first'] if group['last'] > group['first'] else None
+        total = sum(user['requests'] for user in group['users'].values())
+        rows = {}
+        for user, accumulator in sorted(group['users'].items()):
+            requests = accumulator['requests']
+            successes = requests - accumulator['failures']
+            row = {
+                'requests': requests,
+                'successes': successes,
+                'failures': accumulator['failures'],
+                'throttled': accumulator['throttled'],
+                'error_rate': accumulator['failures'] / requests * 100,
+                'share': requests / total * 100,
+                'throughput': successes / span if span else None,
+            }
+            latency = accumulator['latency']
+            if latency.count:
+                row.update({'p50': latency.percentile(50), 'p95': latency.percentile(95),
+                            'p99': latency.percentile(99), 'max': float(latency.max)})
+            rows[user] = row
+
+        judged = {user: row for user, row in rows.items() if row['requests'] >= MIN_USER_REQUESTS}
+        median_p95 = _median([row['p95'] for row in judged.values() if 'p95' in row])
+        median_error_rate = _median([row['error_rate'] for row in judged.values()])
+        throughputs = [row['throughput'] for row in rows.values() if row['throughput'] is not None]
+        summary[scenario] = {
+            'users': rows,
+            'median_p95': median_p95,
+            'median_error_rate': median_error_rate,
+            'jain_index': jain_index(throughputs) if throughputs else None,
+            'flags': user_flags(judged, len(rows), median_p95, median_error_rate),
+        }
+    return summary
+
+
+def user_flags(rows, user_count, median_p95, median_error_rate):
+    """(user, kind, message) for every judged user that is throttled, failing, unfairly slow or hot"""
+    flags = []
+    for user, row in rows.items():
+        if row['throttled']:
+            flags.append((user, 'throttled', f"user {user}: {row['throttled']} HTTP 429 responses "
+                                             f"({row['throttled'] / row['requests'] * 100:.1f}% of its requests)"))
+        if median_error_rate is not None and row['error_rate'] >= median_error_rate + ERROR_RATE_MARGIN:
+            flags.append((user, 'errors', f"user {user}: {row['error_rate']:.1f}% failed vs "
+                                          f"{median_error_rate:.1f}% for the median user"))
+        if median_p95 and row.get('p95', 0) > UNFAIR_P95_RATIO * median_p95:
+            flags.append((user, 'unfair', f"user {user}: p95 {row['p95']:,.0f} ms is "
+                                          f"{row['p95'] / median_p95:.1f}x the median user's {median_p95:,.0f} ms"))
+        if user_count > 1 and row['share'] > HOT_SHARE_RATIO * 100 / user_count:
+            flags.append((user, 'hot', f"user {user}: {row['share']:.0f}% of requests, "
+                                       f"{row['share'] * user_count / 100:.1f}x an even share"))
+    return flags
@@ -4,77 +4,42 @@ HTML Load Testing Analytics Dashboard
 Generates an interactive HTML report with charts
 """
 
-import os
-import re
-import json
 from datetime import datetime
-from collections import defaultdict, Counter
-from pathlib import Path
+from collections import Counter
+
+from changepoint import analyze_regime_shifts
+from log_parser import find_log_files, iter_log_partials, merge_data, new_data, parse_any_log
+from latency_sketch import LatencySketch
+from shards import load_shard_manifest, merge_shards
+from svg_charts import bar_chart, doughnut_chart, line_chart
+from timeseries import DEFAULT_WINDOW, build_time_series, lttb, parse_window
+
+MAX_TREND_POINTS = 1000      # points per chart after LTTB downsampling
+MIN_POINTS_PER_SERIES = 100
+HISTOGRAM_BINS = 30
 
 class HTMLAnalyticsDashboard:
-    def __init__(self, logs_directory="../logs"):
+    def __init__(self, logs_directory="../logs", window=DEFAULT_WINDOW):
         self.logs_directory = logs_directory
-        self.data = {
-            'uploads': [],
-            'errors': [],
-            'metrics': {},
-            'scenarios': [],
-            'file_types': defaultdict(int),
-            'response_times': [],
-            'success_count': 0,
-            'failure_count': 0
-        }
+        self.window = window
+        self.data = new_data()
         
     def parse_log_file(self, file_path):
         """Parse a single k6 log file"""
         print(f"📊 Analyzing log file: {file_path}")
         
-        with open(file_path, 'r') as f:
-            content = f.read()
-            
-        # Extract scenario info from filename
-        scenario_match = re.search(r'scenario(\d+)', os.path.basename(file_path))
-        scenario = f"Scenario {scenario_match.group(1)}" if scenario_match else "Unknown"
-        
-        # Parse upload attempts
-        upload_pattern = r'\[DEBUG.*?\] Starting upload of (\S+) \((\d+) bytes\)'
-        uploads = re.findall(upload_pattern, content)
-        
-        # Parse successful uploads
-        success_pattern = r'\[DEBUG.*?\] Upload successful for (\S+), took (\d+)ms, file ID: (\S+)'
-        successes = re.findall(success_pattern, content)
-        
-        # Parse failed uploads
-        failure_pattern = r'\[DEBUG.*?\] Upload FAILED for (\S+): Status (\d+)'
-        failures = re.findall(failure_pattern, content)
-        
-        # Store parsed data
-        for filename, filesize in uploads:
-            self.data['file_types'][filename.split('.')[-1]] += 1
-            
-        for filename, duration, file_id in successes:
-            self.data['uploads'].append({
-                'filename': filename,
-                'duration': int(duration),
-                'status': 'success',
-                'scenario': scenario
-            })
-            self.data['response_times'].append(int(duration))
-            self.data['success_count'] += 1
-            
-        for filename, status_code in failures:
-            self.data['errors'].append({
-                'filename': filename,
-                'status_code': int(status_code),
-                'scenario': scenario
-            })
-            self.data['failure_count'] += 1
-            
-        self.data['scenarios'].append(scenario)
+        parse_any_log(file_path, self.data)
         
-    def analyze_all_logs(self):
-        """Analyze all log files in the logs directory"""
-        log_files = list(Path(self.logs_directory).glob("*.log"))
+    def analyze_all_logs(self, jobs=1):
+        """Analyze all log files in the logs directory, optionally across a process pool"""
+        manifest = load_shard_manifest(self.logs_directory)
+        if manifest:
+            # One run split across shards: merge them on the local clock so the time series line up
+            print(f"🧩 Sharded run: {manifest['count']} shards of {manifest['scenario']}")
+            self.data, _, _ = merge_shards(self.logs_directory, jobs)
+            return
+
+        log_files = find_log_files(self.logs_directory)
         
         if not log_files:
             print(f"❌ No log files found in {self.logs_directory}")
@@ -82,15 +47,16 @@ class HTMLAnalyticsDashboard:
             
         print(f"📁 Found {len(log_files)} log files")
         
-        for log_file in sorted(log_files):
-            try:
-                self.parse_log_file(log_file)
-            except Exception as e:
-                print(f"⚠️  Error parsing {log_file}: {e}")
+        for log_file, partial, metrics_text, error in iter_log_partials(log_files, jobs):
+            print(f"📊 Analyzing log file: {log_file}")
+            if error:
+                print(f"⚠️  Error parsing {log_file}: {error}")
+                continue
+            merge_data(self.data, partial)
                 
     def generate_html_dashboard(self):
         """Generate HTML dashboard"""
-        if not self.data['uploads'] and not self.data['errors']:
+        if not len(self.data['records']):
             print("❌ No data to analyze")
             return
             
@@ -98,12 +64,11 @@ class HTMLAnalyticsDashboard:
         success_rate = (self.data['success_count'] / total_tests) * 100 if total_tests > 0 else 0
         
         # Calculate statistics
-        avg_time = sum(self.data['response_times']) / len(self.data['response_times']) if self.data['response_times'] else 0
+        avg_time = self.data['records'].latency_summary().get('mean', 0)
         
-        # Prepare data for charts
-        file_types_labels = list(self.data['file_types'].keys())
-        file_types_values = list(self.data['file_types'].values())
-        response_times = self.data['response_times'][:50]  # Limit to 50 points for readability
+        # Render charts server-side as inline SVG so the report is self-contained and offline
+        charts = self._generate_svg_charts()
+        regime_shifts = analyze_regime_shifts(self.data['records'])
         
         html_content = f"""<!DOCTYPE html>
 <html lang="en">
@@ -111,7 +76,6 @@ class HTMLAnalyticsDashboard:
     <meta charset="UTF-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
     <title>📊 Load Testing Analytics Dashboard</title>
-    <script src="https://cdn.jsdelivr.net/npm/chart.js"></script>
     <style>
         body {{
             font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
@@ -194,6 +158,21 @@ class HTMLAnalyticsDashboard:
             text-align: center;
         }}
         
+        .shift-table {{
+            width: 100%;
+            border-collapse: collapse;
+        }}
+        
+        .shift-table th, .shift-table td {{
+            padding: 8px 12px;
+            border-bottom: 1px solid #eee;
+            text-align: left;
+        }}
+        
+        .shift-table th {{
+            background: #f8f9fa;
+        }}
+        
         .recommendations {{
             background: #fff3cd;
             border: 1px solid #ffeaa7;
@@ -251,22 +230,37 @@ class HTMLAnalyticsDashboard:
         <div class="charts-section">
             <div class="chart-container">
                 <h3 class="chart-title">📈 Success vs Failure Rate</h3>
-                <canvas id="successChart" width="400" height="200"></canvas>
+                {charts['success']}
             </div>
             
             <div class="chart-container">
                 <h3 class="chart-title">📁 File Types Distribution</h3>
-                <canvas id="fileTypesChart" width="400" height="200"></canvas>
+                {charts['file_types']}
             </div>
             
             <div class="chart-container">
                 <h3 class="chart-title">⏱️ Response Time Trend</h3>
-                <canvas id="responseTimeChart" width="400" height="200"></canvas>
+                {charts['trend']}
+            </div>
+            
+            <div class="chart-container">
+                <h3 class="chart-title">📊 Response Time Distribution</h3>
+                {charts['histogram']}
+            </div>
+            
+            <div class="chart-container">
+                <h3 class="chart-title">🚀 Throughput & Latency ({self.window:g}s windows)</h3>
+                {charts['time_series']}
+            </div>
+            
+            <div class="chart-container">
+                <h3 class="chart-title">🔀 Latency Regime Shifts</h3>
+                {self._generate_html_regime_shifts(regime_shifts)}
             </div>
             
             <div class="recommendations">
                 <h3>💡 Performance Recommendations</h3>
-                {self._generate_html_recommendations()}
+                {self._generate_html_recommendations(regime_shifts)}
             </div>
         </div>
         
@@ -275,72 +269,6 @@ class HTMLAnalyticsDashboard:
         </div>
     </div>
     
-    <script>
-        // Success vs Failure Chart
-        const successCtx = document.getElementById('successChart').getContext('2d');
-        new Chart(successCtx, {{
-            type: 'doughnut',
-            data: {{
-                labels: ['Success', 'Failure'],
-                datasets: [{{
-                    data: [{self.data['success_count']}, {self.data['failure_count']}],
-                    backgroundColor: ['#27ae60', '#e74c3c'],
-                    borderWidth: 2,
-                    borderColor: '#fff'
-                }}]
-            }},
-            options: {{
-                responsive: true,
-                plugins: {{
-                    legend: {{ position: 'bottom' }}
-                }}
-            }}
-        }});
-        
-        // File Types Chart
-        const fileTypesCtx = document.getElementById('fileTypesChart').getContext('2d');
-        new Chart(fileTypesCtx, {{
-            type: 'bar',
-            data: {{
-                labels: {json.dumps(file_types_labels)},
-                datasets: [{{
-                    label: 'Count',
-                    data: {json.dumps(file_types_values)},
-                    backgroundColor: 'rgba(52, 152, 219, 0.8)',
-                    borderColor: 'rgba(52, 152, 219, 1)',
-                    borderWidth: 1
-                }}]
-            }},
-            options: {{
-                responsive: true,
-                scales: {{ y: {{ beginAtZero: true }} }}
-            }}
-        }});
-        
-        // Response Time Trend
-        const responseTimeCtx = document.getElementById('responseTimeChart').getContext('2d');
-        new Chart(responseTimeCtx, {{
-            type: 'line',
-            data: {{
-                labels: {json.dumps(list(range(len(response_times))))},
-                datasets: [{{
-                    label: 'Response Time (ms)',
-                    data: {json.dumps(response_times)},
-                    borderColor: 'rgba(155, 89, 182, 1)',
-                    backgroundColor: 'rgba(155, 89, 182, 0.1)',
-                    borderWidth: 2,
-                    fill: true
-                }}]
-            }},
-            options: {{
-                responsive: true,
-                scales: {{
-                    x: {{ title: {{ display: true, text: 'Upload Sequence' }} }},
-                    y: {{ title: {{ display: true, text: 'Response Time (ms)' }}, beginAtZero: true }}
-                }}
-            }}
-        }});
-    </script>
 </body>
 </html>"""
         
@@ -355,14 +283,77 @@ class HTMLAnalyticsDashboard:
         
         return output_file
         
-    def _generate_html_recommendations(self):
+    def _generate_svg_charts(self):
+        """Inline SVG for every chart, with long series downsampled (LTTB) and latencies pre-binned"""
+        records = self.data['records']
+        charts = {
+            'success': doughnut_chart(['Success', 'Failure'],
+                                      [self.data['success_count'], self.data['failure_count']],
+                                      ['#27ae60', '#e74c3c']),
+            'file_types': bar_chart(list(self.data['file_types'].keys()), list(self.data['file_types'].values()),
+                                    x_label='File Type', y_label='Count'),
+        }
+        
+        scenarios = records.labels('scenario')
+        budget = max(MIN_POINTS_PER_SERIES, MAX_TREND_POINTS // max(len(scenarios), 1))
+        trend = []
+        for scenario in scenarios:
+            epochs, durations = records.success_series(scenario)
+            if epochs:
+                trend.append({'label': scenario, 'points': lttb(list(zip(epochs, durations)), budget)})
+        if trend:
+            charts['trend'] = line_chart(trend, 'Time', 'Response Time (ms)', time_axis=True)
+        else:
+            durations = records.success_durations()
+            charts['trend'] = line_chart([{'label': 'Response Time (ms)', 'color': '#9b59b6',
+                                           'points': lttb(list(enumerate(durations)), MAX_TREND_POINTS)}],
+                                         'Upload Sequence', 'Response Time (ms)')
+        
+        histogram = LatencySketch.merged(records.latency_sketches('scenario').values()).histogram(HISTOGRAM_BINS)
+        charts['histogram'] = bar_chart([f"{low:.0f}" for low, _, _ in histogram], [count for _, _, count in histogram],
+                                        color='#e8a0a0', x_label='Response Time (ms, log bins)', y_label='Frequency',
+                                        tooltips=[f"{low:.0f}–{high:.0f} ms: {count}" for low, high, count in histogram])
+        
+        series = build_time_series(records, self.window)
+        def points(key):
+            return lttb([(row['start'], row[key]) for row in series if row[key] is not None], MAX_TREND_POINTS)
+        charts['time_series'] = line_chart([
+            {'label': 'Completions/s', 'points': points('throughput'), 'color': '#3498db', 'step': True},
+            {'label': 'In-flight', 'points': points('in_flight'), 'color': '#95a5a6', 'step': True},
+            {'label': 'p95 (ms)', 'points': points('p95'), 'color': '#e67e22', 'secondary': True},
+        ], 'Time', 'Requests', 'p95 (ms)', time_axis=True)
+        return charts
+        
+    def _generate_html_regime_shifts(self, regime_shifts):
+        """Generate HTML table of the segments between latency/failure regime shifts"""
+        if not regime_shifts:
+            return "<p>No latency or failure regime shifts detected.</p>"
+            
+        def ms(value):
+            return f"{value:.0f} ms" if value is not None else "n/a"
+            
+        rows = []
+        for scenario, result in regime_shifts.items():
+            shift_kinds = {shift['after']['start']: '+'.join(shift['kinds']) for shift in result['shifts']}
+            for segment in result['segments']:
+                rows.append(
+                    f"<tr><td>{scenario}</td><td>{segment['start']}</td><td>{segment['end']}</td>"
+                    f"<td>{shift_kinds.get(segment['start'], 'start')}</td><td>{segment['requests']}</td>"
+                    f"<td>{ms(segment['p50'])}</td><td>{ms(segment['p95'])}</td>"
+                    f"<td>{segment['error_rate']:.1f}%</td></tr>"
+                )
+                
+        return ("<table class=\"shift-table\"><tr><th>Scenario</th><th>From</th><th>To</th><th>Shift</th>"
+                "<th>Requests</th><th>p50</th><th>p95</th><th>Error Rate</th></tr>" + "".join(rows) + "</table>")
+        
+    def _generate_html_recommendations(self, regime_shifts=None):
         """Generate HTML recommendations"""
         total_tests = self.data['success_count'] + self.data['failure_count']
         if total_tests == 0:
             return "<p>No data available for recommendations.</p>"
             
         success_rate = (self.data['success_count'] / total_tests) * 100
-        avg_time = sum(self.data['response_times']) / len(self.data['response_times']) if self.data['response_times'] else 0
+        avg_time = self.data['records'].latency_summary().get('mean', 0)
         
         recommendations = []
         
@@ -380,8 +371,15 @@ class HTMLAnalyticsDashboard:
         else:
             recommendations.append("⚡ <strong>Good Response Times:</strong> Performance within acceptable range")
             
-        if self.data['errors']:
-            error_codes = Counter([error['status_code'] for error in self.data['errors']])
+        for scenario, result in (regime_shifts or {}).items():
+            for shift in result['shifts']:
+                before, after = shift['before'], shift['after']
+                if (before['p95'] and after['p95'] and after['p95'] > before['p95']) or after['error_rate'] > before['error_rate']:
+                    recommendations.append(f"📉 <strong>Degradation in {scenario}:</strong> {'/'.join(shift['kinds'])} regime shifted at {shift['timestamp']}")
+                    
+        failure_statuses = self.data['records'].failure_statuses()
+        if failure_statuses:
+            error_codes = Counter(failure_statuses)
             if 500 in error_codes:
                 recommendations.append("🔧 <strong>Server Errors (500):</strong> Check PDF conversion process and server resources")
             if 400 in error_codes:
@@ -402,13 +400,15 @@ def main():
     
     parser = argparse.ArgumentParser(description='HTML Load Testing Analytics Dashboard')
     parser.add_argument('-d', '--directory', default='../logs', help='Directory containing log files (default: ../logs)')
+    parser.add_argument('-j', '--jobs', type=int, default=1, help='Parse log files in N worker processes (0 = all cores, default: 1)')
+    parser.add_argument('-w', '--window', type=parse_window, default=DEFAULT_WINDOW, help='Time-series window, e.g. 1s, 10s, 1m (default: 10s)')
     
     args = parser.parse_args()
     
     print("🚀 Starting HTML Dashboard Generation...")
     
-    dashboard = HTMLAnalyticsDashboard(args.directory)
-    dashboard.analyze_all_logs()
+    dashboard = HTMLAnalyticsDashboard(args.directory, args.window)
+    dashboard.analyze_all_logs(args.jobs)
     dashboard.generate_html_dashboard()
     
     print("✅ HTML Dashboard complete!")
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+k6 JSON Output Ingestor
+Streams `k6 run --out json=...` NDJSON (optionally gzipped) into the analyzer model
+"""
+
+import gzip
+import json
+
+from latency_sketch import LatencySketch
+
+JSON_SUFFIXES = ('.json', '.json.gz', '.ndjson', '.ndjson.gz')
+
+# http.post timing phases reported by k6 (http_req_duration = sending + waiting + receiving)
+PHASE_METRICS = {
+    'http_req_blocked': 'blocked',
+    'http_req_connecting': 'connecting',
+    'http_req_tls_handshaking': 'tls_handshaking',
+    'http_req_sending': 'sending',
+    'http_req_waiting': 'waiting',
+    'http_req_receiving': 'receiving',
+    'http_req_duration': 'duration',
+}
+PHASES = tuple(PHASE_METRICS.values())
+UPLOAD_TAG_PREFIX = 'Upload '
+
+
+def is_k6_json(file_path):
+    return str(file_path).endswith(JSON_SUFFIXES)
+
+
+def open_ndjson(file_path):
+    """Open a k6 JSON output file as text, transparently decompressing gzip"""
+    with open(file_path, 'rb') as f:
+        magic = f.read(2)
+    if magic == b'\x1f\x8b':
+        return gzip.open(file_path, 'rt', encoding='utf-8', errors='replace')
+    return open(file_path, 'r', encoding='utf-8', errors='replace')
+
+
+def iter_upload_points(lines):
+    """Yield (phase, filename, status, time, value) for every timing point of an upload request"""
+    for line in lines:
+        # Cheap substring checks skip Metric declarations and unrelated metrics before json.loads
+        if '"Point"' not in line or 'http_req_' not in line or UPLOAD_TAG_PREFIX not in line:
+            continue
+        try:
+            point = json.loads(line)
+        except ValueError:
+            continue
+        phase = PHASE_METRICS.get(point.get('metric'))
+        if phase is None:
+            continue
+        data = point.get('data') or {}
+        tags = data.get('tags') or {}
+        name = tags.get('name') or ''
+        if not name.startswith(UPLOAD_TAG_PREFIX):
+            continue
+        try:
+            status = int(tags.get('status') or 0)
+        except ValueError:
+            status = 0
+        yield phase, name[len(UPLOAD_TAG_PREFIX):], status, data.get('time'), data.get('value')
+
+
+def add_phase_point(phases, file_type, phase, value):
+    by_phase = phases.get(file_type)
+    if by_phase is None:
+        by_phase = phases[file_type] = {p: LatencySketch() for p in PHASES}
+    by_phase[phase].add(value)
+
+
+def merge_phases(phases, other):
+    """Merge a per-file-type phase breakdown into another"""
+    for file_type, by_phase in other.items():
+        for phase, sketch in by_phase.items():
+            target = phases.setdefault(file_type, {p: LatencySketch() for p in PHASES})
+            target[phase].merge(sketch)
+
+
+def parse_k6_json(file_path, data, scenario, records=True):
+    """Stream a k6 NDJSON output into an analyzer data dict
+
+    Every upload request contributes one sketch sample per timing phase, keyed by
+    file type. With records=True each http_req_duration point also becomes an
+    upload outcome (status 200 counts as success). Pass records=False when the
+    console log of the same run is ingested as well, so requests are not counted
+    twice.
+    """
+    phases = data['phases']
+    with open_ndjson(file_path) as f:
+        for phase, filename, status, timestamp, value in iter_upload_points(f):
+            if value is None:
+                continue
+            file_type = filename.split('.')[-1]
+            add_phase_point(phases, file_type, phase, value)
+            if not records or phase != 'duration':
+                continue
+            data['file_types'][file_type] += 1
+            if status == 200:
+                data['records'].append(scenario, filename, True, status, value, timestamp)
+                data['success_count'] += 1
+            else:
+                data['records'].append(scenario, filename, False, status, None, timestamp)
+                data['failure_count'] += 1
+
+    if records:
+        data['scenarios'].append(scenario)
+    return None
+
+
+def summarize_phases(phases):
+    """Per-file-type mean/p50/p95 of each phase and its share of the mean request duration"""
+    summary = {}
+    for file_type, by_phase in phases.items():
+        total = by_phase['duration'].mean()
+        rows = {}
+        for phase in PHASES:
+            sketch = by_phase[phase]
+            if not sketch.count:
+                continue
+            mean = sketch.mean()
+            rows[phase] = {
+                'count': sketch.count,
+                'mean': mean,
+                'p50': sketch.percentile(50),
+                'p95': sketch.percentile(95),
+                'share': (mean / total) * 100 if total else None,
+            }
+        summary[file_type] = rows
+    return summary
@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""
+k6 End-of-Test Summary Parser
+Seeks back from the end of a log to the summary block and parses every metric line
+"""
+
+import os
+import re
+
+SUMMARY_MARKER = b'TOTAL RESULTS'
+TAIL_CHUNK = 64 * 1024
+MAX_TAIL_BYTES = 4 * 1024 * 1024   # give up when the summary is not within the last 4 MiB
+
+METRIC_LINE_RE = re.compile(r'^\s+(?P<name>\S.*?)\.{3,}: (?P<rest>.*)$')
+STAT_RE = re.compile(r'(?P<key>[a-z]+(?:\(\d+(?:\.\d+)?\))?)=(?P<value>\S+)')
+RATE_RE = re.compile(r'^(?P<rate>\d+(?:\.\d+)?)%\s+(?:(?P<matches>\d+) out of (?P<total>\d+)|✓ (?P<ok>\d+)\s+✗ (?P<fail>\d+))')
+COUNTER_RE = re.compile(r'^(?P<count>\d+(?:\.\d+)?)(?: (?P<unit>[a-zA-Z]+))?\s+(?P<rate>\d+(?:\.\d+)?)(?: ?(?P<rate_unit>[a-zA-Z]+))?/s')
+DURATION_PART_RE = re.compile(r'(\d+(?:\.\d+)?)(ms|µs|μs|us|ns|h|m|s)')
+
+DURATION_MS = {'h': 3600000.0, 'm': 60000.0, 's': 1000.0, 'ms': 1.0, 'µs': 1e-3, 'μs': 1e-3, 'us': 1e-3, 'ns': 1e-6}
+DATA_BYTES = {'B': 1, 'kB': 1e3, 'MB': 1e6, 'GB': 1e9, 'TB': 1e12}
+
+
+def parse_duration(text):
+    """k6 duration text ("5.41s", "850ms", "1m2.5s", "120µs") in ms; unitless numbers are returned as-is"""
+    try:
+        return float(text), None
+    except ValueError:
+        pass
+    parts = DURATION_PART_RE.findall(text)
+    if not parts or ''.join(number + unit for number, unit in parts) != text:
+        return None, None
+    return sum(float(number) * DURATION_MS[unit] for number, unit in parts), 'ms'
+
+
+def _stat_key(key):
+    """'p(95)' -> 'p95', 'med' -> 'med'"""
+    return key.replace('(', '').replace(')', '')
+
+
+def parse_metric_line(rest):
+    """Structured values of one metric line (trend, rate, counter or gauge), units normalized
+
+    Trends carry avg/min/med/max/p90/p95/p99 in ms (or raw numbers for unitless
+    custom trends), rates a percentage with matching/total counts, counters a total
+    and per-second rate (data in bytes) and gauges a value with min/max.
+    """
+    rest = rest.strip()
+    if rest.startswith('avg='):
+        stats, unit = {}, None
+        for match in STAT_RE.finditer(rest):
+            value, value_unit = parse_duration(match.group('value'))
+            if value is not None:
+                stats[_stat_key(match.group('key'))] = value
+                unit = unit or value_unit
+        stats['type'] = 'trend'
+        stats['unit'] = unit
+        return stats
+
+    match = RATE_RE.match(rest)
+    if match:
+        if match.group('total') is not None:
+            matches, total = int(match.group('matches')), int(match.group('total'))
+        else:
+            matches = int(match.group('ok'))
+            total = matches + int(match.group('fail'))
+        return {'type': 'rate', 'rate': float(match.group('rate')), 'matches': matches, 'total': total}
+
+    match = COUNTER_RE.match(rest)
+    if match:
+        scale = DATA_BYTES.get(match.group('unit'), 1)
+        rate_scale = DATA_BYTES.get(match.group('rate_unit'), 1)
+        return {'type': 'counter', 'count': float(match.group('count')) * scale,
+                'rate': float(match.group('rate')) * rate_scale,
+                'unit': 'bytes' if match.group('unit') in DATA_BYTES else None}
+
+    tokens = rest.split()
+    if tokens:
+        try:
+            gauge = {'type': 'gauge', 'value': float(tokens[0])}
+        except ValueError:
+            return None
+        for stat in STAT_RE.finditer(rest):
+            try:
+                gauge[_stat_key(stat.group('key'))] = float(stat.group('value'))
+            except ValueError:
+                pass
+        return gauge
+    return None
+
+
+def parse_summary(text):
+    """{metric: values} for every metric line of a k6 summary block
+
+    Sub-metric lines such as `{ expected_response:true }` are keyed under their
+    parent, e.g. `http_req_duration{expected_response:true}`.
+    """
+    metrics = {}
+    parent = None
+    for line in text.splitlines():
+        match = METRIC_LINE_RE.match(line)
+        if not match:
+            continue
+        name = match.group('name').strip()
+        if name.startswith('{'):
+            if parent is None:
+                continue
+            name = parent + name.replace(' ', '')
+        else:
+            parent = name
+        values = parse_metric_line(match.group('rest'))
+        if values is not None:
+            metrics[name] = values
+    return metrics
+
+
+def is_summary_end(line):
+    """The summary block ends at the first non-indented line after it (progress or log output)"""
+    return bool(line.strip()) and not line[0].isspace()
+
+
+def read_summary_block(file_path, max_bytes=MAX_TAIL_BYTES):
+    """Read only the end-of-test summary by seeking backwards from EOF, or None if it is absent"""
+    with open(file_path, 'rb') as f:
+        f.seek(0, os.SEEK_END)
+        end = f.tell()
+        position = end
+        tail = b''
+        found = -1
+        while position > 0 and end - position < max_bytes:
+            step = min(TAIL_CHUNK, position)
+            position -= step
+            f.seek(position)
+            tail = f.read(step) + tail
+            found = tail.rfind(SUMMARY_MARKER)
+            if found >= 0:
+                break
+        if found < 0:
+            return None
+
+    start = tail.rfind(b'\n', 0, found) + 1
+    lines = []
+    for line in tail[start:].decode('utf-8', errors='replace').splitlines(keepends=True):
+        if lines and is_summary_end(line):
+            break
+        lines.append(line)
+    return ''.join(lines)
+
+
+def summarize_file(file_path):
+    """Parsed end-of-test summary of one log, or None when the log has no summary (e.g. aborted runs)"""
+    text = read_summary_block(file_path)
+    return parse_summary(text) if text else None
+
+
+def legacy_metrics(summary):
+    """The flat metrics the analyzer has always reported, derived from a parsed summary"""
+    metrics = {}
+    duration = summary.get('http_req_duration', {})
+    if 'avg' in duration:
+        metrics['avg_duration'] = duration['avg']
+    if 'p95' in duration:
+        metrics['p95_duration'] = duration['p95']
+    if 'http_req_failed' in summary:
+        metrics['failure_rate'] = summary['http_req_failed']['rate']
+    if 'success_rate' in summary:
+        metrics['success_rate'] = summary['success_rate']['rate']
+    requests = summary.get('http_reqs')
+    if requests:
+        metrics['total_requests'] = requests['count']
+        metrics['throughput'] = requests['rate']
+    return metrics
+
+
+def merge_summaries(summaries):
+    """One summary for the concurrent shards of a run
+
+    Counters and rates add up exactly. A gauge's final value (VUs) is summed, but the
+    shards' peaks need not coincide: their summed max is kept only as max_upper_bound
+    and min is dropped. Trends keep their min/max and an avg weighted by each shard's
+    http_reqs; percentiles do not combine and are dropped, so take them from the
+    merged request records instead.
+    """
+    merged = {}
+    weights = [(_stat(summary, 'http_reqs', 'count') or 0) for summary in summaries]
+    for name in {name for summary in summaries for name in summary}:
+        parts = [(summary[name], weight) for summary, weight in zip(summaries, weights) if name in summary]
+        kind = parts[0][0]['type']
+        if kind == 'counter':
+            merged[name] = {'type': 'counter', 'count': sum(p['count'] for p, _ in parts),
+                            'rate': sum(p['rate'] for p, _ in parts), 'unit': parts[0][0].get('unit')}
+        elif kind == 'rate':
+            matches, total = sum(p['matches'] for p, _ in parts), sum(p['total'] for p, _ in parts)
+            merged[name] = {'type': 'rate', 'rate': matches / total * 100 if total else 0.0,
+                            'matches': matches, 'total': total}
+        elif kind == 'gauge':
+            merged[name] = {'type': 'gauge', 'value': sum(p['value'] for p, _ in parts)}
+            if all('max' in p for p, _ in parts):
+                merged[name]['max_upper_bound'] = sum(p['max'] for p, _ in parts)
+        else:
+            trend = {'type': 'trend', 'unit': parts[0][0].get('unit')}
+            if all('min' in p for p, _ in parts):
+                trend['min'] = min(p['min'] for p, _ in parts)
+            if all('max' in p for p, _ in parts):
+                trend['max'] = max(p['max'] for p, _ in parts)
+            total = sum(weight for _, weight in parts)
+            if total and all('avg' in p for p, _ in parts):
+                trend['avg'] = sum(p['avg'] * weight for p, weight in parts) / total
+            merged[name] = trend
+    return merged
+
+
+def _stat(summary, metric, key):
+    return (summary.get(metric) or {}).get(key)
+
+
+def _fmt(value, digits=0, suffix=''):
+    return "n/a" if value is None else f"{value:,.{digits}f}{suffix}"
+
+
+def print_fleet_summary(summaries, elapsed):
+    """One line per log from the parsed summaries, plus fleet-wide totals"""
+    print("\n" + "=" * 60)
+    print("📋 END-OF-TEST SUMMARIES")
+    print("=" * 60)
+    print(f"{'Log':40} {'Reqs':>6} {'Fail %':>7} {'avg ms':>8} {'p95 ms':>8} {'TTFB p95':>9} {'upload p95':>11} {'iter avg':>9}")
+    requests = failures = 0
+    p95s = []
+    for file_path, summary in summaries:
+        name = os.path.basename(str(file_path))[:40]
+        if summary is None:
+            print(f"{name:40} (no end-of-test summary)")
+            continue
+        count = _stat(summary, 'http_reqs', 'count')
+        failed = summary.get('http_req_failed')
+        p95 = _stat(summary, 'http_req_duration', 'p95')
+        if count:
+            requests += count
+        if failed:
+            failures += failed['matches']
+        if p95 is not None:
+            p95s.append(p95)
+        print(f"{name:40} {_fmt(count):>6} {_fmt(failed and failed['rate'], 1):>7} "
+              f"{_fmt(_stat(summary, 'http_req_duration', 'avg')):>8} {_fmt(p95):>8} "
+              f"{_fmt(_stat(summary, 'time_to_first_byte', 'p95')):>9} "
+              f"{_fmt(_stat(summary, 'upload_duration', 'p95')):>11} "
+              f"{_fmt(_stat(summary, 'iteration_duration', 'avg')):>9}")
+
+    parsed = sum(1 for _, summary in summaries if summary is not None)
+    print(f"\n📊 {parsed}/{len(summaries)} logs with a summary, {requests:,.0f} requests, "
+          f"failure rate {_fmt(failures / requests * 100 if requests else None, 2, '%')}")
+    if p95s:
+        p95s.sort()
+        print(f"⏱️  Per-log http_req_duration p95: min {p95s[0]:,.0f} ms, "
+              f"median {p95s[len(p95s) // 2]:,.0f} ms, max {p95s[-1]:,.0f} ms")
+    if summaries:
+        print(f"⚡ Read {len(summaries)} summaries in {elapsed * 1000:.1f} ms "
+              f"({elapsed * 1000 / len(summaries):.2f} ms per log)")
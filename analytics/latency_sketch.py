@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+Latency Sketch
+Mergeable log-bucketed histogram for latency percentiles with bounded relative error
+"""
+
+import math
+
+DEFAULT_RELATIVE_ACCURACY = 0.01
+DEFAULT_MAX_BUCKETS = 2048
+
+
+class LatencySketch:
+    """Fixed-memory latency histogram whose percentiles are within a relative error of the true values
+
+    Positive values land in logarithmic buckets of width (1 + a) / (1 - a), so any
+    reported percentile is within a fraction a of an actually observed sample.
+    Sketches built with the same accuracy merge exactly by adding bucket counts,
+    which lets per-file, per-scenario and per-window sketches be combined without
+    keeping the raw samples. Count, sum, min and max are tracked exactly.
+    """
+
+    def __init__(self, relative_accuracy=DEFAULT_RELATIVE_ACCURACY, max_buckets=DEFAULT_MAX_BUCKETS):
+        if not 0 < relative_accuracy < 1:
+            raise ValueError("relative_accuracy must be between 0 and 1")
+        self.relative_accuracy = relative_accuracy
+        self.max_buckets = max_buckets
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.buckets = {}
+        self.zero_count = 0
+        self.count = 0
+        self.sum = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def __len__(self):
+        return self.count
+
+    def bucket_index(self, value):
+        return int(math.ceil(math.log(value) / self._log_gamma))
+
+    def bucket_value(self, index):
+        """Representative value of a bucket (the point of least relative error)"""
+        return 2.0 * self.gamma ** index / (self.gamma + 1)
+
+    def add(self, value, count=1):
+        """Record a latency sample (NaN is ignored)"""
+        if value != value:
+            return
+        if value > 0:
+            index = self.bucket_index(value)
+            self.buckets[index] = self.buckets.get(index, 0) + count
+            if len(self.buckets) > self.max_buckets:
+                self._collapse()
+        else:
+            self.zero_count += count
+        self.count += count
+        self.sum += value * count
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def add_many(self, values):
+        """Record a batch of samples, bucketing with numpy when it is installed"""
+        try:
+            import numpy as np
+        except ImportError:
+            np = None
+
+        if np is None:
+            for value in values:
+                self.add(value)
+            return self
+
+        values = np.asarray(values, dtype='d')
+        values = values[~np.isnan(values)]
+        if not len(values):
+            return self
+        positive = values[values > 0]
+        if len(positive):
+            indexes, counts = np.unique(np.ceil(np.log(positive) / self._log_gamma).astype(np.int64),
+                                        return_counts=True)
+            self.add_counts(indexes.tolist(), counts.tolist())
+        self.zero_count += int(len(values) - len(positive))
+        self.count += int(len(values))
+        self.sum += float(values.sum())
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+        return self
+
+    def add_counts(self, indexes, counts):
+        """Add pre-bucketed counts (bucket index -> count) without touching count/sum/min/max"""
+        buckets = self.buckets
+        for index, count in zip(indexes, counts):
+            buckets[index] = buckets.get(index, 0) + count
+        while len(buckets) > self.max_buckets:
+            self._collapse()
+
+    def _collapse(self):
+        """Fold the lowest bucket into its neighbour to stay within max_buckets"""
+        low, high = sorted(self.buckets)[:2]
+        self.buckets[high] += self.buckets.pop(low)
+
+    def merge(self, other):
+        """Add every sample of another sketch into this one"""
+        if other.gamma != self.gamma:
+            raise ValueError("Cannot merge sketches with different relative accuracy")
+        self.add_counts(other.buckets.keys(), other.buckets.values())
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self.sum += other.sum
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    @classmethod
+    def merged(cls, sketches, relative_accuracy=DEFAULT_RELATIVE_ACCURACY):
+        """A new sketch holding the union of several sketches"""
+        result = cls(relative_accuracy)
+        for sketch in sketches:
+            result.merge(sketch)
+        return result
+
+    @classmethod
+    def grouped(cls, codes, values, groups):
+        """One sketch per group code 0..groups-1 from parallel numpy arrays (sorts once, then slices per group)"""
+        import numpy as np
+
+        order = np.argsort(codes, kind='stable')
+        bounds = np.searchsorted(codes[order], np.arange(groups + 1))
+        values = values[order]
+        return [cls().add_many(values[bounds[i]:bounds[i + 1]]) for i in range(groups)]
+
+    def mean(self):
+        return self.sum / self.count if self.count else None
+
+    def percentile(self, q):
+        """Estimated q-th percentile (0-100), or None for an empty sketch"""
+        if not self.count:
+            return None
+        if q <= 0:
+            return float(self.min)
+        if q >= 100:
+            return float(self.max)
+        rank = q / 100.0 * (self.count - 1)
+        seen = self.zero_count
+        if rank < seen:
+            return float(self.min)
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen > rank:
+                return float(min(max(self.bucket_value(index), self.min), self.max))
+        return float(self.max)
+
+    def histogram(self, bins=30):
+        """Pre-binned distribution: [(low, high, count)] over log-spaced bins between min and max"""
+        if not self.count:
+            return []
+        low, high = max(self.min, 1e-9), max(self.max, 1e-9)
+        if high <= low:
+            return [(float(self.min), float(self.max), self.count)]
+        ratio = (high / low) ** (1.0 / bins)
+        edges = [low * ratio ** i for i in range(bins + 1)]
+        counts = [0] * bins
+        counts[0] += self.zero_count
+        log_low, log_ratio = math.log(low), math.log(ratio)
+        for index, count in self.buckets.items():
+            value = min(max(self.bucket_value(index), low), high)
+            counts[min(int((math.log(value) - log_low) / log_ratio), bins - 1)] += count
+        return [(edges[i], edges[i + 1], counts[i]) for i in range(bins)]
+
+    def summary(self):
+        """count/mean/median/min/max/p95/p99 of the recorded samples"""
+        if not self.count:
+            return {}
+        return {
+            'count': self.count,
+            'mean': self.mean(),
+            'median': self.percentile(50),
+            'min': float(self.min),
+            'max': float(self.max),
+            'p95': self.percentile(95),
+            'p99': self.percentile(99),
+        }
+
+    def to_dict(self):
+        """JSON-serialisable form (bucket keys become strings)"""
+        return {
+            'relative_accuracy': self.relative_accuracy,
+            'buckets': {str(index): count for index, count in sorted(self.buckets.items())},
+            'zero_count': self.zero_count,
+            'count': self.count,
+            'sum': self.sum,
+            'min': self.min if self.count else None,
+            'max': self.max if self.count else None,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        sketch = cls(data.get('relative_accuracy', DEFAULT_RELATIVE_ACCURACY))
+        sketch.add_counts([int(index) for index in data['buckets']], list(data['buckets'].values()))
+        sketch.zero_count = data.get('zero_count', 0)
+        sketch.count = data['count']
+        sketch.sum = data['sum']
+        if sketch.count:
+            sketch.min = data['min']
+            sketch.max = data['max']
+        return sketch
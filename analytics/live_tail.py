@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+"""
+Live Log Tail
+Follows a k6 log while the test is running and keeps rolling-window metrics
+"""
+
+import os
+import re
+import sys
+import time
+from collections import deque
+from pathlib import Path
+
+from latency_sketch import LatencySketch
+from log_parser import iter_log_events, scenario_from_path, SCENARIO_RE
+from record_store import parse_timestamp
+
+DEFAULT_REFRESH = 5.0
+MAX_WINDOW_EVENTS = 100000
+READ_CHUNK = 1 << 16
+
+THRESHOLDS_BLOCK_RE = re.compile(r'thresholds\s*:\s*\{')
+# Sub-metric keys carry their own braces and spaces, e.g. 'http_req_duration{expected_response:true}'
+THRESHOLD_METRIC_RE = re.compile(r'''(?:'([^']+)'|"([^"]+)"|([\w.]+))\s*:\s*\[([^\]]*)\]''')
+THRESHOLD_EXPR_RE = re.compile(r'^(p\(\d+(?:\.\d+)?\)|avg|med|min|max|rate|count)\s*(<=|>=|==|<|>)\s*(\d+(?:\.\d+)?)$')
+
+COMPARISONS = {
+    '<': lambda a, b: a < b,
+    '<=': lambda a, b: a <= b,
+    '>': lambda a, b: a > b,
+    '>=': lambda a, b: a >= b,
+    '==': lambda a, b: a == b,
+}
+
+
+def _balanced_block(text, start):
+    """Text between the '{' before `start` and its matching '}', skipping quoted strings and // comments"""
+    depth = 1
+    i = start
+    while i < len(text):
+        char = text[i]
+        if char in '\'"`':
+            end = text.find(char, i + 1)
+            while end > 0 and text[end - 1] == '\\':
+                end = text.find(char, end + 1)
+            i = end if end > 0 else len(text)
+        elif text.startswith('//', i):
+            end = text.find('\n', i)
+            i = end if end > 0 else len(text)
+        elif char == '{':
+            depth += 1
+        elif char == '}':
+            depth -= 1
+            if not depth:
+                return text[start:i]
+        i += 1
+    return text[start:]
+
+
+def parse_thresholds(script_text):
+    """Extract k6 thresholds ({metric: ['p(95)<20000', ...]}) from a scenario script"""
+    block = THRESHOLDS_BLOCK_RE.search(script_text)
+    if not block:
+        return []
+    body = re.sub(r'//[^\n]*', '', _balanced_block(script_text, block.end()))
+    thresholds = []
+    for single, double, bare, expressions in THRESHOLD_METRIC_RE.findall(body):
+        metric = single or double or bare
+        for expression in re.findall(r'''['"]([^'"]+)['"]''', expressions):
+            match = THRESHOLD_EXPR_RE.match(expression.replace(' ', ''))
+            if match:
+                stat, op, limit = match.groups()
+                thresholds.append({'metric': metric, 'expression': expression,
+                                   'stat': stat, 'op': op, 'limit': float(limit)})
+    return thresholds
+
+
+def find_scenario_script(log_path, scenarios_directory="../scenarios"):
+    """Scenario script that produced a log, matched on its scenario number"""
+    match = SCENARIO_RE.search(os.path.basename(str(log_path)))
+    if not match:
+        return None
+    scripts = sorted(Path(scenarios_directory).glob(f"scenario{match.group(1)}_*.js"))
+    return scripts[0] if scripts else None
+
+
+class LogFollower:
+    """Reads only the bytes appended to a log since the previous poll"""
+
+    def __init__(self, path):
+        self.path = path
+        self.offset = 0
+        self.partial = b''
+
+    def poll(self):
+        """Complete new lines written since the last call (restarts if the file was truncated)"""
+        try:
+            size = os.path.getsize(self.path)
+        except OSError:
+            return []
+        if size < self.offset:
+            self.offset = 0
+            self.partial = b''
+        if size == self.offset:
+            return []
+
+        with open(self.path, 'rb') as f:
+            f.seek(self.offset)
+            chunks = []
+            while True:
+                chunk = f.read(READ_CHUNK)
+                if not chunk:
+                    break
+                chunks.append(chunk)
+            self.offset = f.tell()
+
+        data = self.partial + b''.join(chunks)
+        lines = data.split(b'\n')
+        self.partial = lines.pop()
+        return [line.decode('utf-8', errors='replace') + '\n' for line in lines]
+
+
+class RollingWindow:
+    """Upload outcomes of the last `window` seconds (bounded) plus whole-run totals"""
+
+    def __init__(self, window):
+        self.window = window
+        self.events = deque(maxlen=MAX_WINDOW_EVENTS)  # (time, ok, duration)
+        self.starts = deque(maxlen=MAX_WINDOW_EVENTS)
+        self.total_latency = LatencySketch()
+        self.total_successes = 0
+        self.total_failures = 0
+        self.latest = None
+        self.latest_wall = None
+
+    def _now(self, timestamp):
+        epoch = parse_timestamp(timestamp)
+        if epoch != epoch:
+            epoch = time.time()
+        if self.latest is None or epoch >= self.latest:
+            self.latest = epoch
+            self.latest_wall = time.time()
+        return epoch
+
+    def add_start(self, timestamp):
+        self.starts.append(self._now(timestamp))
+
+    def add_outcome(self, timestamp, ok, duration=None):
+        self.events.append((self._now(timestamp), ok, duration))
+        if ok:
+            self.total_successes += 1
+            self.total_latency.add(duration)
+        else:
+            self.total_failures += 1
+
+    def _expire(self):
+        if self.latest is None:
+            return
+        # Log time keeps advancing with the wall clock while nothing is logged (a stalled run)
+        cutoff = self.latest + (time.time() - self.latest_wall) - self.window
+        while self.events and self.events[0][0] <= cutoff:
+            self.events.popleft()
+        while self.starts and self.starts[0] <= cutoff:
+            self.starts.popleft()
+
+    def snapshot(self):
+        """Rolling-window metrics in the form the threshold checks expect"""
+        self._expire()
+        latency = LatencySketch().add_many([d for _, ok, d in self.events if ok])
+        requests = len(self.events)
+        failures = sum(1 for _, ok, _ in self.events if not ok)
+        return {
+            'requests': requests,
+            'starts': len(self.starts),
+            'failures': failures,
+            'success_rate': (requests - failures) / requests if requests else None,
+            'failure_rate': failures / requests if requests else None,
+            'throughput': requests / self.window,
+            'latency': latency,
+        }
+
+
+def _threshold_value(threshold, snapshot):
+    """Current value of the statistic a threshold checks (None if it cannot be measured from the log)"""
+    metric, stat = threshold['metric'], threshold['stat']
+    if metric in ('http_req_duration', 'upload_duration'):
+        latency = snapshot['latency']
+        if stat.startswith('p('):
+            return latency.percentile(float(stat[2:-1]))
+        if stat == 'avg':
+            return latency.mean()
+        if stat == 'med':
+            return latency.percentile(50)
+        if stat in ('min', 'max') and latency.count:
+            return float(getattr(latency, stat))
+        return None
+    if metric == 'http_req_failed' and stat == 'rate':
+        return snapshot['failure_rate']
+    if metric == 'success_rate' and stat == 'rate':
+        return snapshot['success_rate']
+    return None
+
+
+def evaluate_thresholds(thresholds, snapshot):
+    """[(threshold, value, passed)] for every threshold measurable from the rolling window"""
+    results = []
+    for threshold in thresholds:
+        value = _threshold_value(threshold, snapshot)
+        if value is not None:
+            results.append((threshold, value, COMPARISONS[threshold['op']](value, threshold['limit'])))
+    return results
+
+
+def render_view(log_path, rolling, snapshot, results, finished=False):
+    """Terminal view of the rolling metrics and threshold status"""
+    latency = snapshot['latency']
+    total = rolling.total_successes + rolling.total_failures
+    lines = [
+        f"📡 LIVE: {scenario_from_path(log_path)} ({os.path.basename(str(log_path))})",
+        "=" * 60,
+        f"🕒 Rolling window: {rolling.window:g}s" + ("  [run finished]" if finished else ""),
+        f"   Completed: {snapshot['requests']}  Started: {snapshot['starts']}  "
+        f"Throughput: {snapshot['throughput']:.2f} req/s",
+    ]
+    if snapshot['success_rate'] is not None:
+        lines.append(f"   Success rate: {snapshot['success_rate'] * 100:.1f}%")
+    if latency.count:
+        lines.append(f"   Latency p50: {latency.percentile(50):.0f} ms  p95: {latency.percentile(95):.0f} ms")
+    lines.append(f"📊 Whole run: {total} requests, {rolling.total_failures} failed"
+                 + (f", p95 {rolling.total_latency.percentile(95):.0f} ms" if rolling.total_latency.count else ""))
+
+    if results:
+        lines.append("🎯 Thresholds (rolling window):")
+        for threshold, value, passed in results:
+            shown = f"{value:.3f}" if threshold['stat'] == 'rate' else f"{value:.0f}"
+            status = "✅ ok" if passed else "🚨 BREACHED"
+            lines.append(f"   {threshold['metric']} {threshold['expression']}: {shown} {status}")
+    breached = [t for t, _, passed in results if not passed]
+    if breached:
+        lines.append(f"⚠️  {len(breached)} threshold(s) breached - consider aborting the run")
+    return "\n".join(lines)
+
+
+def follow_log(log_path, window, refresh=DEFAULT_REFRESH, thresholds=None, out=sys.stdout):
+    """Tail a growing k6 log until its end-of-test summary appears (or Ctrl+C)"""
+    follower = LogFollower(log_path)
+    rolling = RollingWindow(window)
+    thresholds = thresholds or []
+    interactive = out.isatty()
+    finished = False
+
+    try:
+        while not finished:
+            for kind, groups in iter_log_events(follower.poll()):
+                if kind == 'start':
+                    rolling.add_start(groups[0])
+                elif kind == 'success':
+                    rolling.add_outcome(groups[0], True, int(groups[2]))
+                elif kind in ('failure', 'error'):
+                    rolling.add_outcome(groups[0], False)
+                elif kind == 'summary':
+                    finished = True
+
+            snapshot = rolling.snapshot()
+            view = render_view(log_path, rolling, snapshot, evaluate_thresholds(thresholds, snapshot), finished)
+            out.write(("\033[2J\033[H" if interactive else "\n") + view + "\n")
+            out.flush()
+            if not finished:
+                time.sleep(refresh)
+    except KeyboardInterrupt:
+        pass
+    return rolling
@@ -0,0 +1,930 @@
+#!/usr/bin/env python3
+"""
+Python Load Generator
+asyncio re-implementation of the scripts/Load.js uploads with VU and arrival-rate executors
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import random
+import re
+import ssl
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from urllib.parse import quote, urlsplit
+
+from correlation import REQUEST_TIMEOUT_SECONDS, open_model_sketches
+from k6_json import add_phase_point
+from k6_summary import parse_duration
+from log_parser import new_data, scenario_from_path
+from taxonomy import error_signature, summarize_goodput
+
+LOAD_SCRIPT = "../scripts/Load.js"
+TEST_FILES_DIRECTORY = "../test_files"
+DEFAULT_BASE_URL = 'https://axxessio.wyswyg.in/api/v1'
+UPLOAD_PATH = '/files/?type=chat'
+HEALTH_PATH = '/files/'
+DEFAULT_USER_AGENT = 'K6LoadTest/1.0'
+DEFAULT_MAX_VUS = 1000
+GRACEFUL_STOP_SECONDS = 30.0
+RETRY_STATUSES = (0, 429, 502, 503, 504)   # RETRY_STATUSES default in Load.js
+RETRY_BASE_SECONDS = 0.5
+RETRY_CAP_SECONDS = 10.0
+MAX_LOGGED_BODY = 512
+READY_PATH = '/files/{id}/process/status'   # WAIT_READY settings in Load.js
+READY_POLL_SECONDS = 0.25
+READY_POLL_MAX_SECONDS = 5.0
+READY_TIMEOUT_SECONDS = 300.0
+READY_STATES = ('completed', 'complete', 'ready', 'processed', 'success')
+FAILED_STATES = ('failed', 'error')
+CONTROL_INTERVAL = 0.1    # seconds between VU ramping adjustments
+ARRIVAL_TICK = 0.005      # seconds between arrival-rate scheduling passes
+BOUNDARY = '----LoadGenFormBoundary7MA4YWxkTrZu0gW'
+
+CONTENT_TYPES = {
+    'txt': 'text/plain',
+    'docx': 'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
+    'pptx': 'application/vnd.openxmlformats-officedocument.presentationml.presentation',
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+    'pdf': 'application/pdf',
+}
+
+# Same groups as the getRandom*File() helpers in Load.js
+FILE_GROUPS = {
+    'text': ('very-small-10KB.txt', 'small-100KB.txt', 'medium-1MB.txt'),
+    'word': ('document-50KB.docx', 'document-100KB.docx'),
+    'powerpoint': ('presentation-50KB.pptx', 'presentation-100KB.pptx'),
+    'excel': ('spreadsheet-50KB.xlsx', 'spreadsheet-100KB.xlsx'),
+    'pdf': ('Data Science.pdf', 'Software Development Engineer.pdf', 'Resume.pdf', 'Cyber-Security.pdf'),
+}
+ALL_FILES = tuple(name for group in FILE_GROUPS.values() for name in group)
+
+TOKENS_RE = re.compile(r'USER_TOKENS\s*=\s*\[(.*?)\]', re.S)
+QUOTED_RE = re.compile(r"""['"]([^'"]+)['"]""")
+BASE_URL_RE = re.compile(r"""API_BASE_URL\s*=\s*(?:__ENV\.API_BASE_URL\s*\|\|\s*)?['"]([^'"]+)['"]""")
+DEFAULT_FUNCTION_RE = re.compile(r'export default (?:async )?function\s*\(\)\s*\{(.*?)\n\}', re.S)
+CALL_RE = re.compile(r'\b(\w+)\s*\(')
+SLEEP_RE = re.compile(r'\bsleep\((\d+(?:\.\d+)?)\)')
+STAGES_RE = re.compile(r'\bstages\s*:\s*\[(.*?)\]', re.S)
+STAGE_RE = re.compile(r"""duration\s*:\s*['"]([^'"]+)['"]\s*,\s*target\s*:\s*(\d+)""")
+VUS_RE = re.compile(r'\bvus\s*:\s*(\d+)')
+DURATION_RE = re.compile(r"""\bduration\s*:\s*['"]([^'"]+)['"]""")
+USER_AGENT_RE = re.compile(r"""\buserAgent\s*:\s*['"]([^'"]+)['"]""")
+EXECUTOR_RE = re.compile(r"""\bexecutor\s*:\s*['"](constant|ramping)-arrival-rate['"]""")
+RATE_RE = re.compile(r'\brate\s*:\s*(\d+(?:\.\d+)?)')
+START_RATE_RE = re.compile(r'\bstartRate\s*:\s*(\d+(?:\.\d+)?)')
+TIME_UNIT_RE = re.compile(r"""\btimeUnit\s*:\s*['"]([^'"]+)['"]""")
+MAX_VUS_RE = re.compile(r'\bmaxVUs\s*:\s*(\d+)')
+
+
+# --- Scenario behaviours (mirroring the exported functions of Load.js) -------
+# Each returns (action, filename, think time in ms); action is 'upload', 'health' or 'browse'
+
+def _office_file(rng):
+    return rng.choice(FILE_GROUPS[rng.choice(('word', 'powerpoint', 'excel'))])
+
+
+def basic_concurrent_upload(vu, iteration, rng):
+    return 'upload', 'small-100KB.txt', rng.randint(1000, 2000)
+
+
+def gradual_user_scaling(vu, iteration, rng):
+    return 'upload', rng.choice(ALL_FILES), rng.randint(8000, 12000)
+
+
+def realistic_office_pattern(vu, iteration, rng):
+    if vu <= 2:
+        name = 'medium-1MB.txt'
+    elif vu <= 7:
+        name = rng.choice(('medium-1MB.txt', 'small-100KB.txt'))
+    else:
+        name = rng.choice(('small-100KB.txt', 'very-small-10KB.txt'))
+    return 'upload', name, rng.randint(1000, 3000)
+
+
+def burst_upload_activity(vu, iteration, rng):
+    return 'upload', 'medium-1MB.txt', rng.randint(500, 1500)
+
+
+def large_file_handling(vu, iteration, rng):
+    return 'upload', 'small-100KB.txt', rng.randint(8000, 12000)
+
+
+def mixed_operations(vu, iteration, rng):
+    if vu <= 5:
+        return 'upload', rng.choice(ALL_FILES), rng.randint(2000, 5000)
+    if vu <= 7:
+        return 'health', None, rng.randint(3000, 8000)
+    return 'browse', None, rng.randint(5000, 15000)
+
+
+def network_variance(vu, iteration, rng):
+    if vu <= 3:
+        delay = rng.randint(500, 1500)
+    elif vu <= 7:
+        delay = rng.randint(2000, 5000)
+    else:
+        delay = rng.randint(8000, 15000)
+    return 'upload', 'small-100KB.txt', delay
+
+
+def maximum_capacity(vu, iteration, rng):
+    return 'upload', 'medium-1MB.txt', rng.randint(1000, 2000)
+
+
+def mixed_file_types_with_longer_delays(vu, iteration, rng):
+    name = rng.choice(FILE_GROUPS['pdf']) if rng.random() < 0.5 else _office_file(rng)
+    return 'upload', name, rng.randint(8000, 12000)
+
+
+def office_document_test(vu, iteration, rng):
+    return 'upload', _office_file(rng), rng.randint(6000, 10000)
+
+
+def all_document_types_test(vu, iteration, rng):
+    group = rng.choice(('text', 'word', 'powerpoint', 'excel'))
+    return 'upload', rng.choice(FILE_GROUPS[group]), rng.randint(5000, 12000)
+
+
+def document_upload_stress_test(vu, iteration, rng):
+    name = rng.choice(FILE_GROUPS['pdf']) if iteration % 2 == 0 else _office_file(rng)
+    return 'upload', name, rng.randint(4000, 8000)
+
+
+def pdf_only_upload(vu, iteration, rng):
+    return 'upload', rng.choice(FILE_GROUPS['pdf']), rng.randint(500, 1500)
+
+
+def small_file_test(vu, iteration, rng):
+    return 'upload', 'very-small-10KB.txt', rng.randint(1000, 3000)
+
+
+def medium_file_test(vu, iteration, rng):
+    return 'upload', 'small-100KB.txt', rng.randint(2000, 5000)
+
+
+def large_file_test(vu, iteration, rng):
+    return 'upload', 'medium-1MB.txt', rng.randint(3000, 8000)
+
+
+def text_file_test(vu, iteration, rng):
+    return 'upload', rng.choice(FILE_GROUPS['text']), rng.randint(2000, 6000)
+
+
+def arrival_rate_upload(vu, iteration, rng):
+    return 'upload', rng.choice(ALL_FILES), 0
+
+
+BEHAVIORS = {
+    'basicConcurrentUpload': basic_concurrent_upload,
+    'gradualUserScaling': gradual_user_scaling,
+    'realisticOfficePattern': realistic_office_pattern,
+    'burstUploadActivity': burst_upload_activity,
+    'largeFileHandling': large_file_handling,
+    'mixedOperations': mixed_operations,
+    'networkVariance': network_variance,
+    'maximumCapacity': maximum_capacity,
+    'mixedFileTypesWithLongerDelays': mixed_file_types_with_longer_delays,
+    'officeDocumentTest': office_document_test,
+    'allDocumentTypesTest': all_document_types_test,
+    'documentUploadStressTest': document_upload_stress_test,
+    'pdfOnlyUpload': pdf_only_upload,
+    'smallFileTest': small_file_test,
+    'mediumFileTest': medium_file_test,
+    'largeFileTest': large_file_test,
+    'textFileTest': text_file_test,
+    'arrivalRateUpload': arrival_rate_upload,
+}
+
+
+# --- Script and fixture loading -------------------------------------------
+
+def _seconds(text):
+    value, unit = parse_duration(text)
+    if value is None:
+        raise ValueError(f"Invalid duration '{text}' (expected e.g. 30s, 1m, 1m30s)")
+    return value / 1000 if unit == 'ms' else value
+
+
+def load_script_settings(load_script=LOAD_SCRIPT):
+    """User tokens and API base URL from scripts/Load.js"""
+    with open(load_script, 'r') as f:
+        text = f.read()
+    tokens_block = TOKENS_RE.search(text)
+    tokens = QUOTED_RE.findall(tokens_block.group(1)) if tokens_block else []
+    base_url = BASE_URL_RE.search(text)
+    return tokens, base_url.group(1) if base_url else DEFAULT_BASE_URL
+
+
+def scenario_profile(script_file):
+    """Behaviour, load profile and pauses of a scenario script
+
+    Returns {'behavior', 'stages': [(seconds, target VUs)], 'start_vus',
+    'post_sleep' (seconds slept after each iteration), 'user_agent', 'arrival'};
+    'arrival' is None for closed-model scripts, else {'stages': [(seconds,
+    iterations/s)], 'start_rate', 'max_vus'} from an arrival-rate executor.
+    """
+    with open(script_file, 'r') as f:
+        text = f.read()
+    body = DEFAULT_FUNCTION_RE.search(text)
+    body = body.group(1) if body else ''
+    behavior = next((name for name in CALL_RE.findall(body) if name in BEHAVIORS), None)
+    if behavior is None:
+        raise ValueError(f"{script_file} does not call a known Load.js scenario function")
+
+    stages_block = STAGES_RE.search(text)
+    vus = VUS_RE.search(text)
+    if stages_block:
+        stages = [(_seconds(duration), int(target)) for duration, target in STAGE_RE.findall(stages_block.group(1))]
+        start_vus = int(vus.group(1)) if vus else 1
+    else:
+        start_vus = int(vus.group(1)) if vus else 1
+        duration = DURATION_RE.search(text)
+        stages = [(_seconds(duration.group(1)) if duration else 60.0, start_vus)]
+    user_agent = USER_AGENT_RE.search(text)
+    return {
+        'behavior': behavior,
+        'stages': stages,
+        'start_vus': start_vus,
+        'post_sleep': sum(float(seconds) for seconds in SLEEP_RE.findall(body)),
+        'user_agent': user_agent.group(1) if user_agent else DEFAULT_USER_AGENT,
+        'arrival': _arrival_profile(text, stages),
+    }
+
+
+def _arrival_profile(text, stages):
+    """Arrival schedule of a constant-/ramping-arrival-rate executor in iterations per second"""
+    executor = EXECUTOR_RE.search(text)
+    if not executor:
+        return None
+    time_unit = TIME_UNIT_RE.search(text)
+    unit = _seconds(time_unit.group(1)) if time_unit else 1.0
+    max_vus = MAX_VUS_RE.search(text)
+    if executor.group(1) == 'constant':
+        rate = RATE_RE.search(text)
+        rate = float(rate.group(1)) / unit if rate else 1.0
+        arrival_stages, start_rate = [(sum(d for d, _ in stages), rate)], rate
+    else:
+        start_rate = START_RATE_RE.search(text)
+        start_rate = float(start_rate.group(1)) / unit if start_rate else 0.0
+        arrival_stages = [(duration, target / unit) for duration, target in stages]
+    return {'stages': arrival_stages, 'start_rate': start_rate,
+            'max_vus': int(max_vus.group(1)) if max_vus else DEFAULT_MAX_VUS}
+
+
+def parse_rate_stages(text):
+    """'30s:10,1m:50' -> [(30.0, 10.0), (60.0, 50.0)] (duration:iterations per second)"""
+    stages = []
+    for part in text.split(','):
+        duration, _, rate = part.partition(':')
+        stages.append((_seconds(duration.strip()), float(rate)))
+    return stages
+
+
+def parse_shard(text):
+    """'2/4' -> (2, 4): the second of four shards (1-based, like SHARD in Load.js)"""
+    index, _, count = text.partition('/')
+    try:
+        index, count = int(index), int(count)
+    except ValueError:
+        raise ValueError(f"shard must look like INDEX/COUNT, got '{text}'")
+    if not 1 <= index <= count:
+        raise ValueError(f"shard index must be between 1 and {count}, got {index}")
+    return index, count
+
+
+def segment_share(value, index, count):
+    """Shard `index` of `count`'s part of an integer total (VUs); the parts always add up to `value`"""
+    return value * index // count - value * (index - 1) // count
+
+
+def shard_users(user_count, index, count):
+    """Indices into USER_TOKENS that a shard drives, mirroring shardUsers() in Load.js"""
+    if count <= 1 or not user_count:
+        return list(range(user_count))
+    start, end = (index - 1) * user_count // count, index * user_count // count
+    return list(range(start, end)) if end > start else [(index - 1) % user_count]
+
+
+def build_payloads(directory=TEST_FILES_DIRECTORY, names=ALL_FILES):
+    """Pre-encoded multipart bodies per test file, built once like the shared file handles in Load.js"""
+    payloads = {}
+    for name in names:
+        path = Path(directory) / name
+        if not path.is_file():
+            continue
+        content = path.read_bytes()
+        content_type = CONTENT_TYPES.get(name.split('.')[-1], 'application/octet-stream')
+        head = (f'--{BOUNDARY}\r\nContent-Disposition: form-data; name="file"; filename="{name}"\r\n'
+                f'Content-Type: {content_type}\r\n\r\n').encode()
+        payloads[name] = {'size': len(content), 'body': head + content + f'\r\n--{BOUNDARY}--\r\n'.encode()}
+    return payloads
+
+
+def stage_target(stages, start, elapsed):
+    """Linearly interpolated target (VUs or rate) of a k6-style stage list at `elapsed` seconds"""
+    previous = start
+    for duration, target in stages:
+        if elapsed < duration:
+            return previous + (target - previous) * (elapsed / duration if duration else 1)
+        elapsed -= duration
+        previous = target
+    return previous
+
+
+# --- HTTP/1.1 client with keep-alive pooling -------------------------------
+
+class HttpPool:
+    """Minimal asyncio HTTP/1.1 client that reuses keep-alive connections to one origin
+
+    At most `max_connections` requests are on the wire at once; the wait for a
+    free slot is reported as the k6-style `blocked` phase.
+    """
+
+    def __init__(self, base_url, max_connections, verify_tls=False, user_agent=DEFAULT_USER_AGENT):
+        parts = urlsplit(base_url)
+        self.host = parts.hostname
+        self.port = parts.port or (443 if parts.scheme == 'https' else 80)
+        self.base_path = parts.path.rstrip('/')
+        self.ssl = None
+        if parts.scheme == 'https':
+            self.ssl = ssl.create_default_context()
+            if not verify_tls:
+                self.ssl.check_hostname = False
+                self.ssl.verify_mode = ssl.CERT_NONE
+        self.host_header = parts.netloc
+        self.url = base_url.rstrip('/')
+        self.user_agent = user_agent
+        self.slots = asyncio.Semaphore(max_connections)
+        self.idle = []
+
+    async def _connect(self):
+        return await asyncio.open_connection(self.host, self.port, ssl=self.ssl,
+                                             server_hostname=self.host if self.ssl else None)
+
+    async def request(self, method, path, headers=None, body=b'', content_type=None):
+        """Send one request and return (status, body, timings in ms)"""
+        queued = time.perf_counter()
+        async with self.slots:
+            timings = {'blocked': (time.perf_counter() - queued) * 1000, 'connecting': 0.0}
+            lines = [f"{method} {self.base_path}{path} HTTP/1.1", f"Host: {self.host_header}",
+                     f"User-Agent: {self.user_agent}", f"Content-Length: {len(body)}"]
+            if content_type:
+                lines.append(f"Content-Type: {content_type}")
+            lines.extend(f"{name}: {value}" for name, value in (headers or {}).items())
+            head = ("\r\n".join(lines) + "\r\n\r\n").encode()
+
+            for attempt in range(2):
+                reused = bool(self.idle)
+                if reused:
+                    reader, writer = self.idle.pop()
+                else:
+                    connecting = time.perf_counter()
+                    reader, writer = await self._connect()
+                    timings['connecting'] = (time.perf_counter() - connecting) * 1000
+                try:
+                    sending = time.perf_counter()
+                    writer.write(head)
+                    writer.write(body)
+                    await writer.drain()
+                    sent = time.perf_counter()
+                    status_line = await reader.readline()
+                    if not status_line and reused:
+                        writer.close()  # the server closed the idle keep-alive connection; retry on a new one
+                        continue
+                    first_byte = time.perf_counter()
+                    status, response_headers = _parse_head(status_line, await _read_headers(reader))
+                    response_body = await _read_body(reader, response_headers)
+                except BaseException:
+                    writer.close()
+                    raise
+                finished = time.perf_counter()
+                if response_headers.get('connection', '').lower() == 'close':
+                    writer.close()
+                else:
+                    self.idle.append((reader, writer))
+                timings.update(sending=(sent - sending) * 1000, waiting=(first_byte - sent) * 1000,
+                               receiving=(finished - first_byte) * 1000)
+                timings['duration'] = timings['sending'] + timings['waiting'] + timings['receiving']
+                return status, response_body, timings
+            raise ConnectionError("connection closed before a response")
+
+    def close(self):
+        for _, writer in self.idle:
+            writer.close()
+        self.idle.clear()
+
+
+def _parse_head(status_line, headers):
+    parts = status_line.decode('latin-1').split(' ', 2)
+    if len(parts) < 2 or not parts[0].startswith('HTTP/'):
+        raise ConnectionError(f"malformed status line {status_line[:60]!r}")
+    return int(parts[1]), headers
+
+
+async def _read_headers(reader):
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            return headers
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+
+
+async def _read_body(reader, headers):
+    if headers.get('transfer-encoding', '').lower() == 'chunked':
+        chunks = []
+        while True:
+            size = int((await reader.readline()).split(b';')[0].strip() or b'0', 16)
+            if size == 0:
+                await _read_headers(reader)  # trailers
+                return b''.join(chunks)
+            chunks.append(await reader.readexactly(size))
+            await reader.readexactly(2)
+    if 'content-length' in headers:
+        return await reader.readexactly(int(headers['content-length']))
+    return await reader.read()
+
+
+# --- Load generator ----------------------------------------------------------
+
+def ready_state(status, body):
+    """readyState() in Load.js: 'ready', 'failed' or 'pending' from a status (or content) response"""
+    if status != 200 or not body:
+        return 'pending' if status in (0, 404) or status >= 500 else 'failed'
+    try:
+        parsed = json.loads(body)
+    except ValueError:
+        return 'pending'
+    if not isinstance(parsed, dict):
+        return 'pending'
+    data = parsed.get('data') if isinstance(parsed.get('data'), dict) else {}
+    state = str(parsed.get('status') or data.get('status') or '').lower()
+    if state in READY_STATES:
+        return 'ready'
+    if state in FAILED_STATES:
+        return 'failed'
+    return 'ready' if not state and (parsed.get('content') or data.get('content')) else 'pending'
+
+
+def _iso(epoch):
+    return datetime.fromtimestamp(epoch, timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.%f')[:-3] + 'Z'
+
+
+class LoadGenerator:
+    """Runs one scenario's behaviour and records every upload straight into an analyzer data dict
+
+    With a log file, the same [DEBUG ...] lines Load.js prints are written too, so
+    the run can later be re-analyzed, compared or ingested like a k6 log.
+    """
+
+    def __init__(self, scenario, behavior, pool, payloads, tokens, data=None, log=None, seed=None, post_sleep=0.0,
+                 users=None, retries=0, retry_base=RETRY_BASE_SECONDS, retry_statuses=RETRY_STATUSES,
+                 ready_path=None):
+        self.scenario = scenario
+        self.behavior = behavior
+        self.pool = pool
+        self.payloads = payloads
+        self.tokens = tokens or ['']
+        self.users = users or list(range(len(self.tokens)))
+        self.retries = retries
+        self.retry_base = retry_base
+        self.retry_statuses = retry_statuses
+        self.ready_path = ready_path
+        self.data = data if data is not None else new_data()
+        self.log = log
+        self.rng = random.Random(seed)
+        self.post_sleep = post_sleep
+        self.iterations = 0
+        self.dropped_iterations = 0
+
+    def _user(self, vu):
+        # getUserIndexByVU(): VUs are 1-based and cycle through this shard's users
+        return self.users[(vu - 1) % len(self.users)]
+
+    def _log(self, vu, iteration, message, epoch=None):
+        if self.log is None:
+            return
+        epoch = time.time() if epoch is None else epoch
+        stamp = _iso(epoch)
+        message = message.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')   # k6 quotes msg="..."
+        self.log.write(f'time="{stamp[:19]}Z" level=info msg="[DEBUG {stamp} VU:{vu} ITER:{iteration} '
+                       f'USER:{self._user(vu)}] {message}" source=console\n')
+
+    def _headers(self, vu):
+        return {'Accept': 'application/json', 'Authorization': f"Bearer {self.tokens[self._user(vu)]}"}
+
+    async def upload(self, vu, iteration, filename, intended=math.nan):
+        """uploadFile(): multipart POST, success when the response is a JSON array whose first item has an id
+
+        `intended` is the epoch time an arrival-rate schedule wanted the upload sent.
+        """
+        payload = self.payloads[filename]
+        records = self.data['records']
+        file_type = filename.split('.')[-1]
+        start = time.time()
+        scheduled = "" if math.isnan(intended) else f", intended start {_iso(intended)}"
+        self._log(vu, iteration, f"Starting upload of {filename} ({payload['size']} bytes){scheduled}", start)
+        records.append_start(self.scenario, start, payload['size'])
+        self.data['file_types'][file_type] += 1
+        self._log(vu, iteration, f"HTTP request prepared, sending to {self.pool.url}{UPLOAD_PATH}")
+        prepared = time.time()
+
+        attempts = 0
+        while True:
+            attempts += 1
+            status, body, timings = 0, b'', None
+            try:
+                status, body, timings = await asyncio.wait_for(
+                    self.pool.request('POST', UPLOAD_PATH, self._headers(vu), payload['body'],
+                                      f'multipart/form-data; boundary={BOUNDARY}'),
+                    REQUEST_TIMEOUT_SECONDS)
+            except asyncio.CancelledError:
+                records.append_request(self.scenario, filename, 'orphaned', vu, iteration, start, prepared,
+                                       size=payload['size'], intended=intended, user=self._user(vu),
+                                       attempts=attempts)
+                raise
+            except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, ValueError):
+                pass  # k6 reports transport errors and timeouts as status 0
+            if attempts > self.retries or status not in self.retry_statuses:
+                break
+            # RETRY_MAX in Load.js: exponential backoff with full jitter
+            backoff = self.rng.random() * min(RETRY_CAP_SECONDS, self.retry_base * 2 ** (attempts - 1))
+            self._log(vu, iteration, f"Retrying upload of {filename} after Status {status} "
+                                     f"(attempt {attempts + 1} of {self.retries + 1}, backoff {backoff * 1000:.0f}ms)")
+            await asyncio.sleep(backoff)
+        end = time.time()
+        duration = round((end - prepared) * 1000)
+
+        file_id = None
+        if status == 200 and body:
+            try:
+                items = json.loads(body)
+                if isinstance(items, list) and items and isinstance(items[0], dict):
+                    file_id = items[0].get('id')
+            except ValueError:
+                self._log(vu, iteration, "Error parsing response: invalid JSON", end)
+        if timings:
+            for phase in ('blocked', 'connecting', 'sending', 'waiting', 'receiving', 'duration'):
+                add_phase_point(self.data['phases'], file_type, phase, timings[phase])
+
+        if file_id:
+            self._log(vu, iteration, f"Upload successful for {filename}, took {duration}ms, file ID: {file_id}", end)
+            records.append(self.scenario, filename, True, 200, duration, end, payload['size'])
+            records.append_request(self.scenario, filename, 'success', vu, iteration, start, prepared, end,
+                                   payload['size'], 200, duration, intended, self._user(vu), attempts)
+            self.data['success_count'] += 1
+            if self.ready_path:
+                index = len(records.requests['request_state']) - 1
+                await self.wait_until_ready(vu, iteration, filename, file_id, prepared, end, index)
+        else:
+            self._log(vu, iteration, f"Upload FAILED for {filename}: Status {status}", end)
+            text = body.decode('utf-8', errors='replace')
+            if len(text) > MAX_LOGGED_BODY:
+                text = f"{text[:MAX_LOGGED_BODY]}... ({len(text)} chars)"
+            if text:
+                self._log(vu, iteration, f"Response body: {text}", end)
+            records.append(self.scenario, filename, False, status, None, end, payload['size'])
+            state = 'timeout' if status == 0 and end - start >= REQUEST_TIMEOUT_SECONDS * 0.99 else 'failure'
+            records.append_request(self.scenario, filename, state, vu, iteration, start, prepared, end,
+                                   payload['size'], status, duration, intended, self._user(vu), attempts,
+                                   error_signature(text))
+            self.data['failure_count'] += 1
+
+    async def wait_until_ready(self, vu, iteration, filename, file_id, sent, answered, index):
+        """waitUntilReady(): poll the file's processing status with doubling delays until it settles"""
+        path = self.ready_path.replace('{id}', quote(str(file_id)))
+        delay, polls, state = READY_POLL_SECONDS, 0, 'pending'
+        while state == 'pending':
+            remaining = READY_TIMEOUT_SECONDS - (time.time() - answered)
+            if remaining <= 0:
+                state = 'timeout'
+                break
+            await asyncio.sleep(min(delay, remaining))
+            try:
+                status, body, _ = await asyncio.wait_for(self.pool.request('GET', path, self._headers(vu)),
+                                                         REQUEST_TIMEOUT_SECONDS)
+            except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, ValueError):
+                status, body = 0, b''
+            state = ready_state(status, body)
+            polls += 1
+            delay = min(delay * 2, READY_POLL_MAX_SECONDS)
+
+        ready_at = time.time()
+        processing = round((ready_at - answered) * 1000)
+        self.data['records'].set_request_ready(index, state, processing, polls)
+        if state == 'ready':
+            self._log(vu, iteration, f"File {filename} ready after {processing}ms processing, "
+                                     f"time to ready {round((ready_at - sent) * 1000)}ms ({polls} polls)", ready_at)
+        else:
+            self._log(vu, iteration, f"File {filename} NOT ready: {state} after {processing}ms ({polls} polls)",
+                      ready_at)
+
+    async def health_check(self, vu, iteration):
+        """apiHealthCheck(): GET the file list, then sleep 1s"""
+        self._log(vu, iteration, f"Running API health check, VU: {vu}")
+        try:
+            status, _, timings = await asyncio.wait_for(
+                self.pool.request('GET', HEALTH_PATH, self._headers(vu)), REQUEST_TIMEOUT_SECONDS)
+            self._log(vu, iteration, f"API health check complete: Status {status}, "
+                                     f"duration {timings['duration']:.0f}ms")
+        except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, ValueError) as e:
+            self._log(vu, iteration, f"ERROR in apiHealthCheck: {e}")
+        await asyncio.sleep(1)
+
+    async def iteration(self, vu, iteration, scheduled=math.nan):
+        """One iteration of the behaviour; `scheduled` is its due time under an arrival-rate executor"""
+        action, filename, think_ms = self.behavior(vu, iteration, self.rng)
+        if action == 'upload':
+            await asyncio.sleep(think_ms / 1000)  # uploadFile(file, simulatedNetworkDelay) sleeps first
+            if filename in self.payloads:
+                await self.upload(vu, iteration, filename, scheduled + think_ms / 1000)
+        elif action == 'health':
+            await self.health_check(vu, iteration)
+            await asyncio.sleep(think_ms / 1000)
+        else:
+            await asyncio.sleep(think_ms / 1000)
+        if self.post_sleep:
+            await asyncio.sleep(self.post_sleep)
+        self.iterations += 1
+
+    async def _vu_loop(self, vu, stop):
+        iteration = 0
+        while not stop.is_set():
+            await self.iteration(vu, iteration)
+            iteration += 1
+
+    async def run_vus(self, stages, start_vus=1, graceful_stop=GRACEFUL_STOP_SECONDS):
+        """constant-vus / ramping-vus: closed model, each VU loops iterations back to back"""
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        total = sum(duration for duration, _ in stages)
+        running = {}   # vu -> (task, stop event)
+        while True:
+            elapsed = loop.time() - started
+            if elapsed >= total:
+                break
+            target = round(stage_target(stages, start_vus, elapsed))
+            for vu in [vu for vu, (task, _) in running.items() if task.done()]:
+                running.pop(vu)[0].result()
+            active = sorted(vu for vu, (_, stop) in running.items() if not stop.is_set())
+            vu = 1
+            while len(active) < target:
+                while vu in running:
+                    vu += 1
+                stop = asyncio.Event()
+                running[vu] = (asyncio.ensure_future(self._vu_loop(vu, stop)), stop)
+                active.append(vu)
+            for vu in sorted(active)[target:]:
+                running[vu][1].set()  # ramp down: finish the current iteration, then exit
+            await asyncio.sleep(CONTROL_INTERVAL)
+        for _, stop in running.values():
+            stop.set()
+        await self._stop([task for task, _ in running.values()], graceful_stop)
+
+    async def run_arrivals(self, stages, start_rate=0.0, max_vus=DEFAULT_MAX_VUS, graceful_stop=GRACEFUL_STOP_SECONDS):
+        """constant-arrival-rate / ramping-arrival-rate: open model, iterations start on schedule
+
+        An iteration that finds all `max_vus` busy is dropped (counted, like k6's
+        dropped_iterations) instead of delaying later arrivals. Every started iteration
+        is measured from its own slot of the schedule, like the intended start
+        arrivalRateUpload() derives in Load.js, so late scheduling ticks show up in the
+        coordinated-omission-corrected latency while drops are only reported as drops.
+        """
+        loop = asyncio.get_running_loop()
+        started = last = loop.time()
+        epoch_offset = time.time() - started
+        total = sum(duration for duration, _ in stages)
+        free = list(range(max_vus, 0, -1))
+        next_iteration = {}
+        tasks = set()
+        credit = 0.0
+
+        async def arrival(vu, due):
+            try:
+                await self.iteration(vu, next_iteration.get(vu, 0), due + epoch_offset)
+            finally:
+                next_iteration[vu] = next_iteration.get(vu, 0) + 1
+                free.append(vu)
+
+        while True:
+            now = loop.time()
+            if now - started >= total:
+                break
+            rate = stage_target(stages, start_rate, now - started)
+            credit += rate * (now - last)
+            last = now
+            while credit >= 1:
+                credit -= 1
+                due = now - credit / rate if rate else now  # when this arrival's credit was reached
+                if free:
+                    task = asyncio.ensure_future(arrival(free.pop(), due))
+                    tasks.add(task)
+                    task.add_done_callback(tasks.discard)
+                else:
+                    self.dropped_iterations += 1
+            await asyncio.sleep(ARRIVAL_TICK)
+        await self._stop(list(tasks), graceful_stop)
+
+    async def _stop(self, tasks, graceful_stop):
+        """Let in-flight iterations finish for up to graceful_stop seconds, then interrupt them"""
+        if not tasks:
+            return
+        done, pending = await asyncio.wait(tasks, timeout=graceful_stop)
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+
+
+def run_load(script_file, vus=None, duration=None, rate=None, rate_stages=None, max_vus=None,
+             base_url=None, connections=None, verify_tls=False, log_path=None, seed=None,
+             load_script=LOAD_SCRIPT, files_directory=TEST_FILES_DIRECTORY, shard=None, retries=0,
+             retry_statuses=RETRY_STATUSES, ready_path=None):
+    """Run a scenario script's behaviour and return (data, generator)
+
+    --vus/--duration override the script's stages like `k6 run --vus --duration`;
+    rate (iterations/s) or rate_stages switch to an arrival-rate executor, as do
+    scripts configured with one. shard=(index, count) runs only that shard's part of
+    the VUs and arrival rate with its own token slice, like a k6 execution segment.
+    retries/retry_statuses and ready_path mirror RETRY_MAX and WAIT_READY in Load.js.
+    """
+    profile = scenario_profile(script_file)
+    tokens, default_base_url = load_script_settings(load_script)
+    payloads = build_payloads(files_directory)
+    if not payloads:
+        raise FileNotFoundError(f"no test files found in {files_directory}")
+
+    stages, start_vus = profile['stages'], profile['start_vus']
+    if vus is not None or duration is not None:
+        total = _seconds(duration) if duration else sum(d for d, _ in stages)
+        start_vus = vus if vus is not None else max(target for _, target in stages)
+        stages = [(total, start_vus)]
+    arrival_stages = parse_rate_stages(rate_stages) if rate_stages else None
+    start_rate = 0.0
+    if rate is not None and arrival_stages is None:
+        arrival_stages = [(_seconds(duration) if duration else sum(d for d, _ in stages), rate)]
+        start_rate = rate
+    elif arrival_stages is None and profile['arrival'] and vus is None and duration is None:
+        arrival_stages, start_rate = profile['arrival']['stages'], profile['arrival']['start_rate']
+        max_vus = max_vus or profile['arrival']['max_vus']
+    max_vus = max_vus or DEFAULT_MAX_VUS
+    users = list(range(len(tokens)))
+    if shard:
+        index, count = shard
+        users = shard_users(len(tokens), index, count)
+        stages = [(duration, segment_share(target, index, count)) for duration, target in stages]
+        start_vus = segment_share(start_vus, index, count)
+        if arrival_stages:
+            arrival_stages = [(duration, target / count) for duration, target in arrival_stages]
+            start_rate /= count
+            max_vus = max(1, segment_share(max_vus, index, count))
+    concurrency = max_vus if arrival_stages else max([start_vus] + [target for _, target in stages])
+
+    async def main(log):
+        pool = HttpPool(base_url or default_base_url, connections or max(concurrency, 1), verify_tls,
+                        profile['user_agent'])
+        generator = LoadGenerator(scenario_from_path(script_file), BEHAVIORS[profile['behavior']], pool, payloads,
+                                  tokens, log=log, seed=seed, post_sleep=profile['post_sleep'], users=users,
+                                  retries=retries, retry_statuses=retry_statuses, ready_path=ready_path)
+        try:
+            if arrival_stages:
+                await generator.run_arrivals(arrival_stages, start_rate, max_vus)
+            else:
+                await generator.run_vus(stages, start_vus)
+        finally:
+            pool.close()
+        return generator
+
+    if log_path:
+        Path(log_path).parent.mkdir(parents=True, exist_ok=True)
+        with open(log_path, 'w', buffering=1024 * 1024) as log:
+            generator = asyncio.run(main(log))
+            log.write(format_summary_block(generator))
+    else:
+        generator = asyncio.run(main(None))
+    generator.data['scenarios'].append(generator.scenario)
+    return generator.data, generator
+
+
+def format_summary_block(generator):
+    """A k6-style end-of-test summary so `--summary-only` and the warehouse can read loadgen logs"""
+    data = generator.data
+    records = data['records']
+    sketches = records.latency_sketches('scenario')
+    latency = sketches.get(generator.scenario)
+    corrected = open_model_sketches(records).get(generator.scenario, {}).get('corrected')
+    total = data['success_count'] + data['failure_count']
+    epochs = records.columns['timestamp']
+    span = (max(epochs) - min(epochs)) if len(epochs) > 1 else 0
+
+    def line(name, value):
+        return f"    {name}{'.' * max(3, 72 - len(name))}: {value}\n"
+
+    def trend(sketch):
+        if sketch is None or not sketch.count:
+            return "avg=0ms min=0ms med=0ms max=0ms p(90)=0ms p(95)=0ms p(99)=0ms"
+        return " ".join(f"{key}={value:.2f}ms" for key, value in (
+            ('avg', sketch.mean()), ('min', sketch.min), ('med', sketch.percentile(50)), ('max', sketch.max),
+            ('p(90)', sketch.percentile(90)), ('p(95)', sketch.percentile(95)), ('p(99)', sketch.percentile(99))))
+
+    rate = (f"{data['success_count'] / total * 100:.2f}%  {data['success_count']} out of {total}" if total
+            else "0.00%  0 out of 0")
+    failed = (f"{data['failure_count'] / total * 100:.2f}%  {data['failure_count']} out of {total}" if total
+              else "0.00%  0 out of 0")
+    per_second = f"{total / span:.6f}/s" if span else "0/s"
+    iterations_per_second = f"{generator.iterations / span:.6f}/s" if span else "0/s"
+    return ("\n\n  █ TOTAL RESULTS \n\n    CUSTOM\n"
+            + line('success_rate', rate)
+            + line('upload_duration', trend(latency))
+            + (line('upload_duration_corrected', trend(corrected)) if corrected else "")
+            + "\n    HTTP\n"
+            + line('http_req_duration', trend(latency))
+            + line('http_req_failed', failed)
+            + line('http_reqs', f"{total}      {per_second}")
+            + "\n    EXECUTION\n"
+            + line('iterations', f"{generator.iterations}      {iterations_per_second}")
+            + line('dropped_iterations', f"{generator.dropped_iterations}      0/s")
+            + "\n\n")
+
+
+def loadgen_main(argv=None):
+    """`analytics.py loadgen <scenario>`: drive a scenario from Python instead of k6"""
+    from capacity import resolve_scenario
+
+    parser = argparse.ArgumentParser(prog='analytics.py loadgen',
+                                     description='Run a scenario with the Python asyncio load generator')
+    parser.add_argument('scenario', help='Scenario number (e.g. 8) or path to a scenario script')
+    parser.add_argument('--vus', type=int, help="Constant VUs (overrides the script's vus/stages)")
+    parser.add_argument('--duration', help="Test duration, e.g. 30s, 2m (overrides the script's duration/stages)")
+    parser.add_argument('--rate', type=float, help='Constant arrival rate in iterations/s (open model)')
+    parser.add_argument('--rate-stages', help="Ramping arrival rate, e.g. '30s:10,1m:50' (duration:iterations/s)")
+    parser.add_argument('--max-vus', type=int,
+                        help="Concurrent iterations allowed by the arrival-rate executors "
+                             f"(default: the script's maxVUs, else {DEFAULT_MAX_VUS})")
+    parser.add_argument('--base-url', help='API base URL (default: API_BASE_URL from scripts/Load.js)')
+    parser.add_argument('--connections', type=int, help='Connection pool size (default: peak VUs)')
+    parser.add_argument('--verify-tls', action='store_true', help='Verify TLS certificates (scenarios skip verification)')
+    parser.add_argument('--seed', type=int, help='Seed for file choice and think times')
+    parser.add_argument('--shard', metavar='INDEX/COUNT',
+                        help="Run only this shard's share of the load, e.g. 2/4 (see `analytics.py shard`)")
+    parser.add_argument('--retries', type=int, default=0,
+                        help='Retry failed uploads (status 0/429/502/503/504) up to N times with jittered '
+                             'exponential backoff, like RETRY_MAX in Load.js (default: 0)')
+    parser.add_argument('--retry-statuses', default=','.join(map(str, RETRY_STATUSES)),
+                        help='Statuses that are retried, like RETRY_STATUSES in Load.js (default: %(default)s)')
+    parser.add_argument('--wait-ready', nargs='?', const=READY_PATH, metavar='PATH',
+                        help='After each successful upload, poll PATH ({id} = file ID, default '
+                             f'{READY_PATH}) until processing finishes, like WAIT_READY in Load.js')
+    parser.add_argument('-d', '--directory', default='../logs', help='Where the run log is written (default: ../logs)')
+    parser.add_argument('--no-log', action='store_true', help='Do not write a k6-style console log')
+    args = parser.parse_args(argv)
+
+    script = resolve_scenario(args.scenario)
+    if script is None:
+        parser.error(f"scenario '{args.scenario}' not found in ../scenarios")
+    try:
+        shard = parse_shard(args.shard) if args.shard else None
+    except ValueError as e:
+        parser.error(str(e))
+    try:
+        retry_statuses = tuple(int(status) for status in args.retry_statuses.split(',') if status.strip())
+    except ValueError:
+        parser.error(f"--retry-statuses must be comma-separated status codes, got '{args.retry_statuses}'")
+    log_path = None
+    if not args.no_log:
+        label = Path(script).stem.split('_')[0]
+        suffix = f"_shard{shard[0]}of{shard[1]}" if shard else ""
+        log_path = Path(args.directory) / f"{label}_loadgen_{datetime.now().strftime('%Y%m%d_%H%M%S')}{suffix}.log"
+
+    print(f"🚀 Running {Path(script).name} with the Python load generator"
+          + (f" → {log_path}" if log_path else ""))
+    started = time.perf_counter()
+    try:
+        data, generator = run_load(script, args.vus, args.duration, args.rate, args.rate_stages, args.max_vus,
+                                   args.base_url, args.connections, args.verify_tls, log_path, args.seed,
+                                   shard=shard, retries=args.retries, retry_statuses=retry_statuses,
+                                   ready_path=args.wait_ready)
+    except (FileNotFoundError, ValueError) as e:
+        print(f"❌ {e}")
+        return 2
+    elapsed = time.perf_counter() - started
+
+    records = data['records']
+    total = data['success_count'] + data['failure_count']
+    print(f"\n✅ {data['success_count']} succeeded, ❌ {data['failure_count']} failed, "
+          f"{generator.iterations} iterations in {elapsed:.1f}s"
+          + (f", {generator.dropped_iterations} dropped" if generator.dropped_iterations else ""))
+    if records.success_count():
+        latency = records.latency_summary()
+        print(f"⏱️  p50 {latency['median']:.0f} ms, p95 {latency['p95']:.0f} ms, p99 {latency['p99']:.0f} ms")
+    # Over the request span (first start to last outcome), so graceful stop and ready polling don't dilute it
+    goodput = summarize_goodput(records).get(generator.scenario, {})
+    if goodput.get('throughput'):
+        print(f"🚀 {goodput['throughput']:.2f} uploads/s over {goodput['span']:.1f}s of requests")
+    if log_path:
+        print(f"📄 Analyze with: python3 analytics.py -f {log_path}")
+    return 0 if total else 1
@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+"""
+Streaming k6 Log Parser
+Reads k6 console logs line by line in a single pass with bounded memory
+"""
+
+import json
+import os
+import re
+from collections import defaultdict
+from pathlib import Path
+
+from correlation import RequestCorrelator
+from k6_json import JSON_SUFFIXES, is_k6_json, merge_phases, parse_k6_json
+from k6_summary import is_summary_end
+from record_store import RecordStore, parse_timestamp
+
+# Precompiled matchers for the [DEBUG <timestamp> VU:<n> ITER:<n> USER:<n>] lines written by log() in
+# scripts/Load.js (VU/ITER/USER are optional so logs from before they were added still parse)
+DEBUG_PREFIX = (r'\[DEBUG ?(?P<timestamp>[^\]\s]*)'
+                r'(?: VU:(?P<vu>\d+) ITER:(?P<iteration>\d+)(?: USER:(?P<user>\d+))?)?\] ')
+UPLOAD_START_RE = re.compile(DEBUG_PREFIX + r'Starting upload of (?P<filename>.+?) \((?P<size>\d+) bytes\)'
+                             r'(?:, intended start (?P<intended>[^\s"]+))?')
+UPLOAD_PREPARED_RE = re.compile(DEBUG_PREFIX + r'HTTP request prepared')
+UPLOAD_SUCCESS_RE = re.compile(DEBUG_PREFIX + r'Upload successful for (?P<filename>.+?), took (?P<duration>\d+)ms, file ID: (?P<file_id>[^\s"]+)')
+UPLOAD_FAILURE_RE = re.compile(DEBUG_PREFIX + r'Upload FAILED for (?P<filename>.+?): Status (?P<status>\d+)')
+UPLOAD_ERROR_RE = re.compile(DEBUG_PREFIX + r'ERROR during upload of (?P<filename>.+?): (?P<message>[^"]*)')
+UPLOAD_RETRY_RE = re.compile(DEBUG_PREFIX + r'Retrying upload of (?P<filename>.+?) after Status (?P<status>\d+) '
+                                            r'\(attempt (?P<attempt>\d+) of')
+UPLOAD_READY_RE = re.compile(DEBUG_PREFIX + r'File (?P<filename>.+?) ready after (?P<processing>\d+)ms processing, '
+                                            r'time to ready \d+ms \((?P<polls>\d+) polls\)')
+UPLOAD_NOT_READY_RE = re.compile(DEBUG_PREFIX + r'File (?P<filename>.+?) NOT ready: (?P<state>\w+) '
+                                                r'after (?P<processing>\d+)ms \((?P<polls>\d+) polls\)')
+# Inside k6's msg="..." quotes are escaped, so the body runs to the first unescaped quote
+RESPONSE_BODY_RE = re.compile(DEBUG_PREFIX + r'Response body: (?P<body>(?:[^"\\]|\\.)*)')
+SCENARIO_RE = re.compile(r'scenario(\d+)')
+
+# Each [DEBUG ...] line is only handed to the matcher whose keyword it contains; events are
+# yielded as the listed fields, with the VU and iteration (None when not logged) always last
+DEBUG_MATCHERS = (
+    ('Starting upload of', 'start', UPLOAD_START_RE, ('timestamp', 'filename', 'size', 'intended', 'user')),
+    ('HTTP request prepared', 'prepared', UPLOAD_PREPARED_RE, ('timestamp',)),
+    ('Upload successful for', 'success', UPLOAD_SUCCESS_RE, ('timestamp', 'filename', 'duration', 'file_id')),
+    ('Upload FAILED for', 'failure', UPLOAD_FAILURE_RE, ('timestamp', 'filename', 'status')),
+    ('ERROR during upload of', 'error', UPLOAD_ERROR_RE, ('timestamp', 'filename', 'message')),
+    ('Retrying upload of', 'retry', UPLOAD_RETRY_RE, ('timestamp', 'filename', 'status', 'attempt')),
+    ('Response body:', 'body', RESPONSE_BODY_RE, ('timestamp', 'body')),
+    ('ms processing, time to ready', 'ready', UPLOAD_READY_RE, ('timestamp', 'filename', 'processing', 'polls')),
+    (' NOT ready: ', 'not_ready', UPLOAD_NOT_READY_RE, ('timestamp', 'filename', 'state', 'processing', 'polls')),
+)
+
+# LOG_FORMAT=ndjson writes one {"ev": ...} record per request instead; k6 prints console output
+# either raw (--log-format raw) or quoted inside msg="..." (the default logfmt)
+RECORD_MARKER = '{"ev"'
+QUOTED_RECORD_MARKER = '{\\"ev\\"'
+_decoder = json.JSONDecoder()
+
+SUMMARY_START = '█ TOTAL RESULTS'
+SHARD_MANIFEST = 'shards.json'   # written next to the shard logs of a sharded run (see shards.py)
+MAX_SUMMARY_LINES = 200
+
+
+def new_data():
+    """Create an empty analyzer data dict"""
+    return {
+        'records': RecordStore(),
+        'phases': {},
+        'metrics': {},
+        'scenarios': [],
+        'file_types': defaultdict(int),
+        'success_count': 0,
+        'failure_count': 0,
+        'log_sample_rate': 1.0
+    }
+
+
+def scenario_from_path(file_path):
+    """Derive the scenario label from a log file name"""
+    scenario_match = SCENARIO_RE.search(os.path.basename(str(file_path)))
+    return f"Scenario {scenario_match.group(1)}" if scenario_match else "Unknown"
+
+
+def parse_record(line):
+    """The NDJSON request record on a console line, or None"""
+    start = line.find(RECORD_MARKER)
+    try:
+        if start >= 0:
+            return _decoder.raw_decode(line, start)[0]
+        start = line.find(QUOTED_RECORD_MARKER)
+        end = line.rfind('}"')
+        if 0 <= start < end:
+            quoted = line[start:end + 1]
+            if '\\\\' not in quoted:
+                # Only \" escapes: the record has no backslashes of its own
+                return json.loads(quoted.replace('\\"', '"'))
+            # msg="..." is a Go-quoted string, which JSON string syntax decodes
+            return json.loads(json.loads('"' + quoted + '"'))
+    except ValueError:
+        pass
+    return None
+
+
+def record_events(record):
+    """(kind, groups) events of one upload record, shaped like those of the [DEBUG ...] lines
+
+    One json decode replaces the four or five regex scans of the text format, and
+    the correlator sees the same start/prepared/outcome sequence either way.
+    """
+    if record.get('ev') != 'upload' or 'start' not in record:
+        return
+    vu, iteration = str(record.get('vu')), str(record.get('it'))
+    filename = record.get('file', '')
+    user = record.get('user')
+    yield 'start', (record['start'], filename, record.get('size', 0), record.get('intended'),
+                    None if user is None else str(user), vu, iteration)
+    if 'prep' in record:
+        yield 'prepared', (record['prep'], vu, iteration)
+    end = record.get('end', record['start'])
+    if record.get('attempts', 1) > 1:
+        yield 'retry', (end, filename, None, str(record['attempts']), vu, iteration)
+    if 'err' in record:
+        yield 'error', (end, filename, record['err'], vu, iteration)
+    elif record.get('ok'):
+        yield 'success', (end, filename, record.get('dur', 0), record.get('id'), vu, iteration)
+    else:
+        yield 'failure', (end, filename, record.get('status', 0), vu, iteration)
+    if 'body' in record:
+        yield 'body', (end, record['body'], vu, iteration)
+    if record.get('ready') == 'ready':
+        yield 'ready', (end, filename, record.get('proc', 0), record.get('polls', 0), vu, iteration)
+    elif 'ready' in record:
+        yield 'not_ready', (end, filename, record['ready'], record.get('proc', 0), record.get('polls', 0), vu, iteration)
+    if 'sample' in record:
+        yield 'sample', record['sample']
+
+
+def iter_log_events(lines):
+    """Yield (kind, groups) for every upload event and the summary block in one pass"""
+    summary_lines = None
+
+    for line in lines:
+        if summary_lines is not None:
+            if not is_summary_end(line) and len(summary_lines) < MAX_SUMMARY_LINES:
+                summary_lines.append(line)
+                continue
+            yield 'summary', ''.join(summary_lines)
+            summary_lines = None
+
+        if RECORD_MARKER in line or QUOTED_RECORD_MARKER in line:
+            record = parse_record(line)
+            if record is not None:
+                yield from record_events(record)
+        elif '[DEBUG' in line:
+            for keyword, kind, matcher, fields in DEBUG_MATCHERS:
+                if keyword in line:
+                    for match in matcher.finditer(line):
+                        yield kind, match.group(*fields, 'vu', 'iteration')
+        elif SUMMARY_START in line:
+            summary_lines = [line]
+
+    if summary_lines is not None:
+        yield 'summary', ''.join(summary_lines)
+
+
+def parse_k6_log(file_path, data):
+    """Stream a k6 log into an analyzer data dict, returning the raw summary block if present"""
+    with open(file_path, 'r', encoding='utf-8', errors='replace') as f:
+        return parse_k6_lines(f, data, scenario_from_path(file_path))
+
+
+def parse_k6_lines(lines, data, scenario):
+    """Parse k6 console log lines (a whole log or an appended tail) into an analyzer data dict"""
+    metrics_text = None
+    records = data['records']
+    correlator = RequestCorrelator(records, scenario)
+
+    for kind, groups in iter_log_events(lines):
+        if kind == 'start':
+            timestamp, filename, filesize, intended, user, vu, iteration = groups
+            data['file_types'][filename.split('.')[-1]] += 1
+            epoch = parse_timestamp(timestamp)
+            correlator.start(epoch, filename, int(filesize), vu, iteration, intended, user)
+            records.append_start(scenario, epoch, int(filesize))
+        elif kind == 'prepared':
+            timestamp, vu, iteration = groups
+            correlator.prepared(parse_timestamp(timestamp), vu, iteration)
+        elif kind == 'success':
+            timestamp, filename, duration, file_id, vu, iteration = groups
+            epoch = parse_timestamp(timestamp)
+            size = correlator.finish('success', epoch, filename, vu, iteration, 200, int(duration))
+            records.append(scenario, filename, True, 200, int(duration), epoch, size)
+            data['success_count'] += 1
+        elif kind == 'failure':
+            timestamp, filename, status_code, vu, iteration = groups
+            epoch = parse_timestamp(timestamp)
+            size = correlator.finish('failure', epoch, filename, vu, iteration, int(status_code))
+            records.append(scenario, filename, False, int(status_code), None, epoch, size)
+            data['failure_count'] += 1
+        elif kind == 'error':
+            timestamp, filename, message, vu, iteration = groups
+            correlator.finish('error', parse_timestamp(timestamp), filename, vu, iteration, message=message)
+        elif kind == 'retry':
+            timestamp, filename, status_code, attempt, vu, iteration = groups
+            correlator.retry(attempt, vu, iteration)
+        elif kind == 'body':
+            timestamp, body, vu, iteration = groups
+            correlator.body(body, vu, iteration)
+        elif kind == 'ready':
+            timestamp, filename, processing, polls, vu, iteration = groups
+            correlator.ready('ready', float(processing), int(polls), vu, iteration)
+        elif kind == 'not_ready':
+            timestamp, filename, state, processing, polls, vu, iteration = groups
+            correlator.ready(state, float(processing), int(polls), vu, iteration)
+        elif kind == 'sample':
+            data['log_sample_rate'] = min(data['log_sample_rate'], groups)
+        elif kind == 'summary':
+            metrics_text = groups
+
+    correlator.close()
+    data['scenarios'].append(scenario)
+    return metrics_text
+
+
+def merge_data(data, partial):
+    """Merge a partial aggregate from one log into an analyzer data dict"""
+    data['records'].extend(partial['records'])
+    data['scenarios'].extend(partial['scenarios'])
+    data['success_count'] += partial['success_count']
+    data['failure_count'] += partial['failure_count']
+    data['log_sample_rate'] = min(data['log_sample_rate'], partial['log_sample_rate'])
+    for file_type, count in partial['file_types'].items():
+        data['file_types'][file_type] += count
+    data['metrics'].update(partial['metrics'])
+    merge_phases(data['phases'], partial['phases'])
+
+
+def find_log_files(directory):
+    """Console logs (*.log) and k6 JSON outputs in a directory, in name order"""
+    return sorted(path for path in Path(directory).iterdir()
+                  if path.is_file() and path.name != SHARD_MANIFEST and (path.suffix == '.log' or is_k6_json(path)))
+
+
+def console_log_for(json_path):
+    """The console log written by the same run as a k6 JSON output, if it exists"""
+    name = str(json_path)
+    for suffix in JSON_SUFFIXES:
+        if name.endswith(suffix):
+            log_path = Path(name[:-len(suffix)] + '.log')
+            return log_path if log_path.exists() else None
+    return None
+
+
+def parse_any_log(file_path, data):
+    """Parse a console log or a k6 JSON output into an analyzer data dict"""
+    if is_k6_json(file_path):
+        # When the run's console log is present, it supplies the records and the JSON only adds phases
+        return parse_k6_json(file_path, data, scenario_from_path(file_path),
+                             records=console_log_for(file_path) is None)
+    return parse_k6_log(file_path, data)
+
+
+def parse_log_partial(file_path):
+    """Parse one log into a standalone partial aggregate, returning (partial, metrics_text, error)"""
+    try:
+        partial = new_data()
+        metrics_text = parse_any_log(file_path, partial)
+        return partial, metrics_text, None
+    except Exception as e:
+        return None, None, str(e)
+
+
+def iter_log_partials(log_files, jobs=1):
+    """Yield (file_path, partial, metrics_text, error) in input order, parsing in a process pool when jobs > 1"""
+    if jobs is None or jobs <= 0:
+        jobs = os.cpu_count() or 1
+    jobs = min(jobs, len(log_files))
+
+    if jobs <= 1:
+        for file_path in log_files:
+            yield (file_path,) + parse_log_partial(file_path)
+        return
+
+    from concurrent.futures import ProcessPoolExecutor
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        for file_path, result in zip(log_files, pool.map(parse_log_partial, log_files)):
+            yield (file_path,) + result
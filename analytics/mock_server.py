@@ -0,0 +1,412 @@
+#!/usr/bin/env python3
+"""
+Mock Upload Server
+Local stand-in for the file upload API with a PDF-conversion worker queue model
+"""
+
+import argparse
+import asyncio
+import base64
+import json
+import math
+import random
+import re
+import time
+import uuid
+
+from latency_sketch import LatencySketch
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8080
+API_PREFIX = '/api/v1'
+STATS_PATH = '/__mock/stats'
+DEFAULT_WORKERS = 4
+MAX_FILE_BYTES = 10 * 1024 * 1024   # the server's 10MB limit
+DEFAULT_MS_PER_MB = 300.0           # conversion cost on top of the per-type service time
+MAX_LISTED_FILES = 100              # GET /files/ returns the most recent uploads of the user
+PROCESS_STATUS_RE = re.compile(r'/files/(?P<id>[^/]+)/process/status$')
+
+SUPPORTED_TYPES = ('txt', 'docx', 'pptx', 'xlsx', 'pdf')
+
+# Conversion service time per file type; PDFs are stored without conversion
+DEFAULT_SERVICE = {
+    'txt': 'lognormal:150:0.4',
+    'docx': 'lognormal:600:0.5',
+    'pptx': 'lognormal:900:0.5',
+    'xlsx': 'lognormal:700:0.5',
+    'pdf': 'const:20',
+}
+
+BOUNDARY_RE = re.compile(r'boundary="?([^";]+)"?')
+FILENAME_RE = re.compile(r'filename="([^"]*)"')
+PART_TYPE_RE = re.compile(r'Content-Type:\s*([^\r\n]+)', re.I)
+
+STATUS_TEXT = {200: 'OK', 400: 'Bad Request', 401: 'Unauthorized', 404: 'Not Found', 405: 'Method Not Allowed',
+               500: 'Internal Server Error'}
+
+
+# --- Service-time distributions ---------------------------------------------
+# 'const:MS', 'exp:MEAN_MS', 'uniform:LOW_MS:HIGH_MS', 'lognormal:MEDIAN_MS:SIGMA'
+
+DISTRIBUTIONS = {
+    'const': (1, lambda rng, value: value, lambda value: value),
+    'exp': (1, lambda rng, mean: rng.expovariate(1 / mean) if mean > 0 else 0.0, lambda mean: mean),
+    'uniform': (2, lambda rng, low, high: rng.uniform(low, high), lambda low, high: (low + high) / 2),
+    'lognormal': (2, lambda rng, median, sigma: rng.lognormvariate(math.log(median), sigma),
+                  lambda median, sigma: median * math.exp(sigma * sigma / 2)),
+}
+
+
+class ServiceTime:
+    """One parsed service-time distribution (milliseconds)"""
+
+    def __init__(self, spec):
+        name, *params = spec.split(':')
+        if name not in DISTRIBUTIONS:
+            raise ValueError(f"unknown distribution '{name}' (use {', '.join(DISTRIBUTIONS)})")
+        arity, self._sample, self._mean = DISTRIBUTIONS[name]
+        if len(params) != arity:
+            raise ValueError(f"'{name}' takes {arity} parameter(s): {spec}")
+        self.params = [float(p) for p in params]
+        if name == 'lognormal' and self.params[0] <= 0:
+            raise ValueError(f"lognormal median must be positive: {spec}")
+        self.spec = spec
+
+    def sample(self, rng):
+        return max(0.0, self._sample(rng, *self.params))
+
+    def mean(self):
+        return self._mean(*self.params)
+
+
+def parse_service_overrides(specs):
+    """['docx=exp:400', ...] -> {'docx': ServiceTime}, on top of DEFAULT_SERVICE"""
+    service = {file_type: ServiceTime(spec) for file_type, spec in DEFAULT_SERVICE.items()}
+    for item in specs or []:
+        file_type, sep, spec = item.partition('=')
+        if not sep:
+            raise ValueError(f"expected TYPE=DISTRIBUTION, got '{item}'")
+        service[file_type.strip().lower().lstrip('.')] = ServiceTime(spec.strip())
+    return service
+
+
+# --- Conversion queue ----------------------------------------------------------
+
+class ConversionQueue:
+    """First-come-first-served pool of conversion workers with wait/service accounting
+
+    `queue_limit` bounds how many uploads may wait for a worker (0 = unbounded);
+    uploads beyond it are rejected like an overloaded server.
+    """
+
+    def __init__(self, workers, queue_limit=0):
+        self.workers = workers
+        self.queue_limit = queue_limit
+        self.slots = asyncio.Semaphore(workers)
+        self.waiting = 0
+        self.busy = 0
+        self.peak_waiting = 0
+        self.busy_ms = 0.0
+        self.rejected = 0
+        self.wait_sketch = LatencySketch()
+        self.service_sketch = LatencySketch()
+
+    def full(self):
+        return bool(self.queue_limit) and self.waiting >= self.queue_limit
+
+    async def convert(self, service_ms):
+        """Wait for a worker, hold it for service_ms and return the queue wait in ms"""
+        queued = time.perf_counter()
+        self.waiting += 1
+        self.peak_waiting = max(self.peak_waiting, self.waiting)
+        try:
+            await self.slots.acquire()
+        finally:
+            self.waiting -= 1
+        wait_ms = (time.perf_counter() - queued) * 1000
+        self.busy += 1
+        try:
+            await asyncio.sleep(service_ms / 1000)
+        finally:
+            self.busy -= 1
+            self.busy_ms += service_ms
+            self.slots.release()
+        self.wait_sketch.add(wait_ms)
+        self.service_sketch.add(service_ms)
+        return wait_ms
+
+
+# --- Request handling --------------------------------------------------------
+
+def parse_upload(content_type, body):
+    """(filename, part content type, file size in bytes) of a single-file multipart body, or None"""
+    match = BOUNDARY_RE.search(content_type or '')
+    if not match:
+        return None
+    boundary = b'--' + match.group(1).encode('latin-1')
+    start = body.find(boundary)
+    header_end = body.find(b'\r\n\r\n', start)
+    if start < 0 or header_end < 0:
+        return None
+    end = body.find(b'\r\n' + boundary, header_end)
+    if end < 0:
+        return None
+    headers = body[start:header_end].decode('latin-1')
+    filename = FILENAME_RE.search(headers)
+    part_type = PART_TYPE_RE.search(headers)
+    if not filename:
+        return None
+    return filename.group(1), part_type.group(1).strip() if part_type else None, end - header_end - 4
+
+
+def token_user_id(authorization):
+    """The `id` claim of a Bearer JWT (unverified), or None"""
+    if not authorization.startswith('Bearer '):
+        return None
+    token = authorization[7:].strip()
+    parts = token.split('.')
+    if len(parts) != 3:
+        return token or None
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(parts[1] + '=' * (-len(parts[1]) % 4)))
+    except (ValueError, UnicodeDecodeError):
+        return token
+    return str(payload.get('id', token)) if isinstance(payload, dict) else token
+
+
+class MockUploadServer:
+    """asyncio HTTP/1.1 server for POST /files/?type=chat and GET /files/
+
+    Uploads are validated (auth, 10MB limit, supported type), optionally failed
+    with an injected 400, then held for a conversion worker for a service time
+    drawn from the file type's distribution (+ ms_per_mb per MB), and finally
+    answered with the same JSON array shape as the real API or an injected 500.
+    With async_processing the upload is answered as soon as it is accepted and
+    converted in the background; GET /files/{id}/process/status reports pending,
+    completed or failed, for WAIT_READY runs.
+    """
+
+    def __init__(self, workers=DEFAULT_WORKERS, service=None, ms_per_mb=DEFAULT_MS_PER_MB, fail_400=0.0,
+                 fail_500=0.0, queue_limit=0, max_file_bytes=MAX_FILE_BYTES, seed=None, prefix=API_PREFIX,
+                 async_processing=False):
+        self.queue = ConversionQueue(workers, queue_limit)
+        self.service = service or parse_service_overrides(None)
+        self.ms_per_mb = ms_per_mb
+        self.fail_400 = fail_400
+        self.fail_500 = fail_500
+        self.max_file_bytes = max_file_bytes
+        self.rng = random.Random(seed)
+        self.prefix = prefix.rstrip('/')
+        self.files = {}
+        self.async_processing = async_processing
+        self.processing = {}   # file id -> {'user', 'status'}
+        self.tasks = set()
+        self.started = time.time()
+        self.requests = 0
+        self.status_counts = {}
+        self.uploads_by_type = {}
+        self.response_sketch = LatencySketch()
+
+    def expected_capacity(self):
+        """Saturation throughput (uploads/s) of the worker pool for each file type, ignoring size"""
+        return {file_type: self.queue.workers * 1000 / service.mean()
+                for file_type, service in self.service.items() if service.mean() > 0}
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                method, target, _ = (request_line.decode('latin-1').split(' ', 2) + ['', ''])[:3]
+                headers = await _read_headers(reader)
+                length = int(headers.get('content-length') or 0)
+                body = await reader.readexactly(length) if length else b''
+
+                started = time.perf_counter()
+                status, payload = await self.route(method, target, headers, body)
+                self.requests += 1
+                self.status_counts[status] = self.status_counts.get(status, 0) + 1
+                self.response_sketch.add((time.perf_counter() - started) * 1000)
+
+                response = json.dumps(payload).encode()
+                keep_alive = headers.get('connection', '').lower() != 'close'
+                writer.write((f"HTTP/1.1 {status} {STATUS_TEXT.get(status, '')}\r\n"
+                              f"Content-Type: application/json\r\nContent-Length: {len(response)}\r\n"
+                              f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n").encode() + response)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def route(self, method, target, headers, body):
+        path, _, query = target.partition('?')
+        if path == STATS_PATH:
+            return 200, self.stats()
+        status_match = PROCESS_STATUS_RE.match(path[len(self.prefix):]) if path.startswith(self.prefix) else None
+        if path.rstrip('/') != f"{self.prefix}/files" and status_match is None:
+            return 404, {'detail': 'Not Found'}
+        user = token_user_id(headers.get('authorization', ''))
+        if user is None:
+            return 401, {'detail': 'Not authenticated'}
+        if status_match is not None:
+            entry = self.processing.get(status_match.group('id'))
+            if method != 'GET' or entry is None or entry['user'] != user:
+                return 404, {'detail': 'File not found'}
+            return 200, {'status': entry['status']}
+        if method == 'GET':
+            return 200, self.files.get(user, [])[-MAX_LISTED_FILES:]
+        if method == 'POST':
+            return await self.upload(user, headers, body)
+        return 405, {'detail': 'Method Not Allowed'}
+
+    async def upload(self, user, headers, body):
+        upload = parse_upload(headers.get('content-type'), body)
+        if upload is None:
+            return 400, {'detail': 'No file provided'}
+        filename, content_type, size = upload
+        file_type = filename.rsplit('.', 1)[-1].lower() if '.' in filename else ''
+        self.uploads_by_type[file_type] = self.uploads_by_type.get(file_type, 0) + 1
+        if size > self.max_file_bytes:
+            return 400, {'detail': f"File size exceeds the maximum of {self.max_file_bytes // (1024 * 1024)}MB"}
+        if file_type not in SUPPORTED_TYPES:
+            return 400, {'detail': 'The file type is not supported for conversion'}
+        if self.rng.random() < self.fail_400:
+            return 400, {'detail': 'Injected failure: invalid upload'}
+        if self.queue.full():
+            self.queue.rejected += 1
+            return 500, {'detail': 'Conversion queue is full'}
+
+        service = self.service.get(file_type) or self.service['txt']
+        service_ms = service.sample(self.rng)
+        if file_type != 'pdf':
+            service_ms += self.ms_per_mb * size / (1024 * 1024)
+        info = {'id': str(uuid.UUID(int=self.rng.getrandbits(128), version=4)), 'user_id': user, 'filename': filename,
+                'meta': {'name': filename, 'content_type': content_type, 'size': size},
+                'created_at': int(time.time())}
+        if self.async_processing:
+            self.processing[info['id']] = {'user': user, 'status': 'pending'}
+            task = asyncio.ensure_future(self.process(info['id'], service_ms))
+            self.tasks.add(task)
+            task.add_done_callback(self.tasks.discard)
+            self.files.setdefault(user, []).append(info)
+            return 200, [dict(info, data={'status': 'pending'})]
+
+        await self.queue.convert(service_ms)
+        if self.rng.random() < self.fail_500:
+            return 500, {'detail': 'Failed to convert file to PDF'}
+        self.processing[info['id']] = {'user': user, 'status': 'completed'}
+        self.files.setdefault(user, []).append(info)
+        return 200, [info]
+
+    async def process(self, file_id, service_ms):
+        """Background conversion of an accepted upload (async_processing)"""
+        await self.queue.convert(service_ms)
+        self.processing[file_id]['status'] = 'failed' if self.rng.random() < self.fail_500 else 'completed'
+
+    def stats(self):
+        queue = self.queue
+        elapsed = max(time.time() - self.started, 1e-9)
+        return {
+            'uptime_s': round(elapsed, 3),
+            'requests': self.requests,
+            'status_counts': {str(status): count for status, count in sorted(self.status_counts.items())},
+            'uploads_by_type': dict(sorted(self.uploads_by_type.items())),
+            'workers': queue.workers,
+            'busy': queue.busy,
+            'waiting': queue.waiting,
+            'peak_waiting': queue.peak_waiting,
+            'rejected': queue.rejected,
+            'utilization': round(queue.busy_ms / 1000 / (queue.workers * elapsed), 4),
+            'queue_wait_ms': queue.wait_sketch.summary() if queue.wait_sketch.count else None,
+            'service_ms': queue.service_sketch.summary() if queue.service_sketch.count else None,
+            'response_ms': self.response_sketch.summary() if self.response_sketch.count else None,
+            'expected_capacity': {file_type: round(rate, 2) for file_type, rate in self.expected_capacity().items()},
+        }
+
+
+async def _read_headers(reader):
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            return headers
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+
+
+def print_server_stats(stats):
+    """Human-readable shutdown report of a mock server run"""
+    print("\n" + "=" * 60)
+    print("🧪 MOCK SERVER REPORT")
+    print("=" * 60)
+    print(f"📨 {stats['requests']} requests in {stats['uptime_s']:.1f}s, status "
+          + ", ".join(f"{status}: {count}" for status, count in stats['status_counts'].items()))
+    if stats['uploads_by_type']:
+        print("📁 Uploads: " + ", ".join(f"{file_type or '?'}: {count}"
+                                         for file_type, count in stats['uploads_by_type'].items()))
+    print(f"⚙️  {stats['workers']} conversion workers, utilization {stats['utilization'] * 100:.1f}%, "
+          f"peak queue {stats['peak_waiting']}" + (f", {stats['rejected']} rejected" if stats['rejected'] else ""))
+    for label, key in (('Queue wait', 'queue_wait_ms'), ('Conversion', 'service_ms'), ('Response', 'response_ms')):
+        summary = stats[key]
+        if summary:
+            print(f"⏱️  {label}: p50 {summary['median']:.0f} ms, p95 {summary['p95']:.0f} ms, "
+                  f"max {summary['max']:.0f} ms")
+
+
+def mock_main(argv=None):
+    """`analytics.py mock`: serve the upload API locally until interrupted"""
+    parser = argparse.ArgumentParser(prog='analytics.py mock',
+                                     description='Run a local stand-in for the upload API with a conversion queue model',
+                                     epilog='Point k6 at it with API_BASE_URL=http://127.0.0.1:8080/api/v1 ./run_test.sh N, '
+                                            'or use analytics.py loadgen N --base-url http://127.0.0.1:8080/api/v1')
+    parser.add_argument('--host', default=DEFAULT_HOST, help=f'Listen address (default: {DEFAULT_HOST})')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help=f'Listen port (default: {DEFAULT_PORT})')
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS,
+                        help=f'Concurrent PDF conversions (default: {DEFAULT_WORKERS})')
+    parser.add_argument('--service', action='append', metavar='TYPE=DIST',
+                        help="Service time per file type, e.g. docx=lognormal:600:0.5, txt=exp:150, "
+                             "xlsx=uniform:300:900, pdf=const:20 (repeatable)")
+    parser.add_argument('--ms-per-mb', type=float, default=DEFAULT_MS_PER_MB,
+                        help=f'Extra conversion time per MB of upload (default: {DEFAULT_MS_PER_MB:g})')
+    parser.add_argument('--fail-400', type=float, default=0.0, help='Probability of an injected 400 (default: 0)')
+    parser.add_argument('--fail-500', type=float, default=0.0,
+                        help='Probability of an injected 500 after conversion (default: 0)')
+    parser.add_argument('--queue-limit', type=int, default=0,
+                        help='Uploads allowed to wait for a worker before 500s are returned (default: unbounded)')
+    parser.add_argument('--max-file-mb', type=float, default=MAX_FILE_BYTES / (1024 * 1024),
+                        help='Upload size limit in MB (default: 10)')
+    parser.add_argument('--async-processing', action='store_true',
+                        help='Answer uploads once accepted and convert in the background; progress is served at '
+                             'GET /files/{id}/process/status (for WAIT_READY=true runs)')
+    parser.add_argument('--seed', type=int, help='Seed for service times and failure injection')
+    args = parser.parse_args(argv)
+
+    try:
+        service = parse_service_overrides(args.service)
+    except ValueError as e:
+        parser.error(str(e))
+    server = MockUploadServer(args.workers, service, args.ms_per_mb, args.fail_400, args.fail_500, args.queue_limit,
+                              int(args.max_file_mb * 1024 * 1024), args.seed, async_processing=args.async_processing)
+
+    async def serve():
+        listener = await asyncio.start_server(server.handle, args.host, args.port, backlog=4096)
+        print(f"🧪 Mock upload API on http://{args.host}:{args.port}{API_PREFIX} "
+              f"({args.workers} conversion workers; stats at {STATS_PATH})")
+        for file_type, rate in sorted(server.expected_capacity().items()):
+            print(f"   {file_type}: {server.service[file_type].spec}, saturates at ~{rate:.1f} uploads/s")
+        async with listener:
+            await listener.serve_forever()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+    except OSError as e:
+        print(f"❌ {e}")
+        return 2
+    print_server_stats(server.stats())
+    return 0
@@ -0,0 +1,363 @@
+#!/usr/bin/env python3
+"""
+Columnar Record Store
+Compact array-backed storage for per-request upload outcomes
+"""
+
+import math
+import re
+from array import array
+from datetime import datetime, timezone
+
+from latency_sketch import LatencySketch
+
+NAN = float('nan')
+EXTRA_FRACTION_RE = re.compile(r'(\.\d{6})\d+')
+
+
+def _numpy():
+    """numpy if installed (aggregations fall back to pure Python otherwise)"""
+    try:
+        import numpy as np
+        return np
+    except ImportError:
+        return None
+
+
+def parse_timestamp(value):
+    """Convert an ISO-8601 k6 timestamp (2025-06-13T12:25:40.294Z) to epoch seconds"""
+    if not value:
+        return NAN
+    try:
+        # k6 JSON output carries nanoseconds; datetime only takes microseconds
+        value = EXTRA_FRACTION_RE.sub(r'\1', value.replace('Z', '+00:00'))
+        return datetime.fromisoformat(value).timestamp()
+    except ValueError:
+        return NAN
+
+
+def format_timestamp(epoch):
+    """Convert epoch seconds back to the k6 ISO-8601 form"""
+    if epoch is None or math.isnan(epoch):
+        return ''
+    return datetime.fromtimestamp(epoch, timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.%f')[:-3] + 'Z'
+
+
+class Categorical:
+    """Interned string table mapping labels to small integer codes"""
+
+    def __init__(self):
+        self.values = []
+        self.codes = {}
+
+    def code(self, value):
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def __len__(self):
+        return len(self.values)
+
+
+class RecordStore:
+    """Columnar store of upload outcomes: one typed array per field plus categorical codes"""
+
+    NUMERIC_COLUMNS = {
+        'timestamp': 'd',   # epoch seconds of the outcome line (NaN if unknown)
+        'duration': 'd',    # upload latency in ms (NaN if the log does not report one)
+        'size': 'q',        # payload bytes (-1 if unknown)
+        'status': 'h',      # HTTP status code
+        'ok': 'b',          # 1 for a successful upload
+    }
+    CATEGORICAL_COLUMNS = {
+        'filename': 'I',
+        'scenario': 'H',
+        'file_type': 'H',
+    }
+
+    START_COLUMNS = {
+        'start_timestamp': 'd',  # epoch seconds of the "Starting upload" line
+        'start_size': 'q',       # payload bytes announced at start
+        'start_scenario': 'H',   # code into the scenario categories
+    }
+
+    REQUEST_COLUMNS = {
+        'request_scenario': 'H',   # code into the scenario categories
+        'request_filename': 'I',   # code into the filename categories
+        'request_vu': 'i',         # k6 VU number (-1 if the log does not carry it)
+        'request_iteration': 'q',  # k6 iteration of that VU (-1 if unknown)
+        'request_start': 'd',      # epoch seconds of "Starting upload" (NaN if never seen)
+        'request_prepared': 'd',   # epoch seconds of "HTTP request prepared" (NaN if never seen)
+        'request_end': 'd',        # epoch seconds of the outcome (NaN for orphans)
+        'request_size': 'q',       # payload bytes (-1 if unknown)
+        'request_status': 'h',     # HTTP status (0 for errors, timeouts and orphans)
+        'request_duration': 'd',   # ms: the logged upload time, else end - start
+        'request_state': 'b',      # index into REQUEST_STATES
+        'request_intended': 'd',   # epoch seconds the arrival-rate schedule wanted it sent (NaN in closed-model runs)
+        'request_user': 'i',       # index into USER_TOKENS of the bearer token (-1 if the log does not carry it)
+        'request_attempts': 'H',   # POSTs sent, 1 unless the client retry policy retried it
+        'request_signature': 'I',  # code into the signature categories: normalized failure body or error ('' if none)
+        'request_ready': 'b',      # index into READY_STATES (WAIT_READY runs poll until processing finishes)
+        'request_processing': 'd', # ms from the upload response to ready, failed or timeout (NaN if not measured)
+        'request_polls': 'H',      # readiness polls sent
+    }
+    # Request columns holding codes into a categories table
+    REQUEST_CATEGORIES = {'request_scenario': 'scenario', 'request_filename': 'filename',
+                          'request_signature': 'signature'}
+    REQUEST_STATES = ('success', 'failure', 'timeout', 'error', 'orphaned')
+    READY_STATES = ('unmeasured', 'ready', 'failed', 'timeout')
+
+    def __init__(self):
+        self.columns = {name: array(code) for name, code in self.NUMERIC_COLUMNS.items()}
+        self.columns.update({name: array(code) for name, code in self.CATEGORICAL_COLUMNS.items()})
+        self.categories = {name: Categorical() for name in self.CATEGORICAL_COLUMNS}
+        self.categories['signature'] = Categorical()
+        self.starts = {name: array(code) for name, code in self.START_COLUMNS.items()}
+        self.requests = {name: array(code) for name, code in self.REQUEST_COLUMNS.items()}
+
+    def __len__(self):
+        return len(self.columns['ok'])
+
+    def append(self, scenario, filename, ok, status, duration=None, timestamp=None, size=None):
+        """Append one upload outcome"""
+        c = self.columns
+        c['timestamp'].append(parse_timestamp(timestamp) if isinstance(timestamp, str) else
+                              (NAN if timestamp is None else timestamp))
+        c['duration'].append(NAN if duration is None else duration)
+        c['size'].append(-1 if size is None else size)
+        c['status'].append(status)
+        c['ok'].append(1 if ok else 0)
+        c['filename'].append(self.categories['filename'].code(filename))
+        c['scenario'].append(self.categories['scenario'].code(scenario))
+        c['file_type'].append(self.categories['file_type'].code(filename.split('.')[-1]))
+
+    def append_start(self, scenario, timestamp, size):
+        """Record the start of an upload (outcomes are appended separately)"""
+        self.starts['start_timestamp'].append(parse_timestamp(timestamp) if isinstance(timestamp, str) else
+                                              (NAN if timestamp is None else timestamp))
+        self.starts['start_size'].append(-1 if size is None else size)
+        self.starts['start_scenario'].append(self.categories['scenario'].code(scenario))
+
+    def append_request(self, scenario, filename, state, vu=None, iteration=None, start=NAN, prepared=NAN,
+                       end=NAN, size=None, status=0, duration=None, intended=NAN, user=None, attempts=1,
+                       signature=''):
+        """Record one correlated request lifecycle (see correlation.RequestCorrelator)"""
+        r = self.requests
+        r['request_scenario'].append(self.categories['scenario'].code(scenario))
+        r['request_filename'].append(self.categories['filename'].code(filename))
+        r['request_vu'].append(-1 if vu is None else vu)
+        r['request_iteration'].append(-1 if iteration is None else iteration)
+        r['request_start'].append(start)
+        r['request_prepared'].append(prepared)
+        r['request_end'].append(end)
+        r['request_size'].append(-1 if size is None else size)
+        r['request_status'].append(status)
+        r['request_duration'].append(NAN if duration is None else duration)
+        r['request_state'].append(self.REQUEST_STATES.index(state))
+        r['request_intended'].append(intended)
+        r['request_user'].append(-1 if user is None else user)
+        r['request_attempts'].append(attempts)
+        r['request_signature'].append(self.categories['signature'].code(signature))
+        r['request_ready'].append(0)
+        r['request_processing'].append(NAN)
+        r['request_polls'].append(0)
+
+    def set_request_ready(self, index, state, processing, polls):
+        """Record the readiness outcome of a request appended earlier (logged after its upload outcome)"""
+        r = self.requests
+        r['request_ready'][index] = self.READY_STATES.index(state)
+        r['request_processing'][index] = NAN if processing is None else processing
+        r['request_polls'][index] = polls
+
+    def set_request_signature(self, index, signature):
+        """Attach a failure signature to a request appended earlier (bodies can be logged after the outcome)"""
+        self.requests['request_signature'][index] = self.categories['signature'].code(signature)
+
+    def extend(self, other):
+        """Append every record of another store, remapping its categorical codes"""
+        for name in self.NUMERIC_COLUMNS:
+            self.columns[name].extend(other.columns[name])
+        for name in self.CATEGORICAL_COLUMNS:
+            remap = [self.categories[name].code(value) for value in other.categories[name].values]
+            self.columns[name].extend(array(self.columns[name].typecode,
+                                            (remap[code] for code in other.columns[name])))
+        self.starts['start_timestamp'].extend(other.starts['start_timestamp'])
+        self.starts['start_size'].extend(other.starts['start_size'])
+        remap = [self.categories['scenario'].code(value) for value in other.categories['scenario'].values]
+        self.starts['start_scenario'].extend(array('H', (remap[code] for code in other.starts['start_scenario'])))
+        for name, values in other.requests.items():
+            if name in self.REQUEST_CATEGORIES:
+                column = self.REQUEST_CATEGORIES[name]
+                remap = [self.categories[column].code(value) for value in other.categories[column].values]
+                values = array(values.typecode, (remap[code] for code in values))
+            self.requests[name].extend(values)
+
+    TIME_COLUMNS = (('columns', 'timestamp'), ('starts', 'start_timestamp'), ('requests', 'request_start'),
+                    ('requests', 'request_prepared'), ('requests', 'request_end'), ('requests', 'request_intended'))
+
+    def shift_time(self, seconds):
+        """Move every epoch timestamp by `seconds` (NaN stays NaN), e.g. onto another host's clock"""
+        if not seconds:
+            return
+        for table, name in self.TIME_COLUMNS:
+            column = getattr(self, table)[name]
+            column[:] = array('d', (value + seconds for value in column))
+
+    def label(self, column, index):
+        """Decoded categorical value of one record"""
+        return self.categories[column].values[self.columns[column][index]]
+
+    def labels(self, column):
+        return self.categories[column].values
+
+    def nbytes(self):
+        """Approximate memory held by the column buffers"""
+        tables = list(self.columns.values()) + list(self.starts.values()) + list(self.requests.values())
+        return sum(col.itemsize * len(col) for col in tables)
+
+    # --- Views -------------------------------------------------------------
+
+    def success_count(self):
+        return sum(self.columns['ok'])
+
+    def failure_count(self):
+        return len(self) - self.success_count()
+
+    def success_durations(self):
+        """Latencies (ms) of successful uploads in record order"""
+        np = _numpy()
+        if np is not None and len(self):
+            ok = np.frombuffer(self.columns['ok'], dtype='b').astype(bool)
+            return np.frombuffer(self.columns['duration'], dtype='d')[ok].tolist()
+        return [d for d, ok in zip(self.columns['duration'], self.columns['ok']) if ok]
+
+    def success_series(self, scenario=None):
+        """(epoch seconds, latency ms) of successful uploads ordered by time, optionally for one scenario"""
+        c = self.columns
+        code = None if scenario is None else self.categories['scenario'].codes.get(scenario)
+        np = _numpy()
+        if np is not None and len(self):
+            timestamps = np.frombuffer(c['timestamp'], dtype='d')
+            keep = np.frombuffer(c['ok'], dtype='b').astype(bool) & ~np.isnan(timestamps)
+            if scenario is not None:
+                keep &= np.frombuffer(c['scenario'], dtype=c['scenario'].typecode) == code
+            timestamps = timestamps[keep]
+            durations = np.frombuffer(c['duration'], dtype='d')[keep]
+            order = np.lexsort((durations, timestamps))
+            return timestamps[order].tolist(), durations[order].tolist()
+
+        points = [(t, d) for t, d, ok, sc in zip(c['timestamp'], c['duration'], c['ok'], c['scenario'])
+                  if ok and not math.isnan(t) and (scenario is None or sc == code)]
+        points.sort()
+        return [t for t, _ in points], [d for _, d in points]
+
+    def failure_statuses(self):
+        """HTTP status codes of failed uploads in record order"""
+        return [s for s, ok in zip(self.columns['status'], self.columns['ok']) if not ok]
+
+    def iter_records(self):
+        """Yield each record as a plain dict (for export and ad-hoc inspection)"""
+        c = self.columns
+        for i in range(len(self)):
+            duration = c['duration'][i]
+            size = c['size'][i]
+            yield {
+                'filename': self.label('filename', i),
+                'scenario': self.label('scenario', i),
+                'status': 'success' if c['ok'][i] else 'failure',
+                'status_code': c['status'][i],
+                'duration': None if math.isnan(duration) else int(duration),
+                'size': None if size < 0 else size,
+                'timestamp': format_timestamp(c['timestamp'][i]),
+            }
+
+    def iter_requests(self):
+        """Yield each correlated request lifecycle as a plain dict"""
+        r = self.requests
+        scenarios = self.categories['scenario'].values
+        filenames = self.categories['filename'].values
+        signatures = self.categories['signature'].values
+        for i in range(len(r['request_state'])):
+            duration = r['request_duration'][i]
+            size = r['request_size'][i]
+            filename = filenames[r['request_filename'][i]]
+            yield {
+                'scenario': scenarios[r['request_scenario'][i]],
+                'filename': filename,
+                'file_type': filename.split('.')[-1],
+                'vu': None if r['request_vu'][i] < 0 else r['request_vu'][i],
+                'iteration': None if r['request_iteration'][i] < 0 else r['request_iteration'][i],
+                'user': None if r['request_user'][i] < 0 else r['request_user'][i],
+                'attempts': r['request_attempts'][i],
+                'signature': signatures[r['request_signature'][i]],
+                'ready': self.READY_STATES[r['request_ready'][i]],
+                'processing': None if math.isnan(r['request_processing'][i]) else r['request_processing'][i],
+                'polls': r['request_polls'][i],
+                'state': self.REQUEST_STATES[r['request_state'][i]],
+                'status': r['request_status'][i],
+                'size': None if size < 0 else size,
+                'duration': None if math.isnan(duration) else duration,
+                'start': format_timestamp(r['request_start'][i]),
+                'prepared': format_timestamp(r['request_prepared'][i]),
+                'end': format_timestamp(r['request_end'][i]),
+                'intended': format_timestamp(r['request_intended'][i]),
+            }
+
+    # --- Aggregations ------------------------------------------------------
+
+    def latency_sketches(self, by):
+        """One latency sketch of successful uploads per label of a categorical column"""
+        labels = self.labels(by)
+        np = _numpy()
+        if np is not None and len(self):
+            codes = np.frombuffer(self.columns[by], dtype=self.columns[by].typecode)
+            ok = np.frombuffer(self.columns['ok'], dtype='b').astype(bool)
+            durations = np.frombuffer(self.columns['duration'], dtype='d')[ok]
+            return dict(zip(labels, LatencySketch.grouped(codes[ok], durations, len(labels))))
+
+        sketches = {label: LatencySketch() for label in labels}
+        for code, ok, duration in zip(self.columns[by], self.columns['ok'], self.columns['duration']):
+            if ok:
+                sketches[labels[code]].add(duration)
+        return sketches
+
+    def latency_summary(self):
+        """Mean/median/min/max/p95/p99 of successful upload latencies, merged from the per-scenario sketches"""
+        return LatencySketch.merged(self.latency_sketches('scenario').values()).summary()
+
+    def group_summary(self, by):
+        """Per-group request counts, error rate and latency percentiles, grouped by a categorical column"""
+        labels = self.labels(by)
+        np = _numpy()
+        if np is not None and len(self):
+            codes = np.frombuffer(self.columns[by], dtype=self.columns[by].typecode).astype(np.int64)
+            ok = np.frombuffer(self.columns['ok'], dtype='b').astype(bool)
+            requests = np.bincount(codes, minlength=len(labels)).tolist()
+            failures = np.bincount(codes[~ok], minlength=len(labels)).tolist()
+        else:
+            requests = [0] * len(labels)
+            failures = [0] * len(labels)
+            for code, ok in zip(self.columns[by], self.columns['ok']):
+                requests[code] += 1
+                if not ok:
+                    failures[code] += 1
+
+        summary = {}
+        for code, (label, sketch) in enumerate(self.latency_sketches(by).items()):
+            row = {
+                'requests': requests[code],
+                'successes': requests[code] - failures[code],
+                'failures': failures[code],
+                'error_rate': (failures[code] / requests[code]) * 100 if requests[code] else 0.0,
+            }
+            if sketch.count:
+                row.update({
+                    'mean': sketch.mean(),
+                    'p50': sketch.percentile(50),
+                    'p95': sketch.percentile(95),
+                    'max': float(sketch.max),
+                })
+            summary[label] = row
+        return summary
@@ -0,0 +1,307 @@
+#!/usr/bin/env python3
+"""
+Sharded Load Execution
+Splits a scenario across k6 processes or hosts with execution segments and merges the shards into one run
+"""
+
+import argparse
+import json
+import math
+import shlex
+import subprocess
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from fractions import Fraction
+from pathlib import Path
+
+from k6_summary import legacy_metrics, merge_summaries, parse_summary
+from log_parser import SHARD_MANIFEST, find_log_files, iter_log_partials, merge_data, new_data
+
+REPO_ROOT = Path('..')          # k6 runs from the repository root, like run_test.sh
+LOGS_DIRECTORY = '../logs'
+LOCAL = 'local'
+CLOCK_PROBE = 'date +%s.%N'     # GNU date; BSD date prints a literal N and the probe falls back to whole seconds
+
+
+def _fraction(value):
+    return str(value.numerator) if value.denominator == 1 else f"{value.numerator}/{value.denominator}"
+
+
+def execution_segment(index, count):
+    """k6 --execution-segment of shard `index` (1-based) of `count`: '1/4:1/2' for 2 of 4"""
+    return f"{_fraction(Fraction(index - 1, count))}:{_fraction(Fraction(index, count))}"
+
+
+def segment_sequence(count):
+    """k6 --execution-segment-sequence shared by all shards, so VUs are striped consistently"""
+    return ",".join(_fraction(Fraction(i, count)) for i in range(count + 1))
+
+
+def k6_command(scenario, index, count, json_path=None, vus=None, duration=None, env=()):
+    command = ['k6', 'run', '--execution-segment', execution_segment(index, count),
+               '--execution-segment-sequence', segment_sequence(count), '-e', f"SHARD={index}/{count}"]
+    for item in env:
+        command += ['-e', item]
+    if vus is not None:
+        command += ['--vus', str(vus)]
+    if duration:
+        command += ['--duration', duration]
+    if json_path:
+        command += ['--out', f"json={json_path}"]
+    return command + [str(scenario)]
+
+
+def clock_offset(host):
+    """Remote clock minus local clock in seconds, from the midpoint of one ssh round trip"""
+    before = time.time()
+    result = subprocess.run(['ssh', host, CLOCK_PROBE], capture_output=True, text=True, timeout=60, check=True)
+    after = time.time()
+    text = result.stdout.strip()
+    remote = float(text) if text.replace('.', '', 1).isdigit() else float(text.split('.')[0])
+    return remote - (before + after) / 2
+
+
+def plan_shards(label, count, hosts, json_output=False):
+    """One entry per shard: hosts are assigned round-robin, log names keep the scenario label"""
+    return [{'index': index, 'host': hosts[(index - 1) % len(hosts)],
+             'segment': execution_segment(index, count),
+             'log': f"{label}_shard{index}of{count}.log",
+             'json': f"{label}_shard{index}of{count}.json.gz" if json_output else None,
+             'clock_offset': 0.0}
+            for index in range(1, count + 1)]
+
+
+def write_manifest(directory, manifest):
+    with open(Path(directory) / SHARD_MANIFEST, 'w') as f:
+        json.dump(manifest, f, indent=2)
+
+
+def load_shard_manifest(directory):
+    """The manifest of a sharded run directory, or None for an ordinary logs directory"""
+    path = Path(directory) / SHARD_MANIFEST
+    if not path.is_file():
+        return None
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
+def run_k6_shards(manifest, run_directory, scenario, remote_directory, vus=None, duration=None, env=()):
+    """Launch every shard at once (locally or over ssh), stream their consoles into the shard logs and wait"""
+    processes = []
+    for shard in manifest['shards']:
+        log = open(run_directory / shard['log'], 'w')
+        if shard['host'] == LOCAL:
+            json_path = (run_directory / shard['json']).resolve() if shard['json'] else None
+            command = k6_command(scenario, shard['index'], manifest['count'], json_path, vus, duration, env)
+            process = subprocess.Popen(command, cwd=REPO_ROOT, stdout=log, stderr=subprocess.STDOUT)
+        else:
+            remote_json = f"logs/{run_directory.name}/{shard['json']}" if shard['json'] else None
+            command = k6_command(scenario, shard['index'], manifest['count'], remote_json, vus, duration, env)
+            remote = (f"cd {shlex.quote(remote_directory)} && mkdir -p logs/{shlex.quote(run_directory.name)} && "
+                      + shlex.join(command))
+            process = subprocess.Popen(['ssh', shard['host'], remote], stdout=log, stderr=subprocess.STDOUT)
+        processes.append((shard, process, log))
+        print(f"🚀 Shard {shard['index']}/{manifest['count']} ({shard['segment']}) on {shard['host']} → {shard['log']}")
+
+    for shard, process, log in processes:
+        shard['exit_code'] = process.wait()
+        log.close()
+        if shard['host'] != LOCAL and shard['json']:
+            source = f"{shard['host']}:{remote_directory}/logs/{run_directory.name}/{shard['json']}"
+            subprocess.run(['scp', '-q', source, str(run_directory / shard['json'])], check=False)
+
+
+def _run_python_shard(script, index, count, log_path, vus, duration, rate, base_url, seed):
+    """One loadgen shard in its own process; returns its exit code"""
+    from loadgen import run_load
+
+    data, _ = run_load(script, vus, duration, rate, base_url=base_url, log_path=log_path,
+                       seed=None if seed is None else seed + index, shard=(index, count))
+    return 0 if data['success_count'] + data['failure_count'] else 1
+
+
+def run_python_shards(manifest, run_directory, script, vus=None, duration=None, rate=None, base_url=None, seed=None):
+    """Every shard as a separate local process running the Python load generator"""
+    with ProcessPoolExecutor(max_workers=manifest['count']) as pool:
+        futures = []
+        for shard in manifest['shards']:
+            print(f"🚀 Shard {shard['index']}/{manifest['count']} ({shard['segment']}) in a Python process "
+                  f"→ {shard['log']}")
+            futures.append(pool.submit(_run_python_shard, str(script), shard['index'], manifest['count'],
+                                       str(run_directory / shard['log']), vus, duration, rate, base_url, seed))
+        for shard, future in zip(manifest['shards'], futures):
+            try:
+                shard['exit_code'] = future.result()
+            except (OSError, ValueError) as e:
+                print(f"⚠️  Shard {shard['index']} failed: {e}")
+                shard['exit_code'] = 2
+
+
+def _bounds(records):
+    """(first start, last outcome) epoch seconds of one store, or None"""
+    starts = [t for t in records.starts['start_timestamp'] if not math.isnan(t)]
+    ends = [t for t in records.columns['timestamp'] if not math.isnan(t)]
+    if not starts and not ends:
+        return None
+    return min(starts + ends), max(ends + starts)
+
+
+def merge_shards(directory, jobs=1):
+    """Parse every shard of a run onto the local clock and merge them: (data, summary, per-shard rows)
+
+    Each shard's timestamps are shifted by its host's measured clock offset, so the
+    merged time series, phases and windows line up; latency distributions merge
+    exactly because the request records themselves are combined.
+    """
+    directory = Path(directory)
+    manifest = load_shard_manifest(directory)
+    by_file = {}
+    rows = []
+    for shard in manifest['shards']:
+        row = {'shard': shard, 'data': new_data()}
+        rows.append(row)
+        for key in ('log', 'json'):
+            if shard.get(key):
+                by_file[shard[key]] = row
+
+    data = new_data()
+    summaries = []
+    for file_path, partial, metrics_text, error in iter_log_partials(find_log_files(directory), jobs):
+        if error:
+            print(f"⚠️  Error parsing {file_path}: {error}")
+            continue
+        row = by_file.get(Path(file_path).name)
+        if row is not None:
+            partial['records'].shift_time(-row['shard'].get('clock_offset', 0.0))
+            merge_data(row['data'], partial)
+        merge_data(data, partial)
+        if metrics_text:
+            summaries.append(parse_summary(metrics_text))
+    return data, (merge_summaries(summaries) if summaries else None), rows
+
+
+def apply_summary(data, summary):
+    if summary:
+        data['metrics'].update(legacy_metrics(summary))
+        data['metrics']['summary'] = summary
+
+
+def print_shard_report(manifest, data, rows):
+    print("\n" + "=" * 60)
+    print(f"🧩 SHARDED RUN: {manifest['scenario']} across {manifest['count']} shards ({manifest['engine']})")
+    print("=" * 60)
+    bounds = {id(row): _bounds(row['data']['records']) for row in rows}
+    first = min((b[0] for b in bounds.values() if b), default=None)
+    print(f"{'Shard':7} {'Host':18} {'Segment':10} {'Reqs':>6} {'Fail %':>7} {'p95 ms':>8} {'Start skew':>11} {'Clock':>9}")
+    for row in rows:
+        shard, records = row['shard'], row['data']['records']
+        requests = len(records)
+        latency = records.latency_summary() if records.success_count() else None
+        skew = f"{bounds[id(row)][0] - first:+.2f}s" if bounds[id(row)] and first is not None else "n/a"
+        print(f"{shard['index']:>2}/{manifest['count']:<4} {shard['host'][:18]:18} {shard['segment']:10} {requests:>6} "
+              f"{(records.failure_count() / requests * 100 if requests else 0):>7.1f} "
+              f"{(latency['p95'] if latency else float('nan')):>8.0f} {skew:>11} {shard.get('clock_offset', 0.0):>+8.3f}s"
+              + (f"  (exit {shard['exit_code']})" if shard.get('exit_code') else ""))
+
+    records = data['records']
+    total = len(records)
+    span = _bounds(records)
+    print(f"\n📊 Merged: {total} requests, {records.failure_count()} failed"
+          + (f" ({records.failure_count() / total * 100:.1f}%)" if total else ""))
+    if records.success_count():
+        latency = records.latency_summary()
+        print(f"⏱️  p50 {latency['median']:.0f} ms, p95 {latency['p95']:.0f} ms, p99 {latency['p99']:.0f} ms "
+              f"(all shards' requests, not an average of shard percentiles)")
+    if span and span[1] > span[0]:
+        print(f"🚀 {records.success_count() / (span[1] - span[0]):.2f} successful uploads/s over {span[1] - span[0]:.1f}s")
+
+
+def shard_main(argv=None):
+    """`analytics.py shard run|merge`: distributed execution and shard-aware merging"""
+    from capacity import resolve_scenario
+
+    parser = argparse.ArgumentParser(prog='analytics.py shard',
+                                     description='Split a scenario across several k6 processes or hosts and merge the results')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run = commands.add_parser('run', help='Run a scenario as N shards (execution segments) and merge them')
+    run.add_argument('scenario', help='Scenario number (e.g. 8) or path to a scenario script')
+    run.add_argument('-n', '--shards', type=int, default=2, help='Number of shards (default: 2)')
+    run.add_argument('--hosts', default=LOCAL,
+                     help="Comma-separated ssh hosts, assigned round-robin; 'local' runs on this machine (default: local)")
+    run.add_argument('--remote-dir', default=REPO_ROOT.resolve().name,
+                     help='Checkout of this repository on the remote hosts, relative to their home (default: %(default)s)')
+    run.add_argument('--engine', choices=('k6', 'python'), default='k6',
+                     help='k6 processes, or local Python load generator processes (default: k6)')
+    run.add_argument('--vus', type=int, help='Total VUs across all shards (overrides the script)')
+    run.add_argument('--duration', help='Test duration (overrides the script)')
+    run.add_argument('--rate', type=float, help='Total arrival rate in iterations/s (--engine python)')
+    run.add_argument('--base-url', help='API base URL passed to every shard')
+    run.add_argument('-e', '--env', action='append', default=[], metavar='KEY=VALUE',
+                     help='Extra k6 environment variable for every shard (repeatable), e.g. LOG_FORMAT=ndjson')
+    run.add_argument('--json', action='store_true', help='Also write (and fetch) each shard\'s k6 JSON output')
+    run.add_argument('--seed', type=int, help='Seed for the Python shards (shard i uses seed + i)')
+    run.add_argument('-d', '--directory', default=LOGS_DIRECTORY, help='Where the run directory is created')
+
+    merge = commands.add_parser('merge', help='Merge the shards of a finished run directory')
+    merge.add_argument('run_directory', help='Directory holding shards.json and the shard logs')
+    merge.add_argument('-j', '--jobs', type=int, default=1, help='Parse shard logs in N processes (0 = all cores)')
+    args = parser.parse_args(argv)
+
+    if args.command == 'merge':
+        manifest = load_shard_manifest(args.run_directory)
+        if manifest is None:
+            print(f"❌ No {SHARD_MANIFEST} in {args.run_directory}")
+            return 1
+        data, _, rows = merge_shards(args.run_directory, args.jobs)
+        print_shard_report(manifest, data, rows)
+        return 0
+
+    script = resolve_scenario(args.scenario)
+    if script is None:
+        parser.error(f"scenario '{args.scenario}' not found in ../scenarios")
+    if args.shards < 1:
+        parser.error("--shards must be at least 1")
+    hosts = [host.strip() for host in args.hosts.split(',') if host.strip()]
+    if args.engine == 'python' and any(host != LOCAL for host in hosts):
+        parser.error("--engine python runs local processes only")
+    if args.rate is not None and args.engine != 'python':
+        parser.error("--rate needs --engine python (k6 takes arrival rates from the scenario script)")
+
+    label = Path(script).stem.split('_')[0]
+    run_directory = Path(args.directory) / f"{label}_{datetime.now().strftime('%Y%m%d_%H%M%S')}_shards"
+    run_directory.mkdir(parents=True, exist_ok=True)
+    manifest = {'scenario': Path(script).name, 'engine': args.engine, 'count': args.shards,
+                'segment_sequence': segment_sequence(args.shards), 'started': datetime.now().isoformat(),
+                'shards': plan_shards(label, args.shards, hosts, args.json and args.engine == 'k6')}
+
+    offsets = {}
+    for host in sorted({shard['host'] for shard in manifest['shards']} - {LOCAL}):
+        try:
+            offsets[host] = clock_offset(host)
+        except (OSError, ValueError, subprocess.SubprocessError) as e:
+            print(f"❌ Cannot reach {host} over ssh: {e}")
+            return 2
+        print(f"🕒 {host}: clock offset {offsets[host]:+.3f}s")
+    for shard in manifest['shards']:
+        shard['clock_offset'] = offsets.get(shard['host'], 0.0)
+    write_manifest(run_directory, manifest)
+
+    env = list(args.env) + ([f"API_BASE_URL={args.base_url}"] if args.base_url else [])
+    try:
+        if args.engine == 'python':
+            run_python_shards(manifest, run_directory, script, args.vus, args.duration, args.rate,
+                              args.base_url, args.seed)
+        else:
+            scenario = Path(script).resolve().relative_to(REPO_ROOT.resolve())
+            run_k6_shards(manifest, run_directory, scenario, args.remote_dir, args.vus, args.duration, env)
+    except FileNotFoundError:
+        print("❌ k6 (or ssh) is not installed or not on PATH")
+        return 2
+    write_manifest(run_directory, manifest)
+
+    data, _, rows = merge_shards(run_directory)
+    print_shard_report(manifest, data, rows)
+    print(f"\n📄 Full report: python3 analytics.py -d {run_directory}")
+    return 0 if len(data['records']) else 1
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Inline SVG Charts
+Dependency-free chart rendering so HTML reports work offline
+"""
+
+import math
+from datetime import datetime
+from html import escape
+
+WIDTH = 800
+HEIGHT = 320
+MARGIN_LEFT = 70
+MARGIN_RIGHT = 70
+MARGIN_TOP = 20
+MARGIN_BOTTOM = 60
+PALETTE = ('#9b59b6', '#3498db', '#e67e22', '#27ae60', '#e74c3c', '#95a5a6', '#1abc9c', '#34495e')
+
+
+def nice_ticks(low, high, count=5):
+    """Round tick values covering [low, high]"""
+    if high <= low:
+        high = low + 1
+    raw = (high - low) / count
+    magnitude = 10 ** math.floor(math.log10(raw))
+    step = min((m * magnitude for m in (1, 2, 2.5, 5, 10) if m * magnitude >= raw), default=raw)
+    start = math.floor(low / step) * step
+    ticks = []
+    value = start
+    while value <= high + step * 1e-9:
+        ticks.append(value)
+        value += step
+    return ticks
+
+
+def _format_tick(value):
+    if abs(value) >= 1000:
+        return f"{value:,.0f}"
+    return f"{value:g}"
+
+
+def _svg(body, width=WIDTH, height=HEIGHT):
+    return (f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 {width} {height}" '
+            f'width="100%" role="img" font-family="Segoe UI, sans-serif" font-size="12">{body}</svg>')
+
+
+def _legend(entries, y=HEIGHT - 12):
+    parts = []
+    x = MARGIN_LEFT
+    for label, color in entries:
+        parts.append(f'<rect x="{x}" y="{y - 9}" width="12" height="12" fill="{color}"/>'
+                     f'<text x="{x + 16}" y="{y + 1}">{escape(label)}</text>')
+        x += 24 + 7 * len(label)
+    return "".join(parts)
+
+
+def line_chart(series, x_label='', y_label='', y2_label='', time_axis=False):
+    """Line/step chart of [{'label', 'points': [(x, y)], 'color', 'step', 'secondary'}]"""
+    plot_w = WIDTH - MARGIN_LEFT - MARGIN_RIGHT
+    plot_h = HEIGHT - MARGIN_TOP - MARGIN_BOTTOM
+    xs = [x for s in series for x, _ in s['points']]
+    if not xs:
+        return "<p>No data available.</p>"
+    x_min, x_max = min(xs), max(xs)
+    if x_max == x_min:
+        x_max = x_min + 1
+
+    def y_range(secondary):
+        ys = [y for s in series if bool(s.get('secondary')) == secondary for _, y in s['points'] if y is not None]
+        return nice_ticks(min(0, min(ys)), max(ys)) if ys else None
+
+    primary, secondary = y_range(False), y_range(True)
+
+    def sx(x):
+        return MARGIN_LEFT + (x - x_min) / (x_max - x_min) * plot_w
+
+    def sy(y, ticks):
+        return MARGIN_TOP + plot_h - (y - ticks[0]) / ((ticks[-1] - ticks[0]) or 1) * plot_h
+
+    parts = [f'<rect x="{MARGIN_LEFT}" y="{MARGIN_TOP}" width="{plot_w}" height="{plot_h}" fill="#fff" stroke="#ccc"/>']
+    if primary:
+        for tick in primary:
+            y = sy(tick, primary)
+            parts.append(f'<line x1="{MARGIN_LEFT}" x2="{MARGIN_LEFT + plot_w}" y1="{y:.1f}" y2="{y:.1f}" stroke="#eee"/>'
+                         f'<text x="{MARGIN_LEFT - 6}" y="{y + 4:.1f}" text-anchor="end">{_format_tick(tick)}</text>')
+    if secondary:
+        for tick in secondary:
+            parts.append(f'<text x="{MARGIN_LEFT + plot_w + 6}" y="{sy(tick, secondary) + 4:.1f}">{_format_tick(tick)}</text>')
+    for tick in nice_ticks(x_min, x_max, 6):
+        if x_min <= tick <= x_max:
+            label = datetime.fromtimestamp(tick).strftime('%H:%M:%S') if time_axis else _format_tick(tick)
+            parts.append(f'<text x="{sx(tick):.1f}" y="{MARGIN_TOP + plot_h + 16}" text-anchor="middle">{label}</text>')
+
+    for index, s in enumerate(series):
+        ticks = secondary if s.get('secondary') else primary
+        color = s.get('color') or PALETTE[index % len(PALETTE)]
+        path, previous = [], None
+        for x, y in s['points']:
+            if y is None:
+                previous = None
+                continue
+            px, py = sx(x), sy(y, ticks)
+            if previous is None:
+                path.append(f"M{px:.1f},{py:.1f}")
+            elif s.get('step'):
+                path.append(f"H{px:.1f}V{py:.1f}")
+            else:
+                path.append(f"L{px:.1f},{py:.1f}")
+            previous = (px, py)
+        parts.append(f'<path d="{"".join(path)}" fill="none" stroke="{color}" stroke-width="1.5">'
+                     f'<title>{escape(s["label"])}</title></path>')
+
+    parts.append(f'<text x="{MARGIN_LEFT + plot_w / 2}" y="{HEIGHT - 28}" text-anchor="middle">{escape(x_label)}</text>')
+    parts.append(f'<text transform="translate(16,{MARGIN_TOP + plot_h / 2}) rotate(-90)" text-anchor="middle">{escape(y_label)}</text>')
+    if secondary and y2_label:
+        parts.append(f'<text transform="translate({WIDTH - 12},{MARGIN_TOP + plot_h / 2}) rotate(90)" '
+                     f'text-anchor="middle">{escape(y2_label)}</text>')
+    parts.append(_legend([(s['label'], s.get('color') or PALETTE[i % len(PALETTE)]) for i, s in enumerate(series)]))
+    return _svg("".join(parts))
+
+
+def bar_chart(labels, values, color='#3498db', x_label='', y_label='', tooltips=None):
+    """Vertical bar chart (also used for pre-binned histograms)"""
+    if not values:
+        return "<p>No data available.</p>"
+    plot_w = WIDTH - MARGIN_LEFT - MARGIN_RIGHT
+    plot_h = HEIGHT - MARGIN_TOP - MARGIN_BOTTOM
+    ticks = nice_ticks(0, max(values) or 1)
+    slot = plot_w / len(values)
+    show_every = max(1, int(math.ceil(len(labels) / 12)))
+    parts = [f'<rect x="{MARGIN_LEFT}" y="{MARGIN_TOP}" width="{plot_w}" height="{plot_h}" fill="#fff" stroke="#ccc"/>']
+    for tick in ticks:
+        y = MARGIN_TOP + plot_h - tick / ticks[-1] * plot_h
+        parts.append(f'<line x1="{MARGIN_LEFT}" x2="{MARGIN_LEFT + plot_w}" y1="{y:.1f}" y2="{y:.1f}" stroke="#eee"/>'
+                     f'<text x="{MARGIN_LEFT - 6}" y="{y + 4:.1f}" text-anchor="end">{_format_tick(tick)}</text>')
+    for i, (label, value) in enumerate(zip(labels, values)):
+        height = value / ticks[-1] * plot_h
+        x = MARGIN_LEFT + i * slot
+        tooltip = tooltips[i] if tooltips else f"{label}: {value}"
+        parts.append(f'<rect x="{x + slot * 0.1:.1f}" y="{MARGIN_TOP + plot_h - height:.1f}" width="{slot * 0.8:.1f}" '
+                     f'height="{height:.1f}" fill="{color}"><title>{escape(str(tooltip))}</title></rect>')
+        if i % show_every == 0:
+            parts.append(f'<text x="{x + slot / 2:.1f}" y="{MARGIN_TOP + plot_h + 16}" '
+                         f'text-anchor="middle">{escape(str(label))}</text>')
+    parts.append(f'<text x="{MARGIN_LEFT + plot_w / 2}" y="{HEIGHT - 20}" text-anchor="middle">{escape(x_label)}</text>')
+    parts.append(f'<text transform="translate(16,{MARGIN_TOP + plot_h / 2}) rotate(-90)" text-anchor="middle">{escape(y_label)}</text>')
+    return _svg("".join(parts))
+
+
+def doughnut_chart(labels, values, colors):
+    """Doughnut chart with a legend"""
+    total = sum(values)
+    if not total:
+        return "<p>No data available.</p>"
+    cx, cy, r, inner = 160, 150, 120, 70
+    parts, angle = [], -math.pi / 2
+    for label, value, color in zip(labels, values, colors):
+        if not value:
+            continue
+        sweep = value / total * 2 * math.pi
+        if sweep >= 2 * math.pi - 1e-9:
+            parts.append(f'<circle cx="{cx}" cy="{cy}" r="{(r + inner) / 2}" fill="none" stroke="{color}" '
+                         f'stroke-width="{r - inner}"><title>{escape(label)}: {value}</title></circle>')
+            continue
+        end = angle + sweep
+        large = 1 if sweep > math.pi else 0
+        points = (cx + r * math.cos(angle), cy + r * math.sin(angle), cx + r * math.cos(end), cy + r * math.sin(end),
+                  cx + inner * math.cos(end), cy + inner * math.sin(end), cx + inner * math.cos(angle), cy + inner * math.sin(angle))
+        parts.append(f'<path d="M{points[0]:.1f},{points[1]:.1f} A{r},{r} 0 {large} 1 {points[2]:.1f},{points[3]:.1f} '
+                     f'L{points[4]:.1f},{points[5]:.1f} A{inner},{inner} 0 {large} 0 {points[6]:.1f},{points[7]:.1f} Z" '
+                     f'fill="{color}" stroke="#fff" stroke-width="2"><title>{escape(label)}: {value} '
+                     f'({value / total * 100:.1f}%)</title></path>')
+        angle = end
+    for i, (label, value, color) in enumerate(zip(labels, values, colors)):
+        y = 110 + i * 24
+        parts.append(f'<rect x="320" y="{y - 11}" width="14" height="14" fill="{color}"/>'
+                     f'<text x="340" y="{y}">{escape(label)}: {value} ({value / total * 100:.1f}%)</text>')
+    return _svg("".join(parts), height=300)
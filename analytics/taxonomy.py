@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+Error Taxonomy and Goodput
+Clusters failed uploads by kind, status, response signature and latency bucket, and sets goodput against raw throughput
+"""
+
+import json
+import math
+import re
+from collections import Counter
+
+from record_store import _numpy
+
+SIGNATURE_LENGTH = 80
+BODY_FIELDS = ('detail', 'error', 'message', 'msg')   # where JSON error bodies keep their reason
+LATENCY_BUCKETS = ((1000, '<1s'), (5000, '1-5s'), (30000, '5-30s'), (120000, '30-120s'))
+SLOWEST_BUCKET = '>=120s'
+MAX_PRINTED_CLUSTERS = 10
+
+TRUNCATED_RE = re.compile(r'\.\.\. \(\d+ chars\)$')   # the suffix truncateBody() in Load.js adds
+UUID_RE = re.compile(r'\b[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}\b')
+HEX_RE = re.compile(r'\b(?=[0-9a-fA-F]*\d)[0-9a-fA-F]{16,}\b')
+NUMBER_RE = re.compile(r'\d+(?:\.\d+)?')
+
+
+def error_signature(text):
+    """Stable signature of a failed response body or error message, so equal causes cluster together
+
+    JSON bodies are reduced to their error field; ids, hashes and numbers are
+    masked and whitespace collapsed, then the result is cut to SIGNATURE_LENGTH.
+    """
+    if not text:
+        return ''
+    text = TRUNCATED_RE.sub('', text.replace('\\"', '"').strip())
+    try:
+        parsed = json.loads(text)
+    except ValueError:
+        parsed = None   # plain text, HTML error pages and truncated JSON are kept as text
+    if isinstance(parsed, dict):
+        for field in BODY_FIELDS:
+            if field in parsed:
+                value = parsed[field]
+                text = value if isinstance(value, str) else json.dumps(value, sort_keys=True)
+                break
+    text = NUMBER_RE.sub('#', HEX_RE.sub('<hex>', UUID_RE.sub('<id>', text)))
+    return ' '.join(text.split())[:SIGNATURE_LENGTH]
+
+
+def failure_kind(state, status):
+    """Coarse class of a failed request from its lifecycle state and HTTP status"""
+    if state == 'timeout':
+        return 'timeout'
+    if state == 'error':
+        return 'exception'
+    if status == 0:
+        return 'connection error'
+    if status == 200:
+        return 'invalid response'   # 200 without a parseable file id
+    if status == 429:
+        return 'throttled'
+    if 400 <= status < 500:
+        return 'client error'
+    if status >= 500:
+        return 'server error'
+    return f'HTTP {status}'
+
+
+def latency_bucket(duration):
+    if duration is None or math.isnan(duration):
+        return 'n/a'
+    for limit, label in LATENCY_BUCKETS:
+        if duration < limit:
+            return label
+    return SLOWEST_BUCKET
+
+
+def classify_failures(records):
+    """Failure clusters keyed by (kind, status, signature), most frequent first
+
+    Each cluster counts its requests per latency bucket and file type, how many
+    were retried and when it was first and last seen, so a burst of fast 503s
+    separates from slow gateway timeouts with the same status.
+    """
+    r = records.requests
+    states = records.REQUEST_STATES
+    filenames = records.categories['filename'].values
+    signatures = records.categories['signature'].values
+    clusters = {}
+    for state_code, status, signature, duration, attempts, filename, end in zip(
+            r['request_state'], r['request_status'], r['request_signature'], r['request_duration'],
+            r['request_attempts'], r['request_filename'], r['request_end']):
+        state = states[state_code]
+        if state in ('success', 'orphaned'):
+            continue
+        kind = failure_kind(state, status)
+        key = (kind, status, signatures[signature])
+        cluster = clusters.get(key)
+        if cluster is None:
+            cluster = clusters[key] = {'kind': kind, 'status': status, 'signature': signatures[signature],
+                                       'count': 0, 'retried': 0, 'latency': Counter(), 'file_types': Counter(),
+                                       'first': math.inf, 'last': -math.inf}
+        cluster['count'] += 1
+        cluster['retried'] += attempts > 1
+        cluster['latency'][latency_bucket(duration)] += 1
+        cluster['file_types'][filenames[filename].split('.')[-1]] += 1
+        if not math.isnan(end):
+            cluster['first'] = min(cluster['first'], end)
+            cluster['last'] = max(cluster['last'], end)
+
+    total = sum(cluster['count'] for cluster in clusters.values())
+    result = sorted(clusters.values(), key=lambda cluster: -cluster['count'])
+    for cluster in result:
+        cluster['share'] = cluster['count'] / total * 100
+        cluster['latency'] = {label: cluster['latency'][label]
+                              for label in [label for _, label in LATENCY_BUCKETS] + [SLOWEST_BUCKET, 'n/a']
+                              if cluster['latency'][label]}
+        cluster['file_types'] = dict(cluster['file_types'].most_common())
+        for key in ('first', 'last'):
+            cluster[key] = None if math.isinf(cluster[key]) else cluster[key]
+    return result
+
+
+def summarize_goodput(records):
+    """Per-scenario goodput (successful uploads and bytes per second) next to raw and attempted throughput
+
+    Rates are over the scenario's span, first start to last outcome. Attempts
+    count every POST including client retries, so `amplification` is the extra
+    load retries put on the backend and `efficiency` the share of offered bytes
+    that ended in a stored file.
+    """
+    np = _numpy()
+    groups = _goodput_groups_numpy(np, records) if np is not None else _goodput_groups(records)
+    summary = {}
+    for scenario, group in groups.items():
+        span = group['last'] - group['first'] if group['last'] > group['first'] else None
+        summary[scenario] = {
+            'requests': group['requests'],
+            'attempts': group['attempts'],
+            'successes': group['successes'],
+            'span': span,
+            'throughput': group['requests'] / span if span else None,
+            'attempt_rate': group['attempts'] / span if span else None,
+            'goodput': group['successes'] / span if span else None,
+            'goodput_bytes': group['good_bytes'] / span if span else None,
+            'offered_bytes': group['offered_bytes'] / span if span else None,
+            'amplification': group['attempts'] / group['requests'],
+            'efficiency': group['good_bytes'] / group['offered_bytes'] * 100 if group['offered_bytes'] else None,
+        }
+    return summary
+
+
+def _goodput_groups_numpy(np, records):
+    """Per-scenario goodput accumulators by bincount over the scenario codes"""
+    r = records.requests
+    scenarios = records.categories['scenario'].values
+    state = np.frombuffer(r['request_state'], dtype=r['request_state'].typecode)
+    keep = state != records.REQUEST_STATES.index('orphaned')
+    codes = np.frombuffer(r['request_scenario'], dtype=r['request_scenario'].typecode)[keep].astype(np.int64)
+    success = state[keep] == records.REQUEST_STATES.index('success')
+    attempts = np.frombuffer(r['request_attempts'], dtype=r['request_attempts'].typecode)[keep]
+    sizes = np.frombuffer(r['request_size'], dtype=r['request_size'].typecode)[keep].astype('d')
+    n = len(scenarios)
+    requests = np.bincount(codes, minlength=n)
+    offered = sizes > 0
+    columns = {
+        'attempts': np.bincount(codes, weights=attempts, minlength=n),
+        'successes': np.bincount(codes[success], minlength=n),
+        'good_bytes': np.bincount(codes[success], weights=np.maximum(sizes[success], 0), minlength=n),
+        'offered_bytes': np.bincount(codes[offered], weights=sizes[offered] * attempts[offered], minlength=n),
+    }
+    first, last = np.full(n, math.inf), np.full(n, -math.inf)
+    for column in ('request_start', 'request_end'):
+        moments = np.frombuffer(r[column], dtype='d')[keep]
+        np.fmin.at(first, codes, moments)   # fmin/fmax skip NaN times
+        np.fmax.at(last, codes, moments)
+    return {scenarios[code]: {'requests': int(requests[code]),
+                              **{name: int(values[code]) for name, values in columns.items()},
+                              'first': float(first[code]), 'last': float(last[code])}
+            for code in np.flatnonzero(requests).tolist()}
+
+
+def _goodput_groups(records):
+    r = records.requests
+    scenarios = records.categories['scenario'].values
+    success = records.REQUEST_STATES.index('success')
+    orphaned = records.REQUEST_STATES.index('orphaned')
+    groups = {}
+    for code, state, attempts, size, start, end in zip(
+            r['request_scenario'], r['request_state'], r['request_attempts'], r['request_size'],
+            r['request_start'], r['request_end']):
+        if state == orphaned:
+            continue
+        group = groups.setdefault(scenarios[code], {'requests': 0, 'attempts': 0, 'successes': 0,
+                                                    'good_bytes': 0, 'offered_bytes': 0,
+                                                    'first': math.inf, 'last': -math.inf})
+        group['requests'] += 1
+        group['attempts'] += attempts
+        if size > 0:
+            group['offered_bytes'] += size * attempts
+        if state == success:
+            group['successes'] += 1
+            group['good_bytes'] += max(size, 0)
+        for moment in (start, end):
+            if not math.isnan(moment):
+                group['first'] = min(group['first'], moment)
+                group['last'] = max(group['last'], moment)
+    return groups
+
+
+def format_cluster(cluster):
+    """One summary line for a failure cluster"""
+    status = f" {cluster['status']}" if cluster['kind'] not in ('timeout', 'exception', 'connection error') else ""
+    signature = f" '{cluster['signature']}'" if cluster['signature'] else ""
+    latency = ", ".join(f"{label} {count}" for label, count in cluster['latency'].items())
+    retried = f", {cluster['retried']} retried" if cluster['retried'] else ""
+    return (f"{cluster['kind']}{status}{signature}: {cluster['count']} ({cluster['share']:.1f}%), "
+            f"latency {latency}{retried}")
@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+Wall-Clock Time Series
+Bins upload starts and outcomes into fixed windows using the [DEBUG <timestamp>] times
+"""
+
+import math
+import re
+
+from latency_sketch import LatencySketch
+from record_store import _numpy, format_timestamp
+
+DEFAULT_WINDOW = 10.0
+WINDOW_RE = re.compile(r'^\s*(\d+(?:\.\d+)?)\s*(ms|s|m|h)?\s*$')
+WINDOW_UNITS = {'ms': 0.001, 's': 1.0, 'm': 60.0, 'h': 3600.0}
+
+
+def parse_window(text):
+    """Parse a window length such as 1s, 10s or 1m into seconds"""
+    match = WINDOW_RE.match(str(text))
+    if not match or float(match.group(1)) <= 0:
+        raise ValueError(f"Invalid window '{text}' (expected e.g. 1s, 10s, 1m)")
+    return float(match.group(1)) * WINDOW_UNITS[match.group(2) or 's']
+
+
+def _window_row(start):
+    return {
+        'start': start,
+        'time': format_timestamp(start),
+        'starts': 0,
+        'completions': 0,
+        'failures': 0,
+        'in_flight': 0,
+        'bytes': 0,
+        'latency': LatencySketch(),
+    }
+
+
+def build_time_series(records, window=DEFAULT_WINDOW, scenario=None):
+    """Per-window request starts, completions, failures, peak in-flight, throughput and latency percentiles
+
+    Outcomes are the success/failure records plus the ends of requests that
+    errored before a response (which have no outcome record), so an errored
+    request counts as a failure and leaves the in-flight count.
+    """
+    scenario_code = None
+    if scenario is not None:
+        scenario_code = records.categories['scenario'].codes.get(scenario)
+        if scenario_code is None:
+            return []
+    np = _numpy()
+    if np is not None:
+        return _time_series_numpy(np, records, window, scenario_code)
+
+    # (time, 0 = start / 1 = outcome, outcome index); starts sort before outcomes at equal times
+    events = []
+    starts = records.starts
+    for timestamp, code in zip(starts['start_timestamp'], starts['start_scenario']):
+        if not math.isnan(timestamp) and scenario_code in (None, code):
+            events.append((timestamp, 0, None))
+    columns = records.columns
+    for index, (timestamp, code) in enumerate(zip(columns['timestamp'], columns['scenario'])):
+        if not math.isnan(timestamp) and scenario_code in (None, code):
+            events.append((timestamp, 1, index))
+    error = records.REQUEST_STATES.index('error')
+    r = records.requests
+    for timestamp, code, state in zip(r['request_end'], r['request_scenario'], r['request_state']):
+        if state == error and not math.isnan(timestamp) and scenario_code in (None, code):
+            events.append((timestamp, 1, -1))
+    if not events:
+        return []
+    events.sort()
+
+    rows = {}
+    in_flight = 0
+    for timestamp, kind, index in events:
+        bucket = math.floor(timestamp / window) * window
+        row = rows.get(bucket)
+        if row is None:
+            row = rows[bucket] = _window_row(bucket)
+            row['in_flight'] = in_flight
+        if kind == 0:
+            row['starts'] += 1
+            in_flight += 1
+        else:
+            row['completions'] += 1
+            in_flight = max(in_flight - 1, 0)
+            if index >= 0 and columns['ok'][index]:
+                row['latency'].add(columns['duration'][index])
+                if columns['size'][index] > 0:
+                    row['bytes'] += columns['size'][index]
+            else:
+                row['failures'] += 1
+        row['in_flight'] = max(row['in_flight'], in_flight)
+
+    return [_finish_row(rows[bucket], window) for bucket in sorted(rows)]
+
+
+def _finish_row(row, window):
+    latency = row.pop('latency')
+    row['throughput'] = row['completions'] / window
+    row['bytes_per_s'] = row.pop('bytes') / window
+    row['p50'] = latency.percentile(50)
+    row['p95'] = latency.percentile(95)
+    row['p99'] = latency.percentile(99)
+    return row
+
+
+def _selected(np, table, time_column, scenario_column, scenario_code):
+    """Mask of a table's rows with a known time (and the scenario, when one is selected)"""
+    times = np.frombuffer(table[time_column], dtype='d')
+    keep = ~np.isnan(times)
+    if scenario_code is not None:
+        keep &= np.frombuffer(table[scenario_column], dtype=table[scenario_column].typecode) == scenario_code
+    return keep
+
+
+def _time_series_numpy(np, records, window, scenario_code):
+    """build_time_series over the columns: one sort of all events, window counts by bincount"""
+    starts, columns, r = records.starts, records.columns, records.requests
+    start_times = np.frombuffer(starts['start_timestamp'], dtype='d')
+    start_times = start_times[_selected(np, starts, 'start_timestamp', 'start_scenario', scenario_code)]
+    keep = _selected(np, columns, 'timestamp', 'scenario', scenario_code)
+    errored = _selected(np, r, 'request_end', 'request_scenario', scenario_code)
+    errored &= np.frombuffer(r['request_state'], dtype=r['request_state'].typecode) == records.REQUEST_STATES.index('error')
+    error_times = np.frombuffer(r['request_end'], dtype='d')[errored]
+    end_times = np.concatenate([np.frombuffer(columns['timestamp'], dtype='d')[keep], error_times])
+    ok = np.concatenate([np.frombuffer(columns['ok'], dtype='b').astype(bool)[keep], np.zeros(len(error_times), bool)])
+    durations = np.concatenate([np.frombuffer(columns['duration'], dtype='d')[keep], np.full(len(error_times), math.nan)])
+    sizes = np.concatenate([np.frombuffer(columns['size'], dtype=columns['size'].typecode)[keep],
+                            np.full(len(error_times), -1)])
+
+    times = np.concatenate([start_times, end_times])
+    if not len(times):
+        return []
+    outcome = np.concatenate([np.zeros(len(start_times), bool), np.ones(len(end_times), bool)])
+    order = np.lexsort((outcome, times))   # starts sort before outcomes at equal times
+    times, outcome = times[order], outcome[order]
+    index = order[outcome] - len(start_times)   # outcome rows in time order
+    ok, durations, sizes = ok[index], durations[index], sizes[index]
+
+    # In-flight after each event: the running start/outcome balance, clamped at zero like
+    # max(in_flight - 1, 0) (a reflected walk), and its peak per window
+    running = np.cumsum(np.where(outcome, -1, 1))
+    level = running - np.minimum.accumulate(np.minimum(running, 0))
+    buckets, first, inverse = np.unique(np.floor(times / window) * window, return_index=True, return_inverse=True)
+    before = np.concatenate([[0], level[:-1]])[first]
+    in_flight = np.maximum(np.maximum.reduceat(level, first), before)
+
+    n = len(buckets)
+    started = np.bincount(inverse[~outcome], minlength=n)
+    completed = np.bincount(inverse[outcome], minlength=n)
+    outcome_window = inverse[outcome]
+    failures = np.bincount(outcome_window[~ok], minlength=n)
+    stored = ok & (sizes > 0)
+    stored_bytes = np.bincount(outcome_window[stored], weights=sizes[stored], minlength=n)
+    latencies = LatencySketch.grouped(outcome_window[ok], durations[ok], n)
+
+    series = []
+    for i, bucket in enumerate(buckets.tolist()):
+        row = _window_row(bucket)
+        row.update({'starts': int(started[i]), 'completions': int(completed[i]), 'failures': int(failures[i]),
+                    'in_flight': int(in_flight[i]), 'bytes': int(stored_bytes[i]), 'latency': latencies[i]})
+        series.append(_finish_row(row, window))
+    return series
+
+
+def lttb(points, threshold):
+    """Largest-Triangle-Three-Buckets downsampling of (x, y) points to at most `threshold` points
+
+    Keeps the first and last point and, per bucket, the point forming the largest
+    triangle with the previously kept point and the next bucket's average, which
+    preserves spikes and dips that plain striding would drop.
+    """
+    n = len(points)
+    if threshold >= n or threshold < 3:
+        return list(points)
+    sampled = [points[0]]
+    every = (n - 2) / (threshold - 2)
+    a = 0
+    for i in range(threshold - 2):
+        start = int(math.floor(i * every)) + 1
+        end = int(math.floor((i + 1) * every)) + 1
+        next_start, next_end = end, min(int(math.floor((i + 2) * every)) + 1, n)
+        next_bucket = points[next_start:next_end] or [points[-1]]
+        avg_x = sum(p[0] for p in next_bucket) / len(next_bucket)
+        avg_y = sum(p[1] for p in next_bucket) / len(next_bucket)
+        ax, ay = points[a]
+        best, best_area = start, -1.0
+        for j in range(start, min(end, n - 1)):
+            area = abs((ax - avg_x) * (points[j][1] - ay) - (ax - points[j][0]) * (avg_y - ay))
+            if area > best_area:
+                best, best_area = j, area
+        sampled.append(points[best])
+        a = best
+    sampled.append(points[-1])
+    return sampled
+
+
+def build_scenario_time_series(records, window=DEFAULT_WINDOW):
+    """Time series for every scenario in the store"""
+    return {scenario: build_time_series(records, window, scenario)
+            for scenario in records.labels('scenario')}
+
+
+def summarize_time_series(series):
+    """Peak throughput, peak concurrency and the worst p95 window of a series"""
+    if not series:
+        return {}
+    with_latency = [row for row in series if row['p95'] is not None]
+    peak = max(series, key=lambda row: row['throughput'])
+    busiest = max(series, key=lambda row: row['in_flight'])
+    summary = {
+        'windows': len(series),
+        'peak_throughput': peak['throughput'],
+        'peak_throughput_time': peak['time'],
+        'peak_in_flight': busiest['in_flight'],
+        'peak_in_flight_time': busiest['time'],
+        'peak_bytes_per_s': max(row['bytes_per_s'] for row in series),
+    }
+    if with_latency:
+        worst = max(with_latency, key=lambda row: row['p95'])
+        summary['worst_p95'] = worst['p95']
+        summary['worst_p95_time'] = worst['time']
+    return summary
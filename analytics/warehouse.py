@@ -0,0 +1,367 @@
+#!/usr/bin/env python3
+"""
+Run Warehouse
+Incrementally ingests logs into a local SQLite store and answers cross-run trend queries
+"""
+
+import argparse
+import hashlib
+import json
+import math
+import sqlite3
+import time
+from datetime import datetime
+from pathlib import Path
+
+from k6_json import is_k6_json
+from latency_sketch import LatencySketch
+from log_parser import SCENARIO_RE, find_log_files, new_data, parse_any_log, parse_k6_lines, scenario_from_path
+from record_store import format_timestamp
+
+DEFAULT_DB = "../logs/warehouse.db"
+HEAD_BYTES = 64 * 1024   # leading bytes hashed to tell an appended log from a replaced one
+METRICS = ('p50', 'p95', 'p99', 'mean', 'failure_rate', 'throughput')
+LOG_NAME_TIME_FORMAT = "%Y%m%d_%H%M%S"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime REAL NOT NULL,
+    head_hash TEXT NOT NULL,
+    offset INTEGER NOT NULL,
+    run_id INTEGER
+);
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    source TEXT NOT NULL,
+    scenario TEXT NOT NULL,
+    started_at REAL,
+    ended_at REAL,
+    uploads INTEGER NOT NULL,
+    successes INTEGER NOT NULL,
+    failures INTEGER NOT NULL,
+    failure_rate REAL,
+    mean REAL,
+    p50 REAL,
+    p95 REAL,
+    p99 REAL,
+    throughput REAL,
+    sketch TEXT NOT NULL,
+    ingested_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS runs_scenario_started ON runs (scenario, started_at);
+CREATE TABLE IF NOT EXISTS requests (
+    run_id INTEGER NOT NULL REFERENCES runs (id),
+    scenario TEXT NOT NULL,
+    filename TEXT NOT NULL,
+    file_type TEXT NOT NULL,
+    ok INTEGER NOT NULL,
+    status INTEGER NOT NULL,
+    duration REAL,
+    size INTEGER,
+    timestamp REAL
+);
+CREATE INDEX IF NOT EXISTS requests_run ON requests (run_id);
+CREATE INDEX IF NOT EXISTS requests_scenario_timestamp ON requests (scenario, timestamp);
+"""
+
+
+def connect(db_path=DEFAULT_DB):
+    """Open (creating if needed) the warehouse database"""
+    connection = sqlite3.connect(str(db_path))
+    connection.row_factory = sqlite3.Row
+    connection.executescript(SCHEMA)
+    return connection
+
+
+def head_hash(file_path, length):
+    """SHA-1 of the first `length` bytes of a file"""
+    with open(file_path, 'rb') as f:
+        return hashlib.sha1(f.read(length)).hexdigest()
+
+
+def iter_complete_lines(file_path, offset, position):
+    """Decode lines from a byte offset, stopping before an unterminated last line
+
+    `position` is a one-element list updated to the offset just past the last
+    complete line, which is where the next incremental ingest resumes.
+    """
+    with open(file_path, 'rb') as f:
+        f.seek(offset)
+        for raw in f:
+            if not raw.endswith(b'\n'):
+                break
+            position[0] += len(raw)
+            yield raw.decode('utf-8', errors='replace')
+
+
+def started_from_name(file_path):
+    """Run start time from a `scenarioN_YYYYmmdd_HHMMSS` log name (logs without timestamps)"""
+    stem = Path(file_path).name.split('.')[0]
+    try:
+        return datetime.strptime(stem[-len("YYYYmmdd_HHMMSS"):], LOG_NAME_TIME_FORMAT).timestamp()
+    except ValueError:
+        return None
+
+
+def _outcome_rows(records):
+    """(scenario, filename, file_type, ok, status, duration, size, timestamp) per recorded outcome"""
+    c = records.columns
+    for i in range(len(records)):
+        filename = records.label('filename', i)
+        duration, size, timestamp = c['duration'][i], c['size'][i], c['timestamp'][i]
+        yield (records.label('scenario', i), filename, records.label('file_type', i), int(c['ok'][i]),
+               c['status'][i], None if math.isnan(duration) else duration,
+               None if size < 0 else size, None if math.isnan(timestamp) else timestamp)
+
+
+def _run_stats(run):
+    """Derived summary columns for a run dict holding a sketch and counts"""
+    sketch = run['sketch']
+    uploads = run['successes'] + run['failures']
+    span = (run['ended_at'] - run['started_at']) if run['started_at'] is not None and run['ended_at'] is not None else 0
+    return {
+        'uploads': uploads,
+        'failure_rate': run['failures'] / uploads * 100 if uploads else None,
+        'mean': sketch.mean() if sketch.count else None,
+        'p50': sketch.percentile(50),
+        'p95': sketch.percentile(95),
+        'p99': sketch.percentile(99),
+        'throughput': uploads / span if span > 0 else None,
+    }
+
+
+class Warehouse:
+    """SQLite-backed history of every ingested run, one run per log file"""
+
+    def __init__(self, db_path=DEFAULT_DB):
+        self.db_path = db_path
+        self.db = connect(db_path)
+
+    def close(self):
+        self.db.close()
+
+    def ingest_directory(self, directory):
+        """Ingest every log in a directory, returning counts of new/resumed/skipped files"""
+        counts = {'new': 0, 'resumed': 0, 'skipped': 0}
+        for file_path in find_log_files(directory):
+            counts[self.ingest_file(file_path)] += 1
+        return counts
+
+    def ingest_file(self, file_path):
+        """Ingest one log: skip it when unchanged, resume it when only appended, else (re)parse it"""
+        path = str(Path(file_path).resolve())
+        stat = Path(file_path).stat()
+        known = self.db.execute("SELECT * FROM files WHERE path = ?", (path,)).fetchone()
+
+        if known is not None and known['size'] == stat.st_size and known['mtime'] == stat.st_mtime:
+            return 'skipped'
+        same_head = known is not None and stat.st_size >= known['size'] and \
+            head_hash(file_path, min(HEAD_BYTES, known['size'])) == known['head_hash']
+        if same_head and known['size'] == stat.st_size:
+            with self.db:
+                self.db.execute("UPDATE files SET mtime = ? WHERE path = ?", (stat.st_mtime, path))
+            return 'skipped'
+
+        with self.db:
+            if same_head and known['run_id'] is not None and not is_k6_json(file_path):
+                offset = self._append_tail(file_path, known['run_id'], known['offset'])
+                state = 'resumed'
+            else:
+                if known is not None:
+                    self._delete_run(known['run_id'])
+                run_id, offset = self._ingest_whole(file_path)
+                state = 'new'
+                known = {'run_id': run_id}
+            self.db.execute(
+                "INSERT OR REPLACE INTO files (path, size, mtime, head_hash, offset, run_id) VALUES (?, ?, ?, ?, ?, ?)",
+                (path, stat.st_size, stat.st_mtime, head_hash(file_path, min(HEAD_BYTES, stat.st_size)),
+                 offset, known['run_id']))
+        return state
+
+    def _ingest_whole(self, file_path):
+        data = new_data()
+        if is_k6_json(file_path):
+            parse_any_log(file_path, data)
+            offset = Path(file_path).stat().st_size
+        else:
+            position = [0]
+            parse_k6_lines(iter_complete_lines(file_path, 0, position), data, scenario_from_path(file_path))
+            offset = position[0]
+        if not len(data['records']) and not len(data['records'].starts['start_scenario']):
+            return None, offset  # e.g. a k6 JSON output whose console log supplies the records
+        run = {'source': str(file_path), 'scenario': scenario_from_path(file_path), 'sketch': LatencySketch(),
+               'successes': 0, 'failures': 0, 'started_at': None, 'ended_at': None}
+        self._accumulate(run, data['records'])
+        if run['started_at'] is None:
+            run['started_at'] = started_from_name(file_path)
+        cursor = self.db.execute(
+            "INSERT INTO runs (source, scenario, started_at, ended_at, uploads, successes, failures, failure_rate, "
+            "mean, p50, p95, p99, throughput, sketch, ingested_at) "
+            "VALUES (:source, :scenario, :started_at, :ended_at, :uploads, :successes, :failures, :failure_rate, "
+            ":mean, :p50, :p95, :p99, :throughput, :sketch_json, :ingested_at)",
+            self._run_row(run))
+        self._insert_requests(cursor.lastrowid, data['records'])
+        return cursor.lastrowid, offset
+
+    def _append_tail(self, file_path, run_id, offset):
+        """Parse only the lines appended since the last ingest and fold them into the run"""
+        data = new_data()
+        position = [offset]
+        parse_k6_lines(iter_complete_lines(file_path, offset, position), data, scenario_from_path(file_path))
+        row = self.db.execute("SELECT * FROM runs WHERE id = ?", (run_id,)).fetchone()
+        run = dict(row)
+        run['sketch'] = LatencySketch.from_dict(json.loads(row['sketch']))
+        self._accumulate(run, data['records'])
+        self.db.execute(
+            "UPDATE runs SET started_at = :started_at, ended_at = :ended_at, uploads = :uploads, "
+            "successes = :successes, failures = :failures, failure_rate = :failure_rate, mean = :mean, "
+            "p50 = :p50, p95 = :p95, p99 = :p99, throughput = :throughput, sketch = :sketch_json, "
+            "ingested_at = :ingested_at WHERE id = :id",
+            self._run_row(run))
+        self._insert_requests(run_id, data['records'])
+        return position[0]
+
+    @staticmethod
+    def _accumulate(run, records):
+        for sketch in records.latency_sketches('scenario').values():
+            run['sketch'].merge(sketch)
+        run['successes'] += records.success_count()
+        run['failures'] += records.failure_count()
+        times = [t for t in records.columns['timestamp'] if not math.isnan(t)]
+        if times:
+            first, last = min(times), max(times)
+            run['started_at'] = first if run['started_at'] is None else min(run['started_at'], first)
+            run['ended_at'] = last if run['ended_at'] is None else max(run['ended_at'], last)
+
+    @staticmethod
+    def _run_row(run):
+        row = dict(run)
+        row.update(_run_stats(run))
+        row['sketch_json'] = json.dumps(run['sketch'].to_dict())
+        row['ingested_at'] = time.time()
+        return row
+
+    def _insert_requests(self, run_id, records):
+        self.db.executemany(
+            "INSERT INTO requests (run_id, scenario, filename, file_type, ok, status, duration, size, timestamp) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            ((run_id,) + row for row in _outcome_rows(records)))
+
+    def _delete_run(self, run_id):
+        if run_id is not None:
+            self.db.execute("DELETE FROM requests WHERE run_id = ?", (run_id,))
+            self.db.execute("DELETE FROM runs WHERE id = ?", (run_id,))
+
+    def runs(self, scenario=None, last=None):
+        """Runs in start-time order (most recent `last` when given)"""
+        query = "SELECT * FROM runs"
+        params = []
+        if scenario:
+            query += " WHERE scenario = ?"
+            params.append(scenario)
+        query += " ORDER BY started_at DESC, id DESC"
+        if last:
+            query += " LIMIT ?"
+            params.append(last)
+        return list(reversed(self.db.execute(query, params).fetchall()))
+
+
+def normalize_scenario(value):
+    """Accept "8", "scenario8" or "Scenario 8" for the stored "Scenario 8" label"""
+    if value is None:
+        return None
+    if value.isdigit():
+        return f"Scenario {value}"
+    match = SCENARIO_RE.search(value.lower().replace(' ', ''))
+    return f"Scenario {match.group(1)}" if match else value
+
+
+def weekly_trend(runs, metric):
+    """(ISO week, runs, median metric, % change vs the previous week) from run rows"""
+    weeks = {}
+    for run in runs:
+        if run['started_at'] is None or run[metric] is None:
+            continue
+        year, week, _ = datetime.fromtimestamp(run['started_at']).isocalendar()
+        weeks.setdefault(f"{year}-W{week:02d}", []).append(run[metric])
+    rows = []
+    previous = None
+    for week in sorted(weeks):
+        values = sorted(weeks[week])
+        middle = len(values) // 2
+        median = values[middle] if len(values) % 2 else (values[middle - 1] + values[middle]) / 2
+        change = (median - previous) / previous * 100 if previous else None
+        rows.append((week, len(values), median, change))
+        previous = median
+    return rows
+
+
+def _fmt(value, digits=1):
+    return "n/a" if value is None else f"{value:.{digits}f}"
+
+
+def print_runs(runs):
+    print(f"{'Run':>5}  {'Started':19}  {'Scenario':12} {'Uploads':>8} {'Fail %':>7} {'p50':>8} {'p95':>8} {'p99':>8} {'req/s':>7}")
+    for run in runs:
+        started = format_timestamp(run['started_at'])[:19] if run['started_at'] is not None else "unknown"
+        print(f"{run['id']:>5}  {started:19}  {run['scenario']:12} {run['uploads']:>8} "
+              f"{_fmt(run['failure_rate']):>7} {_fmt(run['p50'], 0):>8} {_fmt(run['p95'], 0):>8} "
+              f"{_fmt(run['p99'], 0):>8} {_fmt(run['throughput'], 2):>7}")
+
+
+def print_trend(runs, metric):
+    print(f"📈 {metric} over the last {len(runs)} run(s)")
+    previous = None
+    for run in runs:
+        value = run[metric]
+        started = format_timestamp(run['started_at'])[:19] if run['started_at'] is not None else "unknown"
+        change = f"{(value - previous) / previous * 100:+.1f}%" if value is not None and previous else ""
+        print(f"   {started:19}  run {run['id']:>4}  {_fmt(value, 2):>10}  {change}")
+        previous = value if value is not None else previous
+
+    weeks = weekly_trend(runs, metric)
+    if len(weeks) > 1:
+        print(f"\n📅 Week over week (median {metric}):")
+        for week, count, median, change in weeks:
+            print(f"   {week}  {count:>3} run(s)  {median:>10.2f}  {'' if change is None else f'{change:+.1f}%'}")
+
+
+def warehouse_main(argv=None):
+    """`analytics.py warehouse ingest|runs|trend`"""
+    parser = argparse.ArgumentParser(prog='analytics.py warehouse', description='Persistent run history')
+    parser.add_argument('--db', default=DEFAULT_DB, help=f'SQLite database (default: {DEFAULT_DB})')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    ingest = commands.add_parser('ingest', help='Add new and appended logs to the warehouse')
+    ingest.add_argument('-d', '--directory', default='../logs', help='Directory containing log files (default: ../logs)')
+
+    runs = commands.add_parser('runs', help='List ingested runs')
+    runs.add_argument('--scenario', help='Only this scenario (e.g. 8)')
+    runs.add_argument('--last', type=int, default=30, help='Most recent N runs (default: 30)')
+
+    trend = commands.add_parser('trend', help='A metric across the most recent runs of a scenario')
+    trend.add_argument('scenario', help='Scenario number or label (e.g. 8)')
+    trend.add_argument('--metric', choices=METRICS, default='p95', help='Run metric to trend (default: p95)')
+    trend.add_argument('--last', type=int, default=30, help='Most recent N runs (default: 30)')
+
+    args = parser.parse_args(argv)
+    warehouse = Warehouse(args.db)
+    try:
+        if args.command == 'ingest':
+            counts = warehouse.ingest_directory(args.directory)
+            print(f"🗄️  {args.db}: {counts['new']} new, {counts['resumed']} resumed, {counts['skipped']} unchanged")
+            return 0
+        scenario = normalize_scenario(args.scenario)
+        selected = warehouse.runs(scenario, args.last)
+        if not selected:
+            print(f"❌ No runs{f' for {scenario}' if scenario else ''} in {args.db} (run `warehouse ingest` first)")
+            return 2
+        if args.command == 'runs':
+            print_runs(selected)
+        else:
+            print_trend(selected, args.metric)
+        return 0
+    finally:
+        warehouse.close()
@@ -36,6 +36,9 @@ echo -e "${GREEN}✅ Found log files, starting analysis...${NC}"
 # Parse command line arguments
 ANALYTICS_TYPE="python"
 NO_GUI=false
+BATCH=false
+WAREHOUSE=false
+JOBS=1
 
 for arg in "$@"; do
     case $arg in
@@ -45,6 +48,15 @@ for arg in "$@"; do
         --no-gui)
             NO_GUI=true
             ;;
+        --batch)
+            BATCH=true
+            ;;
+        --warehouse)
+            WAREHOUSE=true
+            ;;
+        --jobs=*)
+            JOBS="${arg#--jobs=}"
+            ;;
         --help)
             echo -e "${BLUE}Usage:${NC}"
             echo -e "  ./run_analytics.sh [options]"
@@ -52,12 +64,17 @@ for arg in "$@"; do
             echo -e "${BLUE}Options:${NC}"
             echo -e "  --html     Generate HTML dashboard instead of Python charts"
             echo -e "  --no-gui   Generate text summary only (Python charts only)"
+            echo -e "  --batch    Render PNG pages headlessly into reports/ (overview + one per scenario)"
+            echo -e "  --warehouse  Also ingest new/appended logs into logs/warehouse.db for trend queries"
+            echo -e "  --jobs=N   Parse log files in N parallel processes (0 = all cores)"
             echo -e "  --help     Display this help message"
             echo
             echo -e "${BLUE}Examples:${NC}"
             echo -e "  ./run_analytics.sh                # Generate Python charts"
             echo -e "  ./run_analytics.sh --html         # Generate HTML dashboard"
             echo -e "  ./run_analytics.sh --no-gui       # Text summary only"
+            echo -e "  ./run_analytics.sh --jobs=0       # Parse logs on all cores"
+            echo -e "  ./run_analytics.sh --batch --jobs=0  # Nightly report, pages rendered in parallel"
             exit 0
             ;;
     esac
@@ -67,15 +84,22 @@ done
 if [ "$ANALYTICS_TYPE" = "html" ]; then
     echo -e "${BLUE}📊 Generating HTML dashboard...${NC}"
     cd analytics
-    python3 html_analytics.py
+    python3 html_analytics.py --jobs "$JOBS"
     echo -e "${GREEN}✅ HTML dashboard generated! Check the main directory for the .html file.${NC}"
 else
     echo -e "${BLUE}📊 Generating Python analytics...${NC}"
     cd analytics
     if [ "$NO_GUI" = true ]; then
-        python3 analytics.py --no-gui
+        python3 analytics.py --no-gui --jobs "$JOBS"
+    elif [ "$BATCH" = true ]; then
+        python3 analytics.py --batch ../reports --jobs "$JOBS"
     else
-        python3 analytics.py
+        python3 analytics.py --jobs "$JOBS"
     fi
     echo -e "${GREEN}✅ Analytics generation complete!${NC}"
+fi
+
+if [ "$WAREHOUSE" = true ]; then
+    echo -e "${BLUE}🗄️  Updating run warehouse...${NC}"
+    python3 analytics.py warehouse ingest -d ../logs
 fi 
\ No newline at end of file
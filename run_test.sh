@@ -30,16 +30,21 @@ usage() {
   echo -e "  9: Mixed File Types with Longer Delays"
   echo -e "  10: Document Upload Stress Test"
   echo -e "  11: PDF-Only Upload (bypasses conversion)"
+  echo -e "  12: Sequential PDF Upload"
+  echo -e "  13: Constant Arrival Rate (open model)"
+  echo -e "  14: Ramping Arrival Rate (open model)"
   echo
   echo -e "${BLUE}Options:${NC}"
   echo -e "  --no-log     Don't generate log file"
   echo -e "  --analytics  Run analytics after test completion"
+  echo -e "  --json       Also write k6 JSON output (per-phase timings) to logs/"
   echo -e "  --help       Display this help message"
   echo
   echo -e "${BLUE}Examples:${NC}"
   echo -e "  ./run_test.sh 1                    # Run scenario 1 with log generation"
   echo -e "  ./run_test.sh 3 --analytics        # Run scenario 3 and generate analytics"
   echo -e "  ./run_test.sh 5 --no-log          # Run scenario 5 without log generation"
+  echo -e "  ./run_test.sh 2 --json            # Run scenario 2 and keep per-phase timings"
   echo
   echo -e "${BLUE}Analytics:${NC}"
   echo -e "  ./run_analytics.sh                # Generate analytics for all logs"
@@ -64,6 +69,7 @@ main() {
   local scenario_number=""
   local generate_log=true
   local run_analytics=false
+  local json_output=false
 
   for arg in "$@"; do
     case $arg in
@@ -73,6 +79,9 @@ main() {
       --analytics)
         run_analytics=true
         ;;
+      --json)
+        json_output=true
+        ;;
       --help)
         usage
         ;;
@@ -89,8 +98,8 @@ main() {
   fi
 
   # Check if scenario number is valid
-  if [ "$scenario_number" -lt 1 ] || [ "$scenario_number" -gt 12 ]; then
-    echo -e "${RED}❌ Error: Invalid scenario number. Must be between 1 and 12${NC}"
+  if [ "$scenario_number" -lt 1 ] || [ "$scenario_number" -gt 14 ]; then
+    echo -e "${RED}❌ Error: Invalid scenario number. Must be between 1 and 14${NC}"
     usage
   fi
 
@@ -122,6 +131,10 @@ main() {
         scenario_name="PDF-Only Upload (bypasses conversion)" ;;
     12) scenario_file="scenarios/scenario12_sequential_pdf_upload.js"
         scenario_name="Sequential PDF Upload" ;;
+    13) scenario_file="scenarios/scenario13_constant_arrival_rate.js"
+        scenario_name="Constant Arrival Rate (open model)" ;;
+    14) scenario_file="scenarios/scenario14_ramping_arrival_rate.js"
+        scenario_name="Ramping Arrival Rate (open model)" ;;
   esac
 
   # Check if scenario file exists
@@ -141,6 +154,11 @@ main() {
   # Generate timestamp for log file
   local timestamp=$(date +"%Y%m%d_%H%M%S")
   local log_file="logs/scenario${scenario_number}_${timestamp}.log"
+  local k6_args=""
+  if [ "$json_output" = true ]; then
+    mkdir -p logs
+    k6_args="--out json=logs/scenario${scenario_number}_${timestamp}.json.gz"
+  fi
 
   # Display information about the test
   echo -e "${GREEN}🚀 Running Scenario $scenario_number: $scenario_name${NC}"
@@ -155,12 +173,12 @@ main() {
 
   # Run the test
   if [ "$generate_log" = true ]; then
-    k6 run $scenario_file 2>&1 | tee $log_file
+    k6 run $k6_args $scenario_file 2>&1 | tee $log_file
     echo
     echo -e "${GREEN}✅ Test completed successfully!${NC}"
     echo -e "${GREEN}📁 Log file: $log_file${NC}"
   else
-    k6 run $scenario_file
+    k6 run $k6_args $scenario_file
     echo
     echo -e "${GREEN}✅ Test completed successfully!${NC}"
   fi
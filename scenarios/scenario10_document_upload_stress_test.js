@@ -1,7 +1,9 @@
-import { documentUploadStressTest, uploadFileToOpenAI, getUserTokenByVU, getRandomUserToken, smallFileTest, mediumFileTest, largeFileTest, textFileTest, officeDocumentTest, allDocumentTypesTest } from "../scripts/Load.js";
+import { openTestFiles, SCENARIO_FILES, documentUploadStressTest, uploadFileToOpenAI, getUserTokenByVU, getRandomUserToken, smallFileTest, mediumFileTest, largeFileTest, textFileTest, officeDocumentTest, allDocumentTypesTest } from "../scripts/Load.js";
 
-export default function() {
-  documentUploadStressTest();
+await openTestFiles(SCENARIO_FILES.documentUploadStressTest);
+
+export default async function() {
+  await documentUploadStressTest();
 }
 
 export const options = {
@@ -1,7 +1,9 @@
-import { pdfOnlyUpload, uploadFileToOpenAI, getUserTokenByVU, getRandomUserToken, smallFileTest, mediumFileTest, largeFileTest, textFileTest, officeDocumentTest, allDocumentTypesTest } from "../scripts/Load.js";
+import { openTestFiles, SCENARIO_FILES, pdfOnlyUpload, uploadFileToOpenAI, getUserTokenByVU, getRandomUserToken, smallFileTest, mediumFileTest, largeFileTest, textFileTest, officeDocumentTest, allDocumentTypesTest } from "../scripts/Load.js";
 
-export default function() {
-  pdfOnlyUpload();
+await openTestFiles(SCENARIO_FILES.pdfOnlyUpload);
+
+export default async function() {
+  await pdfOnlyUpload();
 }
 
 export const options = {
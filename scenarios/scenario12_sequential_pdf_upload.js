@@ -1,9 +1,11 @@
-import { pdfOnlyUpload, getUserTokenByVU, getRandomUserToken } from "../scripts/Load.js";
+import { openTestFiles, SCENARIO_FILES, pdfOnlyUpload, getUserTokenByVU, getRandomUserToken } from "../scripts/Load.js";
 import { sleep } from 'k6';
 
-export default function() {
+await openTestFiles(SCENARIO_FILES.pdfOnlyUpload);
+
+export default async function() {
   // Upload one PDF file at a time
-  pdfOnlyUpload();
+  await pdfOnlyUpload();
   
   // Small delay between uploads to avoid overwhelming the server
   // but keep it minimal to test continuous uploads
@@ -0,0 +1,39 @@
+import { openTestFiles, SCENARIO_FILES, arrivalRateUpload } from "../scripts/Load.js";
+
+await openTestFiles(SCENARIO_FILES.arrivalRateUpload);
+
+// Open model: uploads arrive at a fixed rate whether or not earlier ones have finished,
+// so a slow server builds a queue instead of quietly lowering the offered load
+const ARRIVALS = {
+  rate: 2,          // uploads started per timeUnit
+  timeUnit: '1s',
+};
+
+export default async function() {
+  await arrivalRateUpload(ARRIVALS);
+}
+
+export const options = {
+  scenarios: {
+    uploads: {
+      executor: 'constant-arrival-rate',
+      rate: ARRIVALS.rate,
+      timeUnit: ARRIVALS.timeUnit,
+      duration: '5m',
+      preAllocatedVUs: 20,
+      maxVUs: 200,      // uploads in flight at once before k6 starts dropping iterations
+    },
+  },
+  thresholds: {
+    http_req_duration: ['p(95)<30000'],
+    upload_duration_corrected: ['p(95)<30000'], // latency from the intended start, queueing included
+    http_req_failed: ['rate<0.10'],
+    'success_rate': ['rate>0.90'],
+    dropped_iterations: ['count<10'],
+  },
+  summaryTrendStats: ['avg', 'min', 'med', 'max', 'p(90)', 'p(95)', 'p(99)'],
+  userAgent: 'K6LoadTest/ConstantArrivalRate',
+  noConnectionReuse: false,
+  insecureSkipTLSVerify: true,
+  discardResponseBodies: false,
+};
@@ -0,0 +1,45 @@
+import { openTestFiles, SCENARIO_FILES, arrivalRateUpload } from "../scripts/Load.js";
+
+await openTestFiles(SCENARIO_FILES.arrivalRateUpload);
+
+// Open model ramp: the arrival rate climbs past what the conversion workers can absorb,
+// holds, then backs off, so the p99 reflects the queue real users would wait in
+const ARRIVALS = {
+  startRate: 1,
+  timeUnit: '1s',
+  stages: [
+    { duration: '2m', target: 5 },   // Ramp up to 5 uploads/s
+    { duration: '3m', target: 5 },   // Hold
+    { duration: '1m', target: 10 },  // Push into overload
+    { duration: '2m', target: 10 },  // Hold the overload
+    { duration: '1m', target: 0 },   // Back off and drain
+  ],
+};
+
+export default async function() {
+  await arrivalRateUpload(ARRIVALS);
+}
+
+export const options = {
+  scenarios: {
+    uploads: {
+      executor: 'ramping-arrival-rate',
+      startRate: ARRIVALS.startRate,
+      timeUnit: ARRIVALS.timeUnit,
+      stages: ARRIVALS.stages,
+      preAllocatedVUs: 50,
+      maxVUs: 300,
+    },
+  },
+  thresholds: {
+    http_req_duration: ['p(95)<60000'],
+    upload_duration_corrected: ['p(95)<60000'],
+    http_req_failed: ['rate<0.20'],
+    'success_rate': ['rate>0.80'],
+  },
+  summaryTrendStats: ['avg', 'min', 'med', 'max', 'p(90)', 'p(95)', 'p(99)'],
+  userAgent: 'K6LoadTest/RampingArrivalRate',
+  noConnectionReuse: false,
+  insecureSkipTLSVerify: true,
+  discardResponseBodies: false,
+};
@@ -1,7 +1,9 @@
-import { basicConcurrentUpload, uploadFileToOpenAI, getUserTokenByVU, getRandomUserToken, smallFileTest, mediumFileTest, largeFileTest, textFileTest, officeDocumentTest, allDocumentTypesTest } from "../scripts/Load.js";
+import { openTestFiles, SCENARIO_FILES, basicConcurrentUpload, uploadFileToOpenAI, getUserTokenByVU, getRandomUserToken, smallFileTest, mediumFileTest, largeFileTest, textFileTest, officeDocumentTest, allDocumentTypesTest } from "../scripts/Load.js";
 
-export default function() {
-  basicConcurrentUpload();
+await openTestFiles(SCENARIO_FILES.basicConcurrentUpload);
+
+export default async function() {
+  await basicConcurrentUpload();
 }
 
 export const options = {
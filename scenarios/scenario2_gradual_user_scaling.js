@@ -1,7 +1,9 @@
-import { gradualUserScaling, uploadFileToOpenAI, getUserTokenByVU, getRandomUserToken, smallFileTest, mediumFileTest, largeFileTest, textFileTest, officeDocumentTest, allDocumentTypesTest } from "../scripts/Load.js";
+import { openTestFiles, SCENARIO_FILES, gradualUserScaling, uploadFileToOpenAI, getUserTokenByVU, getRandomUserToken, smallFileTest, mediumFileTest, largeFileTest, textFileTest, officeDocumentTest, allDocumentTypesTest } from "../scripts/Load.js";
 
-export default function() {
-  gradualUserScaling();
+await openTestFiles(SCENARIO_FILES.gradualUserScaling);
+
+export default async function() {
+  await gradualUserScaling();
 }
 
 export const options = {
@@ -1,7 +1,9 @@
-import { realisticOfficePattern, uploadFileToOpenAI, getUserTokenByVU, getRandomUserToken, smallFileTest, mediumFileTest, largeFileTest, textFileTest, officeDocumentTest, allDocumentTypesTest } from "../scripts/Load.js";
+import { openTestFiles, SCENARIO_FILES, realisticOfficePattern, uploadFileToOpenAI, getUserTokenByVU, getRandomUserToken, smallFileTest, mediumFileTest, largeFileTest, textFileTest, officeDocumentTest, allDocumentTypesTest } from "../scripts/Load.js";
 
-export default function() {
-  realisticOfficePattern();
+await openTestFiles(SCENARIO_FILES.realisticOfficePattern);
+
+export default async function() {
+  await realisticOfficePattern();
 }
 
 export const options = {
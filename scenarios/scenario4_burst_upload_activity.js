@@ -1,7 +1,9 @@
-import { burstUploadActivity, uploadFileToOpenAI, getUserTokenByVU, getRandomUserToken, smallFileTest, mediumFileTest, largeFileTest, textFileTest, officeDocumentTest, allDocumentTypesTest } from "../scripts/Load.js";
+import { openTestFiles, SCENARIO_FILES, burstUploadActivity, uploadFileToOpenAI, getUserTokenByVU, getRandomUserToken, smallFileTest, mediumFileTest, largeFileTest, textFileTest, officeDocumentTest, allDocumentTypesTest } from "../scripts/Load.js";
 
-export default function() {
-  burstUploadActivity();
+await openTestFiles(SCENARIO_FILES.burstUploadActivity);
+
+export default async function() {
+  await burstUploadActivity();
 }
 
 export const options = {
@@ -1,7 +1,9 @@
-import { largeFileHandling, uploadFileToOpenAI, getUserTokenByVU, getRandomUserToken, smallFileTest, mediumFileTest, largeFileTest, textFileTest, officeDocumentTest, allDocumentTypesTest } from "../scripts/Load.js";
+import { openTestFiles, SCENARIO_FILES, largeFileHandling, uploadFileToOpenAI, getUserTokenByVU, getRandomUserToken, smallFileTest, mediumFileTest, largeFileTest, textFileTest, officeDocumentTest, allDocumentTypesTest } from "../scripts/Load.js";
 
-export default function() {
-  largeFileHandling();
+await openTestFiles(SCENARIO_FILES.largeFileHandling);
+
+export default async function() {
+  await largeFileHandling();
 }
 
 export const options = {
@@ -1,7 +1,9 @@
-import { mixedOperations, uploadFileToOpenAI, getUserTokenByVU, getRandomUserToken, smallFileTest, mediumFileTest, largeFileTest, textFileTest, officeDocumentTest, allDocumentTypesTest } from "../scripts/Load.js";
+import { openTestFiles, SCENARIO_FILES, mixedOperations, uploadFileToOpenAI, getUserTokenByVU, getRandomUserToken, smallFileTest, mediumFileTest, largeFileTest, textFileTest, officeDocumentTest, allDocumentTypesTest } from "../scripts/Load.js";
 
-export default function() {
-  mixedOperations();
+await openTestFiles(SCENARIO_FILES.mixedOperations);
+
+export default async function() {
+  await mixedOperations();
 }
 
 export const options = {
@@ -1,7 +1,9 @@
-import { networkVariance, uploadFileToOpenAI, getUserTokenByVU, getRandomUserToken, smallFileTest, mediumFileTest, largeFileTest, textFileTest, officeDocumentTest, allDocumentTypesTest } from "../scripts/Load.js";
+import { openTestFiles, SCENARIO_FILES, networkVariance, uploadFileToOpenAI, getUserTokenByVU, getRandomUserToken, smallFileTest, mediumFileTest, largeFileTest, textFileTest, officeDocumentTest, allDocumentTypesTest } from "../scripts/Load.js";
 
-export default function() {
-  networkVariance();
+await openTestFiles(SCENARIO_FILES.networkVariance);
+
+export default async function() {
+  await networkVariance();
 }
 
 export const options = {
@@ -1,7 +1,9 @@
-import { maximumCapacity, uploadFileToOpenAI, getUserTokenByVU, getRandomUserToken, smallFileTest, mediumFileTest, largeFileTest, textFileTest, officeDocumentTest, allDocumentTypesTest } from "../scripts/Load.js";
+import { openTestFiles, SCENARIO_FILES, maximumCapacity, uploadFileToOpenAI, getUserTokenByVU, getRandomUserToken, smallFileTest, mediumFileTest, largeFileTest, textFileTest, officeDocumentTest, allDocumentTypesTest } from "../scripts/Load.js";
 
-export default function() {
-  maximumCapacity();
+await openTestFiles(SCENARIO_FILES.maximumCapacity);
+
+export default async function() {
+  await maximumCapacity();
 }
 
 export const options = {
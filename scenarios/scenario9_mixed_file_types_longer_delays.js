@@ -1,7 +1,9 @@
-import { mixedFileTypesWithLongerDelays, uploadFileToOpenAI, getUserTokenByVU, getRandomUserToken, smallFileTest, mediumFileTest, largeFileTest, textFileTest, officeDocumentTest, allDocumentTypesTest } from "../scripts/Load.js";
+import { openTestFiles, SCENARIO_FILES, mixedFileTypesWithLongerDelays, uploadFileToOpenAI, getUserTokenByVU, getRandomUserToken, smallFileTest, mediumFileTest, largeFileTest, textFileTest, officeDocumentTest, allDocumentTypesTest } from "../scripts/Load.js";
 
-export default function() {
-  mixedFileTypesWithLongerDelays();
+await openTestFiles(SCENARIO_FILES.mixedFileTypesWithLongerDelays);
+
+export default async function() {
+  await mixedFileTypesWithLongerDelays();
 }
 
 export const options = {